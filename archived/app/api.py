@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from typing import Dict, List, Optional
 import logging
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime, timedelta
 
 from app.models import (
@@ -9,13 +9,17 @@ from app.models import (
     UnvisitedResponse, StatsResponse, BrokenBookmarksResponse,
     DeleteBookmarkResponse, AnalysisResponse,
     BookmarkResponse, 
-    BookmarkStats
+    BookmarkStats, ValidationJobRequest
 )
 from app.bookmarks_data import BookmarkStore, ErrorDetails
 from app.config import logger
 from app.sqlite_cache import sqlite_cache
-import aiohttp
+from app.pipeline.check import CheckResult, ErrorCategory
+from app.pipeline.retry import TRANSIENT
+from app.pipeline.progress import ValidationProgress, format_sse
+from app.jobs import ValidationJobManager, JobQueueFull
 import asyncio
+import time
 from datetime import datetime
 
 router = APIRouter()
@@ -25,6 +29,14 @@ def get_bookmark_store(store: BookmarkStore = Depends(lambda: BookmarkStore)) ->
     return store
 
 
+# Dependency to get the ValidationJobManager; the app overrides it with its instance
+def get_job_manager() -> ValidationJobManager:
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Validation jobs are not enabled"
+    )
+
+
 @router.get("/", response_model=SuccessResponse, status_code=status.HTTP_200_OK)
 async def root():
     """Root endpoint with basic information about the application."""
@@ -244,57 +256,59 @@ async def clear_broken_bookmarks_cache() -> dict:
         return {"status": "error", "message": f"Failed to clear cache: {str(e)}"}
 
 
-async def check_url_simple(url: str) -> dict:
-    """Simple HEAD request check - only marks as broken for definitive failures"""
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.head(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                status_code = response.status
-                
-                # Only these are definitive "broken" - page doesn't exist
-                definitely_broken = status_code in [404, 410]
-                
-                # These indicate the site exists but requires auth/login
-                login_required = status_code in [401, 403, 999, 429]
-                
-                # Determine reason
-                if status_code == 404:
-                    reason = "not_found"
-                elif status_code == 410:
-                    reason = "gone"
-                elif status_code == 401:
-                    reason = "login_required"
-                elif status_code == 403:
-                    reason = "access_forbidden"
-                elif status_code == 999:
-                    reason = "bot_blocked"
-                elif status_code == 429:
-                    reason = "rate_limited"
-                elif 200 <= status_code < 300:
-                    reason = "ok"
-                elif 300 <= status_code < 400:
-                    reason = "redirect"
-                else:
-                    reason = "server_error"
-                
-                return {
-                    "url": url,
-                    "status_code": status_code,
-                    "is_broken": definitely_broken,
-                    "login_required": login_required,
-                    "reason": reason
-                }
-    except aiohttp.ClientConnectorError:
-        # DNS/connection failed - domain doesn't exist
-        return {"url": url, "status_code": None, "is_broken": True, "login_required": False, "reason": "connection_error"}
-    except Exception as e:
-        # Other errors - don't mark as broken
-        return {"url": url, "status_code": None, "is_broken": False, "login_required": False, "reason": f"error: {str(e)}"}
+async def check_url_simple(store: BookmarkStore, url: str, checked_since: float) -> dict:
+    """Pipeline check reported for revalidation - only marks as broken for definitive failures.
+
+    Goes through the store's cached, single-flight check, so a URL the store or
+    another process is already checking is fetched once; only results checked
+    after ``checked_since`` are reused.
+    """
+    result = CheckResult(*await store._check_url_accessible(url, checked_since=checked_since))
+    return {"url": url, **simple_verdict(result)}
+
+
+# Reasons reported for statuses with a name of their own
+STATUS_REASONS = {
+    404: "not_found",
+    410: "gone",
+    401: "login_required",
+    403: "access_forbidden",
+    999: "bot_blocked",
+    429: "rate_limited",
+}
+
+
+def simple_verdict(result: CheckResult) -> dict:
+    """Summarise a pipeline result: transient failures (timeouts, 429s, 5xx that
+    may recover) are not reported as broken."""
+    details = result.details
+    status_code = details.get("status_code")
+    if details.get("host_down"):
+        reason = "host_down"
+    elif status_code is None:
+        reason = "connection_error" if result.error.category in (
+            ErrorCategory.DNS_FAILURE, ErrorCategory.CONNECTION_ERROR
+        ) else f"error: {result.error.message}"
+    elif status_code in STATUS_REASONS:
+        reason = STATUS_REASONS[status_code]
+    elif status_code < 300:
+        reason = "ok"
+    elif status_code < 400:
+        reason = "redirect"
+    else:
+        reason = "server_error"
+    return {
+        "status_code": status_code,
+        "is_broken": not result.accessible and details.get("failure_kind") != TRANSIENT,
+        "login_required": bool(details.get("login_required")),
+        "reason": reason,
+    }
 
 @router.post("/validate-broken", status_code=status.HTTP_200_OK)
-async def validate_broken_bookmarks(limit: int = 10):
-    """Validate broken bookmarks using simple HEAD requests"""
+async def validate_broken_bookmarks(limit: int = 10, store: BookmarkStore = Depends(get_bookmark_store)):
+    """Re-check broken bookmarks through the URL check pipeline"""
     try:
+        started = time.time()
         # Get broken bookmarks from existing cache
         all_entries = sqlite_cache.get_all()
         broken_entries = [entry for entry in all_entries if entry.broken_status == "broken"][:limit]
@@ -306,7 +320,7 @@ async def validate_broken_bookmarks(limit: int = 10):
         urls = [entry.url for entry in broken_entries]
         
         # Check URLs concurrently
-        tasks = [check_url_simple(url) for url in urls]
+        tasks = [check_url_simple(store, url, started) for url in urls]
         results = await asyncio.gather(*tasks)
         
         # Update database with results using the existing cache methods
@@ -346,6 +360,73 @@ async def validate_broken_bookmarks(limit: int = 10):
             detail=f"Failed to validate broken bookmarks: {str(e)}"
         )
 
+# The validation streamed by /validate/stream; every client joins the same one
+_live_progress: Optional[ValidationProgress] = None
+_live_task: Optional[asyncio.Task] = None
+
+
+def _start_live_validation(store: BookmarkStore) -> ValidationProgress:
+    """Return the running live validation, starting one if none is running."""
+    global _live_progress, _live_task
+    if _live_progress is None or _live_progress.done:
+        progress = ValidationProgress()
+
+        async def run():
+            try:
+                # Not resumable: the CLI's checkpointed run must not be resumed or overwritten from here
+                async for _ in store.iter_broken_bookmarks(resumable=False, progress=progress):
+                    pass
+            except Exception as e:
+                logger.error(f"Live validation failed: {e}")
+            finally:
+                progress.finish()
+
+        _live_progress = progress
+        # Runs independently of any one client, so a disconnect does not stop it
+        _live_task = asyncio.create_task(run())
+    return _live_progress
+
+
+async def stop_live_validation() -> None:
+    """Cancel the running live validation, if any, and wait for it to unwind; call on shutdown."""
+    global _live_task
+    if _live_task is None:
+        return
+    _live_task.cancel()
+    try:
+        await _live_task
+    except asyncio.CancelledError:
+        pass
+    _live_task = None
+
+
+@router.get("/validate/stream")
+async def validate_stream(
+    request: Request,
+    interval: float = Query(1.0, gt=0, le=60, description="Seconds between counter snapshots"),
+    store: BookmarkStore = Depends(get_bookmark_store),
+):
+    """Start (or join) a validation and stream it as Server-Sent Events.
+
+    Emits a ``result`` event per bookmark as it settles, a ``progress`` event
+    with the counters (cache hits, DNS failures, bandwidth, checks in flight...)
+    at least every ``interval`` seconds, and a final ``done`` event.
+    """
+    progress = _start_live_validation(store)
+
+    async def stream():
+        async for event, data in progress.events(interval):
+            if await request.is_disconnected():
+                break
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/bookmark-status/{bookmark_id}", response_model=dict)
 async def get_bookmark_status(bookmark_id: str):
     """Get the current status of a specific bookmark from cache."""
@@ -408,3 +489,56 @@ async def get_all_bookmark_statuses():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+@router.post("/validation-jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_validation_job(
+    request: ValidationJobRequest,
+    jobs: ValidationJobManager = Depends(get_job_manager),
+):
+    """Queue a validation job and return its id right away.
+
+    A job identical to one still queued or running is merged into it
+    (``merged`` is true and the existing id is returned).
+    """
+    try:
+        job, merged = jobs.submit(request.scope, request.value)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return {"status": "success", "merged": merged, "job": job.to_dict(include_results=False)}
+
+
+@router.get("/validation-jobs/{job_id}")
+async def get_validation_job(job_id: str, jobs: ValidationJobManager = Depends(get_job_manager)):
+    """Status, progress counters and broken bookmarks found so far."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Validation job {job_id} not found")
+    return {"status": "success", "job": job.to_dict()}
+
+
+@router.get("/validation-jobs/{job_id}/events")
+async def stream_validation_job(
+    job_id: str,
+    request: Request,
+    interval: float = Query(1.0, gt=0, le=60, description="Seconds between counter snapshots"),
+    jobs: ValidationJobManager = Depends(get_job_manager),
+):
+    """A job's progress as Server-Sent Events (same events as /validate/stream)."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Validation job {job_id} not found")
+
+    async def stream():
+        async for event, data in job.progress.events(interval):
+            if await request.is_disconnected():
+                break
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
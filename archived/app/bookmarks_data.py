@@ -1,76 +1,49 @@
 import json
 import logging
-from typing import Dict, List, Optional, Set, Tuple, Any, NamedTuple
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Any
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict, Counter
 from pathlib import Path
-import aiohttp
 import asyncio
-import ssl
-import socket
 import concurrent.futures
+import time
 from enum import Enum
 import re
 
 from app.models import URL, Bookmark, Folder, BookmarkResponse, BookmarkStats
 from app.config import logger
-from app.config import CACHE_FRESHNESS_HOURS
+from app.config import CACHE_FRESHNESS_HOURS, CHECK_CONCURRENCY, CACHE_WRITE_BATCH_SIZE, TRANSIENT_FAILURE_CACHE_HOURS
+from app.config import CHECK_TRANSPORT, CHECK_SHARDS
 from app.sqlite_cache import sqlite_cache, BookmarkCacheEntry
+from app.pipeline.dns import dns_resolver
+from app.pipeline.scheduler import interleave_by_host
+from app.pipeline.singleflight import SingleFlight, url_checks
+from app.pipeline.sharding import iter_sharded, partition
+from app.pipeline.priority import prioritize
+from app.pipeline.budget import RunBudget, STOP_BYTES
+from app.pipeline.runs import validation_runs, RUN_BROKEN
+from app.pipeline.progress import ValidationProgress
+from app.pipeline.urls import normalize_url
+from app.pipeline.latency import http_latency, tls_latency
+from app.pipeline.redirects import redirect_cache
+from app.pipeline.retry import RetryPolicy, DelayQueue, call_with_retries, TRANSIENT
+from app.pipeline.check import URLChecker, ErrorCategory, ErrorDetails
 
 PURPLE = "\033[95m"
 RESET = "\033[0m"
 
-class ErrorCategory(Enum):
-    DNS_FAILURE = "DNS Failure"
-    SSL_ERROR = "SSL Error"
-    AUTH_REQUIRED = "Authentication Required"
-    NOT_FOUND = "Not Found"
-    SERVER_ERROR = "Server Error"
-    TIMEOUT = "Timeout"
-    CONNECTION_ERROR = "Connection Error"
-    OTHER = "Other"
-
-class ErrorDetails(NamedTuple):
-    category: ErrorCategory
-    message: str
-    status_code: Optional[int] = None
-    technical_details: Optional[Dict[str, Any]] = None
-
-def categorize_error(error: str, status_code: Optional[int] = None) -> ErrorDetails:
-    """Categorize an error message into a specific category."""
-    error_lower = error.lower()
-    
-    # DNS errors
-    if "dns resolution failed" in error_lower:
-        return ErrorDetails(ErrorCategory.DNS_FAILURE, error)
-    
-    # SSL errors
-    if any(ssl_term in error_lower for ssl_term in ["ssl", "certificate", "tls"]):
-        return ErrorDetails(ErrorCategory.SSL_ERROR, error)
-    
-    # Authentication errors
-    if status_code in [401, 403] or "unauthorized" in error_lower or "forbidden" in error_lower:
-        return ErrorDetails(ErrorCategory.AUTH_REQUIRED, error, status_code)
-    
-    # Not found errors
-    if status_code == 404 or "not found" in error_lower:
-        return ErrorDetails(ErrorCategory.NOT_FOUND, error, status_code)
-    
-    # Server errors
-    if status_code and 500 <= status_code < 600:
-        return ErrorDetails(ErrorCategory.SERVER_ERROR, error, status_code)
-    
-    # Timeout errors
-    if "timeout" in error_lower:
-        return ErrorDetails(ErrorCategory.TIMEOUT, error)
-    
-    # Connection errors
-    if any(conn_term in error_lower for conn_term in ["connection", "connect", "network"]):
-        return ErrorDetails(ErrorCategory.CONNECTION_ERROR, error)
-    
-    # Other errors
-    return ErrorDetails(ErrorCategory.OTHER, error, status_code)
+def is_transient_failure(details: Optional[Dict[str, Any]]) -> bool:
+    return bool(details) and details.get("failure_kind") == TRANSIENT
+
+def cache_max_age_hours(details: Optional[Dict[str, Any]]) -> int:
+    """Failures still transient after every retry are re-checked sooner than settled results."""
+    return TRANSIENT_FAILURE_CACHE_HOURS if is_transient_failure(details) else CACHE_FRESHNESS_HOURS
+
+def login_required_label(details: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The cache's login_required value for a check; None when the check could not tell."""
+    login_required = (details or {}).get("login_required")
+    return None if login_required is None else ("yes" if login_required else "no")
 
 def error_details_to_dict(error_details):
     d = error_details._asdict() if hasattr(error_details, '_asdict') else dict(error_details)
@@ -79,8 +52,21 @@ def error_details_to_dict(error_details):
     return d
 
 class BookmarkStore:
-    def __init__(self, bookmarks_file_path: str):
+    def __init__(
+        self,
+        bookmarks_file_path: str,
+        transport: str = CHECK_TRANSPORT,
+        persist_url_results: bool = True,
+        checks: Optional[SingleFlight] = None,
+    ):
         self.bookmarks_file_path = bookmarks_file_path
+        # Name of the HTTP transport used for URL checks (see app.pipeline.transport)
+        self.transport = transport
+        self.checker = URLChecker(transport=transport)
+        # Shard workers leave SQLite result writes to the parent process
+        self.persist_url_results = persist_url_results
+        # Single-flight group URL checks coalesce through; defaults to the shared lease-backed one
+        self.checks = checks or url_checks
         self._bookmarks: List[Bookmark] = []
         self._folders: List[Folder] = []
         self._bookmarks_json: Dict = {}
@@ -89,8 +75,14 @@ class BookmarkStore:
         self._url_cache: Dict[str, Tuple[bool, ErrorDetails, Optional[Dict[str, Any]], datetime]] = {}
         self._url_cache_expiry = timedelta(days=7)
 
-    def _is_cache_valid(self, cache_time: datetime) -> bool:
+    async def close(self) -> None:
+        """Close the checker's pooled connections; call on shutdown, on the loop the checks ran on."""
+        await self.checker.close()
+
+    def _is_cache_valid(self, cache_time: datetime, details: Optional[Dict[str, Any]] = None) -> bool:
         """Check if a cache entry is still valid."""
+        if is_transient_failure(details):
+            return datetime.now() - cache_time < timedelta(hours=TRANSIENT_FAILURE_CACHE_HOURS)
         return datetime.now() - cache_time < self._url_cache_expiry
 
     def load_data(self) -> bool:
@@ -306,27 +298,51 @@ class BookmarkStore:
         except Exception:
             return None
 
-    async def _check_url_accessible(self, url: str) -> Tuple[bool, ErrorDetails, Optional[Dict[str, Any]]]:
-        """Check if a URL is accessible using optimized HEAD-first approach with multi-layer caching. Returns (is_accessible, error_details, technical_details)."""
+    async def _check_url_accessible(
+        self, url: str, force: bool = False, checked_since: Optional[float] = None
+    ) -> Tuple[bool, ErrorDetails, Optional[Dict[str, Any]]]:
+        """Check if a URL is accessible using optimized HEAD-first approach with multi-layer caching. Returns (is_accessible, error_details, technical_details).
+
+        ``force`` skips the caches, e.g. when retrying a transient failure.
+        ``checked_since`` (a unix timestamp) only accepts cached results checked
+        after it, so a re-check can still reuse one another process just made.
+        """
         if not url:
             logger.warning("⚠️  Empty URL provided to _check_url_accessible.")
             return False, ErrorDetails(ErrorCategory.OTHER, "Empty URL"), None
 
         # Layer 1: Check in-memory cache first (fastest)
-        if url in self._url_cache:
+        if not force and url in self._url_cache:
             is_accessible, error_details, details, cache_time = self._url_cache[url]
-            if self._is_cache_valid(cache_time):
+            if self._is_cache_valid(cache_time, details) and (
+                checked_since is None or cache_time.timestamp() >= checked_since
+            ):
                 logger.debug(f"💾 [MEM] Cache hit: {url}")
                 return is_accessible, error_details, details
-            # Cache expired, remove it
+            # Cache expired (or predates checked_since), remove it
             del self._url_cache[url]
 
+        # Concurrent checks of the same URL (duplicate bookmarks, API and CLI at once)
+        # share a single in-flight check
+        result = await self.checks.do(normalize_url(url), lambda: self._check_url_uncached(url, force, checked_since))
+        if url not in self._url_cache:
+            self._url_cache[url] = (*result, datetime.now())
+        return result
+
+    async def _check_url_uncached(
+        self, url: str, force: bool = False, checked_since: Optional[float] = None
+    ) -> Tuple[bool, ErrorDetails, Optional[Dict[str, Any]]]:
+        """Check a URL that missed the in-memory cache. Callers go through _check_url_accessible."""
         # Layer 2: Check SQLite cache (persistent across restarts)
-        sqlite_entry = sqlite_cache.get_by_url(url)
+        sqlite_entry = None if force else sqlite_cache.get_by_url(url)
         if sqlite_entry and sqlite_entry.last_checked:
             try:
                 last_checked = datetime.fromisoformat(sqlite_entry.last_checked)
-                if datetime.utcnow() - last_checked < timedelta(hours=CACHE_FRESHNESS_HOURS):
+                fresh = datetime.utcnow() - last_checked < timedelta(hours=cache_max_age_hours(sqlite_entry.error_details))
+                if fresh and checked_since is not None:
+                    # last_checked is UTC, cached by whichever process checked the URL
+                    fresh = last_checked.replace(tzinfo=timezone.utc).timestamp() >= checked_since
+                if fresh:
                     # Cache is fresh, populate in-memory cache and return
                     is_accessible = sqlite_entry.broken_status != "broken"
                     error_details = ErrorDetails(
@@ -343,166 +359,39 @@ class BookmarkStore:
                     return is_accessible, error_details, technical_details
             except (ValueError, TypeError) as e:
                 logger.warning(f"⚠️  Invalid cache timestamp for {url}: {e}")
-            
-        details = {
-            "status_code": None,
-            "content_type": None,
-            "response_time": None,
-            "final_url": None,
-            "ssl_valid": None,
-            "dns_resolved": None,
-            "method_used": None
-        }
-        
-        try:
-            # First check DNS resolution (fastest failure mode)
-            try:
-                hostname = urlparse(url).netloc
-                socket.gethostbyname(hostname)
-                details["dns_resolved"] = True
-                logger.debug(f"🔗 DNS resolved: {hostname}")
-            except socket.gaierror:
-                logger.error(f"❌ DNS resolution failed: {url}")
-                result = (False, ErrorDetails(ErrorCategory.DNS_FAILURE, "DNS resolution failed"), details)
-                # Cache in memory
-                self._url_cache[url] = (*result, datetime.now())
-                # Cache in SQLite for persistence
-                self._save_url_to_sqlite_cache(url, False, result[1], details)
-                return result
-
-            # Then check SSL if it's an HTTPS URL (second fastest failure mode)
-            if url.startswith("https://"):
-                try:
-                    context = ssl.create_default_context()
-                    with socket.create_connection((hostname, 443), timeout=3) as sock:
-                        with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                            cert = ssock.getpeercert()
-                            details["ssl_valid"] = bool(cert)
-                            logger.debug(f"🔒 SSL valid: {url}")
-                except (ssl.SSLError, socket.timeout, ConnectionRefusedError) as e:
-                    details["ssl_valid"] = False
-                    logger.error(f"❌ SSL Error: {url} - {str(e)}")
-                    result = (False, ErrorDetails(ErrorCategory.SSL_ERROR, f"SSL Error: {str(e)}"), details)
-                    # Cache in memory
-                    self._url_cache[url] = (*result, datetime.now())
-                    # Cache in SQLite for persistence
-                    self._save_url_to_sqlite_cache(url, False, result[1], details)
-                    return result
-            
-            # Now try HTTP check - HEAD first, then GET fallback
-            start_time = datetime.now()
-            async with aiohttp.ClientSession() as session:
-                # Try HEAD request first (much faster)
-                try:
-                    async with session.head(
-                        url,
-                        timeout=aiohttp.ClientTimeout(total=8),
-                        allow_redirects=True,
-                        ssl=False  # We already checked SSL separately
-                    ) as response:
-                        details["status_code"] = response.status
-                        details["content_type"] = response.headers.get("content-type")
-                        details["final_url"] = str(response.url)
-                        details["response_time"] = (datetime.now() - start_time).total_seconds()
-                        details["method_used"] = "HEAD"
-                        
-                        if response.status < 400:
-                            logger.info(f"✅ HEAD OK: {url} [{response.status}] ({details['response_time']:.2f}s)")
-                            result = (True, ErrorDetails(ErrorCategory.OTHER, ""), details)
-                            # Cache in memory
-                            self._url_cache[url] = (*result, datetime.now())
-                            # Cache in SQLite for persistence
-                            self._save_url_to_sqlite_cache(url, True, result[1], details)
-                            return result
-                        elif response.status == 405:  # Method Not Allowed - try GET
-                            logger.debug(f"🔄 HEAD not supported for {url}, trying GET...")
-                            # Fall through to GET request
-                        else:
-                            error_msg = f"HTTP {response.status}: {response.reason}"
-                            logger.error(f"❌ HEAD Error: {url} - {error_msg}")
-                            result = (False, categorize_error(error_msg, response.status), details)
-                            # Cache in memory
-                            self._url_cache[url] = (*result, datetime.now())
-                            # Cache in SQLite for persistence
-                            self._save_url_to_sqlite_cache(url, False, result[1], details)
-                            return result
-                            
-                except aiohttp.ClientError as e:
-                    logger.debug(f"🔄 HEAD failed for {url}: {str(e)}, trying GET...")
-                    # Fall through to GET request
-                except asyncio.TimeoutError:
-                    logger.error(f"⏰ HEAD Timeout: {url}")
-                    result = (False, ErrorDetails(ErrorCategory.TIMEOUT, "HEAD request timeout"), details)
-                    # Cache in memory
-                    self._url_cache[url] = (*result, datetime.now())
-                    # Cache in SQLite for persistence
-                    self._save_url_to_sqlite_cache(url, False, result[1], details)
-                    return result
-
-                # GET request fallback (only if HEAD failed or returned 405)
-                try:
-                    start_time = datetime.now()  # Reset timer for GET request
-                    async with session.get(
-                        url,
-                        timeout=aiohttp.ClientTimeout(total=10),
-                        allow_redirects=True,
-                        ssl=False  # We already checked SSL separately
-                    ) as response:
-                        # Only read first 1KB to verify it's working (much faster than full download)
-                        await response.content.read(1024)
-                        
-                        details["status_code"] = response.status
-                        details["content_type"] = response.headers.get("content-type")
-                        details["final_url"] = str(response.url)
-                        details["response_time"] = (datetime.now() - start_time).total_seconds()
-                        details["method_used"] = "GET"
-                        
-                        if response.status < 400:
-                            logger.info(f"✅ GET OK: {url} [{response.status}] ({details['response_time']:.2f}s)")
-                            result = (True, ErrorDetails(ErrorCategory.OTHER, ""), details)
-                            # Cache in memory
-                            self._url_cache[url] = (*result, datetime.now())
-                            # Cache in SQLite for persistence
-                            self._save_url_to_sqlite_cache(url, True, result[1], details)
-                            return result
-                        
-                        error_msg = f"HTTP {response.status}: {response.reason}"
-                        logger.error(f"❌ GET Error: {url} - {error_msg}")
-                        result = (False, categorize_error(error_msg, response.status), details)
-                        # Cache in memory
-                        self._url_cache[url] = (*result, datetime.now())
-                        # Cache in SQLite for persistence
-                        self._save_url_to_sqlite_cache(url, False, result[1], details)
-                        return result
-                        
-                except aiohttp.ClientError as e:
-                    logger.error(f"❌ Connection error: {url} - {str(e)}")
-                    result = (False, categorize_error(f"Connection error: {str(e)}"), details)
-                    # Cache in memory
-                    self._url_cache[url] = (*result, datetime.now())
-                    # Cache in SQLite for persistence
-                    self._save_url_to_sqlite_cache(url, False, result[1], details)
-                    return result
-                except asyncio.TimeoutError:
-                    logger.error(f"⏰ GET Timeout: {url}")
-                    result = (False, ErrorDetails(ErrorCategory.TIMEOUT, "GET request timeout"), details)
-                    # Cache in memory
-                    self._url_cache[url] = (*result, datetime.now())
-                    # Cache in SQLite for persistence
-                    self._save_url_to_sqlite_cache(url, False, result[1], details)
-                    return result
-                    
-        except Exception as e:
-            logger.error(f"❌ Error checking URL: {url} - {str(e)}")
-            result = (False, categorize_error(f"Error checking URL: {str(e)}"), details)
-            # Cache in memory
-            self._url_cache[url] = (*result, datetime.now())
-            # Cache in SQLite for persistence
-            self._save_url_to_sqlite_cache(url, False, result[1], details)
-            return result
+
+        # Layer 3: the network, through the staged DNS → TCP → TLS → HTTP pipeline
+        result = await self.checker.check(url, force)
+        # Cache in memory
+        self._url_cache[url] = (*result, datetime.now())
+        # Cache in SQLite for persistence
+        self._save_url_to_sqlite_cache(url, *result)
+        return result
+
+    @staticmethod
+    def result_cache_entry(
+        bookmark: Bookmark, is_accessible: bool, error_details: ErrorDetails, details: Optional[Dict[str, Any]]
+    ) -> BookmarkCacheEntry:
+        """Cache row recording a bookmark's check result."""
+        stored_details = error_details_to_dict(error_details)
+        if is_transient_failure(details):
+            # Still failing transiently after every retry: re-check sooner than usual
+            stored_details["failure_kind"] = TRANSIENT
+        return BookmarkCacheEntry(
+            id=bookmark.id,
+            url=bookmark.url.full,
+            name=bookmark.name,
+            last_checked=datetime.utcnow().isoformat(),
+            broken_status="broken" if not is_accessible else "ok",
+            login_required=login_required_label(details),
+            error_details=stored_details,
+            metrics=(details or {}).get("timings")
+        )
 
     def _save_url_to_sqlite_cache(self, url: str, is_accessible: bool, error_details: ErrorDetails, technical_details: Optional[Dict[str, Any]]) -> None:
         """Save URL check result to SQLite cache for persistence."""
+        if not self.persist_url_results:
+            return
         try:
             # Create a cache entry with URL as ID (for URL-level caching)
             url_hash = str(hash(url))  # Simple hash for ID
@@ -512,10 +401,12 @@ class BookmarkStore:
                 name=None,  # URL-only cache entry
                 last_checked=datetime.utcnow().isoformat(),
                 broken_status="ok" if is_accessible else "broken",
+                login_required=login_required_label(technical_details),
                 error_details={
                     **error_details_to_dict(error_details),
                     **(technical_details or {})
-                }
+                },
+                metrics=(technical_details or {}).get("timings")
             )
             sqlite_cache.upsert(entry)
             logger.debug(f"💾 [DB] Saved URL cache: {url} as {'ok' if is_accessible else 'broken'}")
@@ -552,121 +443,347 @@ class BookmarkStore:
             }
         }
 
-    async def _check_urls_batch(self, urls: List[str], batch_size: int = 20) -> List[Tuple[str, bool, ErrorDetails, Optional[Dict[str, Any]]]]:
+    async def _check_urls_batch(self, urls: List[str], batch_size: int = 20, retry_policy: RetryPolicy = RetryPolicy()) -> List[Tuple[str, bool, ErrorDetails, Optional[Dict[str, Any]]]]:
         """Check a batch of URLs concurrently with optimized batch size and rate limiting."""
         results = []
         semaphore = asyncio.Semaphore(batch_size)  # Rate limiting
+
+        # Resolve every distinct hostname once before the HTTP stage
+        await dns_resolver.prefetch(urlparse(url).hostname for url in urls if url)
         
-        async def check_with_semaphore(url: str):
+        async def check_with_semaphore(url: str, attempt: int):
             async with semaphore:
+                if attempt > 1:
+                    return await self._check_url_accessible(url, force=True)
                 return await self._check_url_accessible(url)
+
+        def retry_kind(result):
+            return result[2].get("failure_kind") if not result[0] and result[2] else None
+
+        async def check_with_retries(url: str):
+            # Back-off sleeps happen outside the semaphore, leaving the slot to other URLs
+            return await call_with_retries(lambda attempt: check_with_semaphore(url, attempt), retry_kind, retry_policy)
         
-        # Process all URLs concurrently with semaphore limiting
-        tasks = [check_with_semaphore(url) for url in urls]
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Process all URLs concurrently with semaphore limiting, interleaving hosts so
+        # the per-host scheduler never leaves every slot waiting on one busy host
+        ordered = interleave_by_host(dict.fromkeys(urls), key=lambda u: urlparse(u).hostname)
+        tasks = [check_with_retries(url) for url in ordered]
+        results_by_url = dict(zip(ordered, await asyncio.gather(*tasks, return_exceptions=True)))
         
-        for url, result in zip(urls, batch_results):
+        for url in urls:
+            result = results_by_url[url]
             if isinstance(result, Exception):
                 results.append((url, False, ErrorDetails(ErrorCategory.OTHER, str(result)), None))
             else:
                 is_accessible, error_details, details = result
                 results.append((url, is_accessible, error_details, details))
-                
+
+        dns_resolver.flush()
+        http_latency.flush()
+        tls_latency.flush()
         return results
 
     async def get_broken_bookmarks(self, include_details: bool = False) -> List[Tuple[BookmarkResponse, ErrorDetails, Optional[Dict[str, Any]]]]:
         """Get a list of broken bookmarks with categorized error messages and optional details, using SQLite cache to minimize network requests."""
+        return [result async for result in self.iter_broken_bookmarks(include_details=include_details)]
+
+    async def check_bookmarks(
+        self,
+        bookmarks: List[Bookmark],
+        concurrency: int = CHECK_CONCURRENCY,
+        retry_policy: RetryPolicy = RetryPolicy(),
+        budget: Optional[RunBudget] = None,
+        progress: Optional[ValidationProgress] = None,
+    ) -> AsyncIterator[Tuple[Bookmark, bool, ErrorDetails, Optional[Dict[str, Any]]]]:
+        """Check ``bookmarks`` over the network, yielding (bookmark, is_accessible,
+        error_details, details) as each check settles.
+
+        Every distinct hostname is resolved once up front, then a bounded
+        producer/consumer pipeline keeps ``concurrency`` checks in flight. Both
+        queues are bounded, so a slow consumer applies backpressure to the checkers.
+        Transient failures are retried per ``retry_policy``; while backing off they
+        wait on a delay queue rather than in a worker.
+
+        With a ``budget``, checks are only started while their projected cost fits,
+        and checks still in flight at the deadline are cancelled. Bookmarks that
+        were not checked are simply not yielded. ``progress`` tracks checks in
+        flight and retries.
+        """
+        if not bookmarks:
+            return
+
+        # Stage 2: resolve every distinct hostname once
+        await dns_resolver.prefetch(b.url.hostname for b in bookmarks)
+
+        # Stage 3: bounded check pipeline
+        work_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        result_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        retry_queue: DelayQueue = DelayQueue()
+        retries = 0
+
+        async def produce():
+            for bookmark in bookmarks:
+                await work_queue.put((bookmark, 1))
+
+        async def requeue_retries():
+            # Retries re-enter the work queue once their back-off has passed
+            while True:
+                await work_queue.put(await retry_queue.get())
+
+        async def work():
+            nonlocal retries
+            while True:
+                bookmark, attempt = await work_queue.get()
+                if budget and not budget.admit():
+                    await result_queue.put(None)  # deferred to a later run
+                    continue
+                logger.info(f"🌐 [NET] Checking: {bookmark.name} ({bookmark.url.full}) ...")
+                started = time.monotonic()
+                if progress:
+                    progress.check_started()
+                try:
+                    if attempt > 1:
+                        outcome = await self._check_url_accessible(bookmark.url.full, force=True)
+                    else:
+                        outcome = await self._check_url_accessible(bookmark.url.full)
+                except asyncio.CancelledError:
+                    if budget:
+                        budget.release()
+                    if progress:
+                        progress.check_finished()
+                    raise
+                except Exception as e:
+                    outcome = (False, ErrorDetails(ErrorCategory.OTHER, str(e)), None)
+                is_accessible, error_details, details = outcome
+                if budget:
+                    budget.settle((details or {}).get("bandwidth_bytes", 0), time.monotonic() - started)
+                retrying = not is_accessible and retry_policy.should_retry(attempt, (details or {}).get("failure_kind"))
+                if progress:
+                    progress.check_finished(retrying)
+                if retrying:
+                    delay = retry_policy.backoff(attempt)
+                    retries += 1
+                    logger.info(f"🔁 [RETRY] {bookmark.url.full} in {delay:.1f}s (attempt {attempt + 1}/{retry_policy.max_attempts}) - {error_details.message}")
+                    retry_queue.put((bookmark, attempt + 1), delay)
+                    continue
+                await result_queue.put((bookmark, *outcome))
+
+        tasks = [asyncio.create_task(produce()), asyncio.create_task(requeue_retries())]
+        tasks += [asyncio.create_task(work()) for _ in range(min(concurrency, len(bookmarks)))]
+        remaining = len(bookmarks)
+        try:
+            while remaining:
+                try:
+                    outcome = await asyncio.wait_for(result_queue.get(), budget.remaining_seconds() if budget else None)
+                except asyncio.TimeoutError:
+                    budget.expire()
+                    logger.info(f"⏰ Deadline reached, cancelling {budget.in_flight} checks in flight")
+                    break
+                remaining -= 1
+                if outcome is not None:
+                    yield outcome
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            dns_resolver.flush()
+            http_latency.flush()
+            tls_latency.flush()
+            logger.info(f"🔁 {retries} retries over {len(bookmarks)} network checks")
+
+    async def _check_sharded(
+        self,
+        bookmarks: List[Bookmark],
+        shards: int,
+        concurrency: int,
+        retry_policy: RetryPolicy,
+        budget: Optional[RunBudget] = None,
+    ) -> AsyncIterator[Tuple[Bookmark, bool, ErrorDetails, Optional[Dict[str, Any]]]]:
+        """Like ``check_bookmarks``, but partitioned by hostname across ``shards``
+        worker processes. A host always lands on the same shard, so its politeness
+        limits are enforced by exactly one scheduler.
+
+        Each shard enforces the deadline and an equal slice of the byte budget
+        itself; ``budget`` only tallies what comes back.
+        """
+        by_id = {b.id: b for b in bookmarks}
+        partitions = partition(bookmarks, shards, key=lambda b: b.url.hostname)
+        # ``concurrency`` stays the total number of checks in flight
+        per_shard = max(1, -(-concurrency // shards))
+        shard_budget = None
+        if budget and budget.limited:
+            shard_budget = (budget.remaining_seconds(), budget.max_bytes // shards if budget.max_bytes is not None else None)
+        received = 0
+        async for bookmark_id, is_accessible, error_details, details in iter_sharded(
+            _check_shard, partitions, args=(per_shard, retry_policy, self.transport, shard_budget)
+        ):
+            received += 1
+            if budget:
+                budget.settle((details or {}).get("bandwidth_bytes", 0), (details or {}).get("response_time") or 0.0)
+            yield by_id[bookmark_id], is_accessible, error_details, details
+        if budget and received < len(bookmarks):
+            if budget.remaining_seconds() == 0:
+                budget.expire()
+            else:
+                budget.stop_reason = budget.stop_reason or STOP_BYTES
+
+    async def iter_broken_bookmarks(
+        self,
+        include_details: bool = False,
+        concurrency: int = CHECK_CONCURRENCY,
+        write_batch_size: int = CACHE_WRITE_BATCH_SIZE,
+        retry_policy: RetryPolicy = RetryPolicy(),
+        shards: int = CHECK_SHARDS,
+        budget: Optional[RunBudget] = None,
+        resumable: bool = True,
+        progress: Optional[ValidationProgress] = None,
+    ) -> AsyncIterator[Tuple[BookmarkResponse, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """Stream broken bookmarks as they are found.
+
+        Fresh cache entries are looked up in bulk and answered first. The rest are
+        checked by ``check_bookmarks`` (``concurrency`` checks in flight), or with
+        ``shards`` > 1 by that many worker processes split by hostname. Either way
+        results are written to SQLite in batches from this process only.
+
+        With a ``budget`` the network stage stops once the deadline or byte budget
+        is used up; ``budget.report`` then lists the bookmarks deferred to a later
+        run, most valuable first.
+
+        When ``resumable``, the network work is recorded as a validation run that
+        is checkpointed as results are written. A run that is killed, cut short by
+        its budget or closed early is resumed by the next call: bookmarks it
+        already checked are answered from the cache, the rest keep their order.
+
+        ``progress``, if given, receives every settled bookmark (cache hit or
+        network check) and the live counters, e.g. for an SSE stream.
+        """
         if not self._loaded:
             self.load_data()
 
         logger.info("\n🔎 Checking for broken bookmarks...")
-        def is_cache_fresh(entry, max_age_hours=CACHE_FRESHNESS_HOURS):
+        def is_cache_fresh(entry):
             if not entry or not entry.last_checked:
                 return False
             last_checked = datetime.fromisoformat(entry.last_checked)
-            return datetime.utcnow() - last_checked < timedelta(hours=max_age_hours)
+            return datetime.utcnow() - last_checked < timedelta(hours=cache_max_age_hours(entry.error_details))
+
+        def to_response(bookmark) -> BookmarkResponse:
+            return BookmarkResponse(
+                id=bookmark.id,
+                name=bookmark.name,
+                url=bookmark.url.full,
+                type="url",
+                date_added=bookmark.date_added,
+                date_last_used=bookmark.date_last_used
+            )
 
         bookmarks_to_check = [b for b in self._bookmarks if b.url]
         total = len(bookmarks_to_check)
+        if progress:
+            progress.set_total(total)
         cache_hits = 0
-        cache_misses = 0
         network_checks = 0
         broken_count = 0
         completed = 0
-        broken_ids = set()
 
-        async def check_bookmark(bookmark):
-            nonlocal cache_hits, cache_misses, network_checks, broken_count, completed
-            cache_entry = sqlite_cache.get(bookmark.id)
-            if is_cache_fresh(cache_entry):
-                cache_hits += 1
-                completed += 1
-                if cache_entry.broken_status == "broken":
-                    broken_count += 1
-                    broken_ids.add(bookmark.id)
-                    logger.info(f"💾 [CACHE] Broken: {bookmark.name} ({bookmark.url.full}) - {cache_entry.error_details.get('message', '') if cache_entry.error_details else ''}")
-                    return (
-                        BookmarkResponse(
-                            id=bookmark.id,
-                            name=bookmark.name,
-                            url=bookmark.url.full,
-                            type="url",
-                            date_added=bookmark.date_added,
-                            date_last_used=bookmark.date_last_used
-                        ),
-                        cache_entry.error_details,
-                        cache_entry.error_details if include_details else None
-                    )
-                else:
-                    logger.info(f"💾 [CACHE] OK: {bookmark.name} ({bookmark.url.full})")
-                    return None
-            # Otherwise, perform network check
-            cache_misses += 1
-            logger.info(f"🌐 [NET] Checking: {bookmark.name} ({bookmark.url.full}) ...")
-            is_accessible, error_details, details = await self._check_url_accessible(bookmark.url.full)
-            now = datetime.utcnow().isoformat()
-            broken_status = "broken" if not is_accessible else "ok"
-            entry = BookmarkCacheEntry(
-                id=bookmark.id,
-                url=bookmark.url.full,
-                name=bookmark.name,
-                last_checked=now,
-                broken_status=broken_status,
-                error_details=error_details_to_dict(error_details)
-            )
-            sqlite_cache.upsert(entry)
-            print(f"{PURPLE}💾 [DB] Saved: {bookmark.name} ({bookmark.url.full}) as {broken_status}{RESET}")
-            network_checks += 1
+        def log_progress():
+            if completed % 10 == 0 or completed == total:
+                logger.info(f"📊 Progress: {completed}/{total} | Broken: {broken_count} | Cache hits: {cache_hits} | Misses: {total - cache_hits} | Network: {network_checks}")
+
+        # Stage 1: bulk cache lookup
+        cache_entries = sqlite_cache.get_many([b.id for b in bookmarks_to_check])
+        run = validation_runs.resume(RUN_BROKEN) if resumable else None
+        if run:
+            run.reconcile(cache_entries)
+        pending = []
+        for bookmark in bookmarks_to_check:
+            cache_entry = cache_entries.get(bookmark.id)
+            # Bookmarks already checked by the run being resumed count as fresh
+            done_in_run = run is not None and bookmark.id in run.done and cache_entry is not None
+            if not (done_in_run or is_cache_fresh(cache_entry)):
+                pending.append(bookmark)
+                continue
+            cache_hits += 1
             completed += 1
-            if not is_accessible:
+            log_progress()
+            if progress:
+                progress.record(
+                    bookmark.id, bookmark.url.full, "cache", cache_entry.broken_status == "broken",
+                    cache_entry.error_details, cache_entry.error_details
+                )
+            if cache_entry.broken_status == "broken":
                 broken_count += 1
-                broken_ids.add(bookmark.id)
-                logger.info(f"❌ [NET] Broken: {bookmark.name} ({bookmark.url.full}) - {error_details.message}")
-                return (
-                    BookmarkResponse(
-                        id=bookmark.id,
-                        name=bookmark.name,
-                        url=bookmark.url.full,
-                        type="url",
-                        date_added=bookmark.date_added,
-                        date_last_used=bookmark.date_last_used
-                    ),
-                    error_details_to_dict(error_details),
-                    details if include_details else None
+                logger.info(f"💾 [CACHE] Broken: {bookmark.name} ({bookmark.url.full}) - {cache_entry.error_details.get('message', '') if cache_entry.error_details else ''}")
+                yield (
+                    to_response(bookmark),
+                    cache_entry.error_details,
+                    cache_entry.error_details if include_details else None
                 )
             else:
-                logger.info(f"✅ [NET] OK: {bookmark.name} ({bookmark.url.full})")
-            return None
+                logger.debug(f"💾 [CACHE] OK: {bookmark.name} ({bookmark.url.full})")
 
-        results = []
-        for idx, b in enumerate(bookmarks_to_check):
-            result = await check_bookmark(b)
-            results.append(result)
-            if (idx + 1) % 10 == 0 or (idx + 1) == total:
-                logger.info(f"📊 Progress: {idx + 1}/{total} | Broken: {broken_count} | Cache hits: {cache_hits} | Misses: {cache_misses} | Network: {network_checks}")
-        broken_bookmarks = [r for r in results if r is not None]
-        logger.info(f"\n📊 Broken bookmarks summary: {broken_count} broken, {cache_hits} cache hits, {cache_misses} cache misses, {network_checks} network checks, {total} total.")
-        return broken_bookmarks
+        if run:
+            # Carry on in the interrupted run's queue order
+            pending = run.order(pending)
+        else:
+            # Most valuable re-checks first, then round-robin across hosts so large hosts
+            # are paced without starving the rest (each host keeps its priority order)
+            pending = prioritize(pending, cache_entries, sqlite_cache.get_history_many([b.id for b in pending]))
+            pending = interleave_by_host(pending, key=lambda b: b.url.hostname)
+            if resumable and pending:
+                run = validation_runs.start(RUN_BROKEN, [(b.id, b.url.full) for b in pending])
+
+        if shards > 1 and pending:
+            # Stages 2-3 run in worker processes; this process stays the only writer
+            outcomes = self._check_sharded(pending, shards, concurrency, retry_policy, budget)
+        else:
+            outcomes = self.check_bookmarks(pending, concurrency=concurrency, retry_policy=retry_policy, budget=budget, progress=progress)
+        checked: Set[str] = set()
+        write_buffer: List[BookmarkCacheEntry] = []
+
+        def flush_writes():
+            if write_buffer:
+                sqlite_cache.upsert_many(write_buffer)
+                print(f"{PURPLE}💾 [DB] Saved {len(write_buffer)} results{RESET}")
+                if run:
+                    # Checkpoint only after the results are durable
+                    run.mark_done([entry.id for entry in write_buffer])
+                write_buffer.clear()
+
+        try:
+            async for bookmark, is_accessible, error_details, details in outcomes:
+                checked.add(bookmark.id)
+                write_buffer.append(self.result_cache_entry(bookmark, is_accessible, error_details, details))
+                if progress:
+                    progress.record(bookmark.id, bookmark.url.full, "network", not is_accessible, error_details_to_dict(error_details), details)
+                if len(write_buffer) >= write_batch_size:
+                    flush_writes()
+                network_checks += 1
+                completed += 1
+                log_progress()
+                if not is_accessible:
+                    broken_count += 1
+                    logger.info(f"❌ [NET] Broken: {bookmark.name} ({bookmark.url.full}) - {error_details.message}")
+                    yield (
+                        to_response(bookmark),
+                        error_details_to_dict(error_details),
+                        details if include_details else None
+                    )
+                else:
+                    logger.info(f"✅ [NET] OK: {bookmark.name} ({bookmark.url.full})")
+        finally:
+            # Runs on normal completion and when the consumer stops early (aclose / cancellation)
+            await outcomes.aclose()
+            flush_writes()
+            if progress:
+                progress.finish()
+            if run:
+                run.finish()
+            if budget:
+                report = budget.finish(len(checked), [b.url.full for b in pending if b.id not in checked])
+                logger.info(f"⏳ Budgeted run: {report.summary()}")
+
+        logger.info(f"\n📊 Broken bookmarks summary: {broken_count} broken, {cache_hits} cache hits, {total - cache_hits} cache misses, {network_checks} network checks, {total} total.")
 
     def get_bookmark_analysis(self) -> Dict[str, Any]:
         if not self._loaded:
@@ -765,4 +882,57 @@ class BookmarkStore:
             # Reload the data
             self.load_data()
             return True
-        return False 
\ No newline at end of file
+        return False 
+
+    def rewrite_redirected_urls(self, apply: bool = False) -> List[Tuple[Bookmark, str]]:
+        """Bookmarks whose URL permanently redirects (per the redirect cache), with
+        the URL they end up at. With ``apply`` the bookmarks file is rewritten to
+        point at those final URLs, so checks no longer follow the hops at all."""
+        if not self._loaded:
+            self.load_data()
+
+        rewrites = []
+        for bookmark in self._bookmarks:
+            if bookmark.url:
+                target, hops = redirect_cache.resolve(bookmark.url.full)
+                if hops:
+                    rewrites.append((bookmark, target))
+        if not apply or not rewrites:
+            return rewrites
+
+        targets = {bookmark.id: target for bookmark, target in rewrites}
+        bookmark_bar = self._bookmarks_json.get('roots', {}).get('bookmark_bar', {})
+
+        def _rewrite(node: dict) -> None:
+            if node["type"] == "url" and node["id"] in targets:
+                node["url"] = targets[node["id"]]
+            for child in node.get("children", []):
+                _rewrite(child)
+
+        _rewrite(bookmark_bar)
+        with open(self.bookmarks_file_path, "w") as file:
+            json.dump(self._bookmarks_json, file, indent=2)
+        self._traverse_bookmark_bar(bookmark_bar)
+        logger.info(f"↪️  Rewrote {len(rewrites)} bookmarks to their permanent redirect targets")
+        return rewrites
+
+async def _check_shard(
+    bookmarks: List[Bookmark],
+    concurrency: int,
+    retry_policy: RetryPolicy,
+    transport: str,
+    budget: Optional[Tuple[Optional[float], Optional[int]]] = None,
+) -> AsyncIterator[Tuple[str, bool, ErrorDetails, Optional[Dict[str, Any]]]]:
+    """Worker-process side of ``BookmarkStore._check_sharded``: check one shard on
+    this process's own event loop and connection pools, reporting by bookmark id."""
+    # Hosts never straddle shards, so in-process coalescing is enough; skip the lease table
+    store = BookmarkStore("", transport=transport, persist_url_results=False, checks=SingleFlight())
+    # (deadline_seconds, max_bytes) for this shard, started afresh on this process's clock
+    run_budget = RunBudget(*budget) if budget else None
+    try:
+        async for bookmark, is_accessible, error_details, details in store.check_bookmarks(
+            bookmarks, concurrency=concurrency, retry_policy=retry_policy, budget=run_budget
+        ):
+            yield bookmark.id, is_accessible, error_details, details
+    finally:
+        await store.close()
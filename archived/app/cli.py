@@ -8,7 +8,8 @@ import os
 import asyncio
 
 from app.bookmarks_data import BookmarkStore
-from app.config import logger
+from app.pipeline.budget import RunBudget
+from app.config import logger, CHECK_SHARDS
 
 
 def setup_argparse() -> argparse.ArgumentParser:
@@ -51,10 +52,37 @@ def setup_argparse() -> argparse.ArgumentParser:
         action="store_true",
         help="Include detailed URL check information"
     )
+    broken_parser.add_argument(
+        "--shards",
+        type=int,
+        default=CHECK_SHARDS,
+        help="Worker processes for network checks, split by hostname (default: %(default)s)"
+    )
+    broken_parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Stop network checks after this many seconds; the rest is deferred"
+    )
+    broken_parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Stop network checks before downloading more than this many bytes"
+    )
     
     # Analysis command
     analysis_parser = subparsers.add_parser("analyze", help="Show detailed bookmark analysis")
     
+    # Redirects command
+    redirects_parser = subparsers.add_parser(
+        "redirects",
+        help="List bookmarks that permanently redirect, optionally rewriting them to their final URLs"
+    )
+    redirects_parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Rewrite the bookmarks file (close Chrome first, it overwrites the file)"
+    )
+    
     # Delete command
     delete_parser = subparsers.add_parser("delete", help="Delete a bookmark")
     delete_parser.add_argument("title", help="Title of the bookmark to delete")
@@ -112,15 +140,16 @@ def print_unvisited(store: BookmarkStore) -> None:
         print(f"   Added: {added_date}")
 
 
-async def print_broken(store: BookmarkStore, include_details: bool = False) -> None:
-    """Print broken bookmarks."""
-    broken = await store.get_broken_bookmarks(include_details=include_details)
-    if not broken:
-        print("No broken bookmarks found.")
-        return
-        
-    print(f"\nFound {len(broken)} broken bookmarks:")
-    for bookmark, error, details in broken:
+async def print_broken(
+    store: BookmarkStore,
+    include_details: bool = False,
+    shards: int = CHECK_SHARDS,
+    budget: Optional[RunBudget] = None,
+) -> None:
+    """Print broken bookmarks as they are found."""
+    found = 0
+    async for bookmark, error, details in store.iter_broken_bookmarks(include_details=include_details, shards=shards, budget=budget):
+        found += 1
         added_date = store.chrome_time_to_str(bookmark.date_added)
         print(f"\n🔖 {bookmark.name}")
         print(f"   URL: {bookmark.url}")
@@ -142,6 +171,26 @@ async def print_broken(store: BookmarkStore, include_details: bool = False) -> N
             if details.get("final_url") and details["final_url"] != bookmark.url:
                 print(f"   - Final URL: {details['final_url']}")
 
+    if not found:
+        print("No broken bookmarks found.")
+    else:
+        print(f"\nFound {found} broken bookmarks.")
+
+    if budget and budget.report:
+        print(f"\n⏳ Budget: {budget.report.summary()}")
+        for url in budget.report.deferred[:10]:
+            print(f"   deferred: {url}")
+        if len(budget.report.deferred) > 10:
+            print(f"   ... and {len(budget.report.deferred) - 10} more")
+
+
+async def run_broken(store: BookmarkStore, *args) -> None:
+    """``print_broken``, then close the store's check connections on the same event loop."""
+    try:
+        await print_broken(store, *args)
+    finally:
+        await store.close()
+
 
 def print_analysis(store: BookmarkStore) -> None:
     """Print detailed bookmark analysis."""
@@ -177,6 +226,22 @@ def print_analysis(store: BookmarkStore) -> None:
                 print(f"  - {bm['name']}")
 
 
+def print_redirects(store: BookmarkStore, apply: bool) -> None:
+    """List (and with ``apply``, rewrite) bookmarks behind permanent redirects."""
+    rewrites = store.rewrite_redirected_urls(apply=apply)
+    if not rewrites:
+        print("No bookmarks behind cached permanent redirects (run `broken` first to record them).")
+        return
+    for bookmark, target in rewrites:
+        print(f"↪️  {bookmark.name}")
+        print(f"   {bookmark.url.full}")
+        print(f"   -> {target}")
+    if apply:
+        print(f"\nRewrote {len(rewrites)} bookmarks.")
+    else:
+        print(f"\n{len(rewrites)} bookmarks can be rewritten; run again with --apply to do it.")
+
+
 def delete_bookmark(store: BookmarkStore, title: str) -> None:
     """Delete a bookmark by title."""
     if store.delete_bookmark_by_title(title):
@@ -226,11 +291,17 @@ def main() -> Optional[int]:
         print_unvisited(store)
         
     elif args.command == "broken":
-        asyncio.run(print_broken(store, args.details))
+        budget = None
+        if args.deadline is not None or args.max_bytes is not None:
+            budget = RunBudget(deadline_seconds=args.deadline, max_bytes=args.max_bytes)
+        asyncio.run(run_broken(store, args.details, args.shards, budget))
         
     elif args.command == "analyze":
         print_analysis(store)
         
+    elif args.command == "redirects":
+        print_redirects(store, args.apply)
+        
     elif args.command == "delete":
         delete_bookmark(store, args.title)
         
@@ -7,6 +7,136 @@ K_RESULTS = 3
 # Cache freshness duration in hours (default: 7 days)
 CACHE_FRESHNESS_HOURS = int(os.getenv("CACHE_FRESHNESS_HOURS", 168))
 
+# Number of URL checks kept in flight by the broken-bookmark pipeline
+CHECK_CONCURRENCY = int(os.getenv("CHECK_CONCURRENCY", 20))
+# HTTP client used by URL checks: "aiohttp" or "raw" (lean asyncio HTTP/1.1 prober)
+CHECK_TRANSPORT = os.getenv("CHECK_TRANSPORT", "aiohttp")
+# Checks start at the end of a URL's cached permanent (301/308) redirects; the
+# full chain is followed again once the cached hops are this old
+REDIRECT_SHORTCUT_MAX_AGE_DAYS = float(os.getenv("REDIRECT_SHORTCUT_MAX_AGE_DAYS", 30))
+# Worker processes for network checks; bookmarks are split between them by hostname
+CHECK_SHARDS = int(os.getenv("CHECK_SHARDS", 1))
+# Number of check results written to SQLite per transaction
+CACHE_WRITE_BATCH_SIZE = int(os.getenv("CACHE_WRITE_BATCH_SIZE", 50))
+
+# Per-host politeness: token bucket rate/burst and concurrent requests per host
+HOST_RATE_PER_SECOND = float(os.getenv("HOST_RATE_PER_SECOND", 2))
+HOST_BURST = int(os.getenv("HOST_BURST", 4))
+HOST_MAX_CONCURRENCY = int(os.getenv("HOST_MAX_CONCURRENCY", 2))
+# Concurrent requests to hosts sharing a backend: hosts whose resolved address
+# falls in the same IPv4 /IP_GROUP_PREFIX (IPv6 /64) network share this cap
+IP_MAX_CONCURRENCY = int(os.getenv("IP_MAX_CONCURRENCY", 6))
+IP_GROUP_PREFIX = int(os.getenv("IP_GROUP_PREFIX", 24))
+# Per-domain overrides (JSON), matched on the domain and its subdomains
+HOST_POLICY_OVERRIDES = json.loads(os.getenv(
+    "HOST_POLICY_OVERRIDES",
+    '{"github.com": {"rate": 1, "burst": 3, "concurrency": 2}}'
+))
+# Longest Retry-After we are willing to wait for; back-off used for 429s without one
+MAX_RETRY_AFTER_SECONDS = float(os.getenv("MAX_RETRY_AFTER_SECONDS", 60))
+DEFAULT_RATE_LIMIT_BACKOFF_SECONDS = float(os.getenv("DEFAULT_RATE_LIMIT_BACKOFF_SECONDS", 5))
+
+# Host health circuit breaker: failures before a host (or, for refused
+# connections, a host:port) is marked down, and how long it stays down before a
+# single probe is let through again
+HOST_FAILURE_THRESHOLD = int(os.getenv("HOST_FAILURE_THRESHOLD", 1))
+HOST_DOWN_SECONDS = int(os.getenv("HOST_DOWN_SECONDS", 21600))
+
+# Cross-process single-flight leases: lifetime of a lease (so a crashed holder
+# cannot block a URL forever) and how often waiters poll for it
+CHECK_LEASE_SECONDS = int(os.getenv("CHECK_LEASE_SECONDS", 120))
+CHECK_LEASE_POLL_SECONDS = float(os.getenv("CHECK_LEASE_POLL_SECONDS", 0.25))
+
+# Retries for transient failures (timeouts, 502/503/504, connection resets):
+# attempts per URL including the first, and the exponential back-off range.
+# Failures still transient after the last attempt are re-checked after
+# TRANSIENT_FAILURE_CACHE_HOURS instead of CACHE_FRESHNESS_HOURS
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", 2))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", 60))
+TRANSIENT_FAILURE_CACHE_HOURS = int(os.getenv("TRANSIENT_FAILURE_CACHE_HOURS", 6))
+
+# Run budgets (--deadline / --max-bytes): assumed cost of one check until the
+# run has measured its own average
+BUDGET_CHECK_BYTES_ESTIMATE = int(os.getenv("BUDGET_CHECK_BYTES_ESTIMATE", 2048))
+BUDGET_CHECK_SECONDS_ESTIMATE = float(os.getenv("BUDGET_CHECK_SECONDS_ESTIMATE", 1))
+
+# Background revalidation inside the API server: checks in flight per batch, and
+# checks per minute (0 = spread every bookmark evenly over CACHE_FRESHNESS_HOURS).
+# With nothing stale it looks again after REVALIDATION_DAEMON_IDLE_SECONDS
+REVALIDATION_DAEMON_ENABLED = os.getenv("REVALIDATION_DAEMON_ENABLED", "1") == "1"
+REVALIDATION_DAEMON_CONCURRENCY = int(os.getenv("REVALIDATION_DAEMON_CONCURRENCY", 4))
+REVALIDATION_DAEMON_RATE_PER_MINUTE = float(os.getenv("REVALIDATION_DAEMON_RATE_PER_MINUTE", 0))
+REVALIDATION_DAEMON_IDLE_SECONDS = float(os.getenv("REVALIDATION_DAEMON_IDLE_SECONDS", 300))
+
+# Validation jobs API: a fixed pool of job workers (one job each at a time) with
+# VALIDATION_JOB_CONCURRENCY checks in flight per job, so total load is capped at
+# their product. Submissions beyond VALIDATION_JOB_QUEUE_SIZE waiting jobs are
+# refused; the last VALIDATION_JOB_HISTORY finished jobs stay queryable
+VALIDATION_JOB_WORKERS = int(os.getenv("VALIDATION_JOB_WORKERS", 2))
+VALIDATION_JOB_CONCURRENCY = int(os.getenv("VALIDATION_JOB_CONCURRENCY", 10))
+VALIDATION_JOB_QUEUE_SIZE = int(os.getenv("VALIDATION_JOB_QUEUE_SIZE", 20))
+VALIDATION_JOB_HISTORY = int(os.getenv("VALIDATION_JOB_HISTORY", 100))
+
+# Revalidation priority: weights of the score components (see app.pipeline.priority)
+# and the half-life, in days, of a bookmark's last use
+REVALIDATION_WEIGHTS = json.loads(os.getenv(
+    "REVALIDATION_WEIGHTS",
+    '{"staleness": 0.4, "flakiness": 0.2, "last_used": 0.25, "status": 0.15}'
+))
+LAST_USED_HALF_LIFE_DAYS = float(os.getenv("LAST_USED_HALF_LIFE_DAYS", 30))
+
+# DNS resolver cache lifetimes in seconds (positive answers / failed lookups)
+DNS_POSITIVE_TTL_SECONDS = int(os.getenv("DNS_POSITIVE_TTL_SECONDS", 21600))
+DNS_NEGATIVE_TTL_SECONDS = int(os.getenv("DNS_NEGATIVE_TTL_SECONDS", 3600))
+# Maximum number of concurrent DNS lookups
+DNS_CONCURRENCY = int(os.getenv("DNS_CONCURRENCY", 50))
+
+# TCP probe: connect timeout, how long a per-host reachability verdict is reused
+# and the maximum number of concurrent connects
+TCP_TIMEOUT_SECONDS = float(os.getenv("TCP_TIMEOUT_SECONDS", 3))
+TCP_CACHE_TTL_SECONDS = int(os.getenv("TCP_CACHE_TTL_SECONDS", 3600))
+TCP_CONCURRENCY = int(os.getenv("TCP_CONCURRENCY", 50))
+# How long the probe's connection is kept open for the HTTP request to reuse
+# (0 closes it right away)
+TCP_HANDOFF_SECONDS = float(os.getenv("TCP_HANDOFF_SECONDS", 5))
+
+# TLS probe: handshake timeout, how long a per-host certificate verdict is reused
+# and the maximum number of concurrent handshakes
+TLS_TIMEOUT_SECONDS = float(os.getenv("TLS_TIMEOUT_SECONDS", 3))
+TLS_CACHE_TTL_SECONDS = int(os.getenv("TLS_CACHE_TTL_SECONDS", 3600))
+TLS_CONCURRENCY = int(os.getenv("TLS_CONCURRENCY", 50))
+# How long the handshaken connection is kept open for the HTTP request to reuse
+# (0 closes it right away)
+TLS_HANDOFF_SECONDS = float(os.getenv("TLS_HANDOFF_SECONDS", 5))
+
+# Maximum number of HTTP requests in flight across all hosts (per-host limits
+# are the scheduler's)
+HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", 50))
+
+# Learned per-domain check strategies: a domain's HEAD history decides its first
+# request once it has STRATEGY_MIN_OBSERVATIONS answers; domains learned to need
+# a GET try HEAD again after STRATEGY_REPROBE_DAYS in case that changed
+STRATEGY_MIN_OBSERVATIONS = int(os.getenv("STRATEGY_MIN_OBSERVATIONS", 2))
+STRATEGY_REPROBE_DAYS = float(os.getenv("STRATEGY_REPROBE_DAYS", 30))
+
+# Walled hosts: after WALL_CONFIRM_CHECKS answers in a row from a bot wall or
+# login wall (401/403/999 or a login page) a host's other URLs are classified
+# without a request; one URL per host is sampled every WALL_SAMPLE_HOURS
+WALL_CONFIRM_CHECKS = int(os.getenv("WALL_CONFIRM_CHECKS", 3))
+WALL_SAMPLE_HOURS = float(os.getenv("WALL_SAMPLE_HOURS", 24))
+
+# Adaptive per-host timeouts: once a host has LATENCY_MIN_SAMPLES recorded
+# responses its timeout becomes p95 x ADAPTIVE_TIMEOUT_MULTIPLIER, clamped to
+# [ADAPTIVE_TIMEOUT_MIN_SECONDS, ADAPTIVE_TIMEOUT_MAX_SECONDS]
+LATENCY_MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", 5))
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", 50))
+ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", 4))
+ADAPTIVE_TIMEOUT_MIN_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_SECONDS", 3))
+ADAPTIVE_TIMEOUT_MAX_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_MAX_SECONDS", 30))
+# Send a second (hedged) request once the first has run past the host's p95
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "1") == "1"
+
 
 def load_logging_config():
     try:
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import logger
+from app.config import (
+    CACHE_FRESHNESS_HOURS,
+    REVALIDATION_DAEMON_CONCURRENCY,
+    REVALIDATION_DAEMON_RATE_PER_MINUTE,
+    REVALIDATION_DAEMON_IDLE_SECONDS,
+)
+from app.models import Bookmark
+from app.pipeline.priority import prioritize
+from app.sqlite_cache import SQLiteBookmarkCache, sqlite_cache
+
+
+class RevalidationDaemon:
+    """Keeps the check cache fresh in the background of the API server.
+
+    Stale bookmarks (from ``get_stale``, plus any never checked) are revalidated
+    in small batches, most valuable first. Batches are paced to ``rate`` checks
+    per second, which by default spreads every bookmark evenly over the
+    CACHE_FRESHNESS_HOURS window, so freshness never depends on a big burst of
+    checks inside a request.
+    """
+
+    def __init__(
+        self,
+        store,
+        cache: Optional[SQLiteBookmarkCache] = None,
+        concurrency: int = REVALIDATION_DAEMON_CONCURRENCY,
+        rate_per_minute: float = REVALIDATION_DAEMON_RATE_PER_MINUTE,
+        freshness_hours: float = CACHE_FRESHNESS_HOURS,
+        idle_seconds: float = REVALIDATION_DAEMON_IDLE_SECONDS,
+    ):
+        self.store = store
+        self.cache = cache or sqlite_cache
+        self.concurrency = concurrency
+        self.rate_per_minute = rate_per_minute
+        self.freshness_hours = freshness_hours
+        self.idle_seconds = idle_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {"checked": 0, "broken": 0, "batches": 0, "errors": 0, "last_batch_at": None}
+
+    @property
+    def rate(self) -> float:
+        """Checks per second."""
+        if self.rate_per_minute > 0:
+            return self.rate_per_minute / 60
+        total = sum(1 for b in self.store._bookmarks if b.url)
+        return max(total, 1) / (self.freshness_hours * 3600)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def due(self, limit: int) -> List[Bookmark]:
+        """Up to ``limit`` bookmarks that need a check, most valuable first."""
+        # The cache reads are blocking SQLite queries; keep them off the server's event loop
+        loop = asyncio.get_running_loop()
+        bookmarks = {b.id: b for b in self.store._bookmarks if b.url}
+        stale_entries = await loop.run_in_executor(None, self.cache.get_stale, self.freshness_hours)
+        stale = {e.id: e for e in stale_entries if e.id in bookmarks}
+        known = await loop.run_in_executor(None, self.cache.get_many, list(bookmarks))
+        ids = list(stale) + [id for id in bookmarks if id not in known]
+        history = await loop.run_in_executor(None, self.cache.get_history_many, ids)
+        ordered = prioritize([bookmarks[id] for id in ids], stale, history)
+        return ordered[:limit]
+
+    async def revalidate(self, batch: List[Bookmark]) -> None:
+        entries = []
+        async for bookmark, is_accessible, error_details, details in self.store.check_bookmarks(
+            batch, concurrency=self.concurrency
+        ):
+            entries.append(self.store.result_cache_entry(bookmark, is_accessible, error_details, details))
+            if not is_accessible:
+                self.stats["broken"] += 1
+        await asyncio.get_running_loop().run_in_executor(None, self.cache.upsert_many, entries)
+        self.stats["checked"] += len(entries)
+        self.stats["batches"] += 1
+        self.stats["last_batch_at"] = datetime.utcnow().isoformat()
+
+    async def run(self) -> None:
+        logger.info(f"🔄 Revalidation daemon started: {self.rate * 3600:.1f} checks/hour, {self.concurrency} in flight")
+        while True:
+            started = time.monotonic()
+            batch: List[Bookmark] = []
+            try:
+                batch = await self.due(self.concurrency)
+                if batch:
+                    await self.revalidate(batch)
+            except Exception as e:
+                # Keep the daemon alive; unfinished bookmarks are still due on the next pass
+                self.stats["errors"] += 1
+                logger.warning(f"⚠️  Revalidation batch failed: {e}")
+            if not batch:
+                await asyncio.sleep(self.idle_seconds)
+                continue
+            # Pace so that, on average, checks start at ``rate``
+            await asyncio.sleep(max(0.0, len(batch) / self.rate - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"🔄 Revalidation daemon stopped after {self.stats['checked']} checks")
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self.running, "rate_per_hour": self.rate * 3600, **self.stats}
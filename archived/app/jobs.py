@@ -0,0 +1,228 @@
+import asyncio
+import itertools
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import logger
+from app.config import (
+    CACHE_FRESHNESS_HOURS,
+    CACHE_WRITE_BATCH_SIZE,
+    VALIDATION_JOB_WORKERS,
+    VALIDATION_JOB_CONCURRENCY,
+    VALIDATION_JOB_QUEUE_SIZE,
+    VALIDATION_JOB_HISTORY,
+)
+from app.models import Bookmark
+from app.pipeline.progress import ValidationProgress
+from app.sqlite_cache import SQLiteBookmarkCache, BookmarkCacheEntry, sqlite_cache
+
+# Job scopes; "folder" takes a folder id or name, "domain" a hostname (subdomains included)
+SCOPES = ("all", "stale", "broken", "folder", "domain")
+SCOPES_WITH_VALUE = ("folder", "domain")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are waiting; the caller should retry later."""
+
+
+@dataclass
+class ValidationJob:
+    id: str
+    scope: str
+    value: Optional[str] = None
+    status: str = QUEUED
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    progress: ValidationProgress = field(default_factory=ValidationProgress)
+    broken: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple[str, Optional[str]]:
+        """Jobs with the same key do the same work, so a new one merges into a live one."""
+        return self.scope, self.value
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "scope": self.scope,
+            "value": self.value,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "error": self.error,
+            "progress": self.progress.snapshot(),
+        }
+        if include_results:
+            data["broken"] = self.broken
+        return data
+
+
+def normalize_scope(scope: str, value: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Validate a scope and canonicalise its value; raises ValueError."""
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown scope {scope!r}, expected one of {list(SCOPES)}")
+    if scope in SCOPES_WITH_VALUE:
+        value = (value or "").strip()
+        if not value:
+            raise ValueError(f"Scope {scope!r} needs a value")
+        if scope == "domain":
+            value = value.lower().rstrip(".")
+        return scope, value
+    return scope, None
+
+
+def _folder_url_ids(children: List[dict]) -> List[str]:
+    ids = []
+    for node in children:
+        if node.get("type") == "url":
+            ids.append(node["id"])
+        elif node.get("type") == "folder":
+            ids.extend(_folder_url_ids(node.get("children", [])))
+    return ids
+
+
+class ValidationJobManager:
+    """Runs validation jobs submitted through the API.
+
+    Jobs wait in a bounded queue and a fixed pool of ``workers`` runs them, one
+    job per worker with ``concurrency`` checks in flight each, so the total load
+    is capped however many jobs are submitted. Submitting a job identical to one
+    still queued or running returns that job instead of adding work.
+    """
+
+    def __init__(
+        self,
+        store,
+        cache: Optional[SQLiteBookmarkCache] = None,
+        workers: int = VALIDATION_JOB_WORKERS,
+        concurrency: int = VALIDATION_JOB_CONCURRENCY,
+        max_queued: int = VALIDATION_JOB_QUEUE_SIZE,
+        history: int = VALIDATION_JOB_HISTORY,
+        freshness_hours: float = CACHE_FRESHNESS_HOURS,
+    ):
+        self.store = store
+        self.cache = cache or sqlite_cache
+        self.workers = workers
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.history = history
+        self.freshness_hours = freshness_hours
+        self.jobs: "OrderedDict[str, ValidationJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        return self._queue
+
+    def submit(self, scope: str, value: Optional[str] = None) -> Tuple[ValidationJob, bool]:
+        """Queue a job, returning (job, merged). Raises ValueError for a bad scope
+        and JobQueueFull when the queue is at capacity."""
+        scope, value = normalize_scope(scope, value)
+        for job in self.jobs.values():
+            if job.active and job.key == (scope, value):
+                return job, True
+        queue = self._ensure_started()
+        job = ValidationJob(id=uuid.uuid4().hex[:12], scope=scope, value=value)
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{queue.qsize()} validation jobs already queued")
+        self.jobs[job.id] = job
+        self._trim_history()
+        logger.info(f"📥 Queued validation job {job.id} ({scope}{': ' + value if value else ''})")
+        return job, False
+
+    def get(self, job_id: str) -> Optional[ValidationJob]:
+        return self.jobs.get(job_id)
+
+    def _trim_history(self) -> None:
+        finished = [id for id, job in self.jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self.jobs) - self.history)]:
+            del self.jobs[job_id]
+
+    def select(self, scope: str, value: Optional[str]) -> List[Bookmark]:
+        """Bookmarks covered by a scope, in bookmark-file order."""
+        bookmarks = [b for b in self.store._bookmarks if b.url]
+        if scope == "all":
+            return bookmarks
+        if scope == "domain":
+            return [b for b in bookmarks if b.url.hostname == value or (b.url.hostname or "").endswith("." + value)]
+        if scope == "folder":
+            ids = set(itertools.chain.from_iterable(
+                _folder_url_ids(folder.children)
+                for folder in self.store._folders if value in (folder.id, folder.name)
+            ))
+            return [b for b in bookmarks if b.id in ids]
+        entries = self.cache.get_many([b.id for b in bookmarks])
+        if scope == "broken":
+            return [b for b in bookmarks if b.id in entries and entries[b.id].broken_status == "broken"]
+        # stale: never checked, or checked longer ago than the freshness window
+        stale = {e.id for e in self.cache.get_stale(self.freshness_hours)}
+        return [b for b in bookmarks if b.id not in entries or b.id in stale]
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ValidationJob) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.utcnow().isoformat()
+        write_buffer: List[BookmarkCacheEntry] = []
+        try:
+            bookmarks = self.select(job.scope, job.value)
+            job.progress.set_total(len(bookmarks))
+            logger.info(f"▶️  Validation job {job.id}: {len(bookmarks)} bookmarks")
+            async for bookmark, is_accessible, error_details, details in self.store.check_bookmarks(
+                bookmarks, concurrency=self.concurrency, progress=job.progress
+            ):
+                entry = self.store.result_cache_entry(bookmark, is_accessible, error_details, details)
+                write_buffer.append(entry)
+                if len(write_buffer) >= CACHE_WRITE_BATCH_SIZE:
+                    self.cache.upsert_many(write_buffer)
+                    write_buffer.clear()
+                job.progress.record(bookmark.id, bookmark.url.full, "network", not is_accessible, entry.error_details, details)
+                if not is_accessible:
+                    job.broken.append({"id": bookmark.id, "name": bookmark.name, "url": bookmark.url.full, "error": entry.error_details})
+            job.status = COMPLETED
+        except Exception as e:
+            logger.error(f"❌ Validation job {job.id} failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            self.cache.upsert_many(write_buffer)
+            job.finished_at = datetime.utcnow().isoformat()
+            job.progress.finish()
+            if job.status == RUNNING:
+                # Cancelled by shutdown
+                job.status = FAILED
+                job.error = "cancelled"
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
@@ -1,9 +1,12 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, Request, HTTPException
 import uvicorn
 from fastapi.responses import JSONResponse
-from app.config import logger
+from app.config import logger, REVALIDATION_DAEMON_ENABLED
 from app import api
 from app.bookmarks_data import BookmarkStore
+from app.daemon import RevalidationDaemon
+from app.jobs import ValidationJobManager
 import os
 from app.models import APIError
 
@@ -13,7 +16,22 @@ CHROME_BOOKMARKS_FILE = os.path.expanduser(
     f"~/Library/Application Support/Google/Chrome/{CHROME_PROFILE_NAME}/Bookmarks"
 )
 
-app = FastAPI(title="Chrome Bookmarks Manager")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background revalidation daemon for as long as the server is up,
+    and stop the validation job workers and live validation and close the check
+    connections on shutdown."""
+    if REVALIDATION_DAEMON_ENABLED:
+        app.state.revalidation_daemon.start()
+    yield
+    await app.state.revalidation_daemon.stop()
+    await app.state.validation_jobs.stop()
+    await api.stop_live_validation()
+    await bookmark_store.close()
+
+
+app = FastAPI(title="Chrome Bookmarks Manager", lifespan=lifespan)
 app.include_router(api.router)
 
 # Create a single BookmarkStore instance
@@ -23,6 +41,13 @@ bookmark_store.load_data()  # Load once at startup
 # Override the dependency to use our instance
 app.dependency_overrides[api.get_bookmark_store] = lambda: bookmark_store
 
+# Keeps the check cache fresh in the background (started by the lifespan)
+app.state.revalidation_daemon = RevalidationDaemon(bookmark_store)
+
+# Runs jobs submitted to /validation-jobs (workers start with the first job)
+app.state.validation_jobs = ValidationJobManager(bookmark_store)
+app.dependency_overrides[api.get_job_manager] = lambda: app.state.validation_jobs
+
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -166,6 +166,13 @@ class AnalysisResponse(BaseModel):
     result: BookmarkAnalysis
 
 
+class ValidationJobRequest(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    scope: Literal["all", "stale", "broken", "folder", "domain"] = "all"
+    value: Optional[str] = None  # folder id or name, or domain
+
+
 class APIError(BaseModel):
     model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
     
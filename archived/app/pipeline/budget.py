@@ -0,0 +1,98 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.config import BUDGET_CHECK_BYTES_ESTIMATE, BUDGET_CHECK_SECONDS_ESTIMATE
+
+# Why a run stopped before covering everything
+STOP_DEADLINE = "deadline"
+STOP_BYTES = "bytes"
+
+
+@dataclass
+class BudgetReport:
+    covered: int
+    deferred: List[str]  # URLs left for a later run, most valuable first
+    bytes_used: int
+    elapsed: float
+    stop_reason: Optional[str] = None
+
+    def summary(self) -> str:
+        line = f"{self.covered} checked, {len(self.deferred)} deferred, {self.bytes_used / 1024:.1f} KB in {self.elapsed:.1f}s"
+        return f"{line} (stopped: {self.stop_reason} budget)" if self.stop_reason else line
+
+
+@dataclass
+class RunBudget:
+    """Wall-clock and/or byte budget for one validation run.
+
+    Admission is projected: a check is only started if the average cost of the
+    checks so far (or the configured estimate, before there are any), on top of
+    what is spent and reserved by checks in flight, still fits. Checks in flight
+    when the deadline passes are cancelled by the caller and count as deferred.
+    """
+
+    deadline_seconds: Optional[float] = None
+    max_bytes: Optional[int] = None
+    bytes_estimate: float = BUDGET_CHECK_BYTES_ESTIMATE
+    seconds_estimate: float = BUDGET_CHECK_SECONDS_ESTIMATE
+    started: float = field(default_factory=time.monotonic)
+    bytes_used: int = 0
+    seconds_used: float = 0.0
+    settled: int = 0
+    in_flight: int = 0
+    stop_reason: Optional[str] = None
+    report: Optional[BudgetReport] = None
+
+    @property
+    def limited(self) -> bool:
+        return self.deadline_seconds is not None or self.max_bytes is not None
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - (time.monotonic() - self.started))
+
+    def expected_bytes(self) -> float:
+        return self.bytes_used / self.settled if self.settled else self.bytes_estimate
+
+    def expected_seconds(self) -> float:
+        return self.seconds_used / self.settled if self.settled else self.seconds_estimate
+
+    def admit(self) -> bool:
+        """Reserve room for one more check, or record why there is none."""
+        if self.stop_reason:
+            return False
+        remaining = self.remaining_seconds()
+        if remaining is not None and remaining < self.expected_seconds():
+            self.stop_reason = STOP_DEADLINE
+            return False
+        if self.max_bytes is not None and self.bytes_used + (self.in_flight + 1) * self.expected_bytes() > self.max_bytes:
+            self.stop_reason = STOP_BYTES
+            return False
+        self.in_flight += 1
+        return True
+
+    def settle(self, nbytes: int, seconds: float) -> None:
+        """Release a reservation with what the check actually cost."""
+        self.in_flight = max(0, self.in_flight - 1)
+        self.bytes_used += nbytes
+        self.seconds_used += seconds
+        self.settled += 1
+
+    def release(self) -> None:
+        """Drop a reservation for a check that never completed (cancelled)."""
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def expire(self) -> None:
+        self.stop_reason = self.stop_reason or STOP_DEADLINE
+
+    def finish(self, covered: int, deferred: List[str]) -> BudgetReport:
+        self.report = BudgetReport(
+            covered=covered,
+            deferred=deferred,
+            bytes_used=self.bytes_used,
+            elapsed=time.monotonic() - self.started,
+            stop_reason=self.stop_reason if deferred else None,
+        )
+        return self.report
@@ -0,0 +1,610 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from urllib.parse import urlparse
+
+from app.config import logger
+from app.config import CHECK_TRANSPORT, HTTP_CONCURRENCY
+from app.pipeline.dns import AsyncResolver, dns_resolver
+from app.pipeline.tcp import TCPProbe, tcp_probe, is_open
+from app.pipeline.tls import TLSProbe, tls_probe
+from app.pipeline.host_health import host_health, FAILURE_DNS, FAILURE_CONNECT
+from app.pipeline.scheduler import host_scheduler
+from app.pipeline.latency import http_latency
+from app.pipeline.strategy import (
+    StrategyLearner, domain_strategies, HEAD, GET_RANGE, HEAD_OK, HEAD_REFUSED, HEAD_BLOCKED,
+)
+from app.pipeline.login import LOGIN_SCAN_BYTES
+from app.pipeline.revalidation import SQLiteValidatorStore, url_validators, extract_validators, NOT_MODIFIED
+from app.pipeline.redirects import Redirect, SQLiteRedirectStore, redirect_cache, chain_to_dicts
+from app.pipeline.timing import RequestTimings
+from app.pipeline.walls import WallTracker, domain_walls, BOT_PROTECTED, LOGIN_WALLED
+from app.pipeline.transport import Connection, Transport, FetchResult, TransportError, ConnectError, create_transport
+from app.pipeline.retry import classify_status, classify_exception, TRANSIENT, DEFINITIVE
+
+
+class ErrorCategory(Enum):
+    DNS_FAILURE = "DNS Failure"
+    SSL_ERROR = "SSL Error"
+    AUTH_REQUIRED = "Authentication Required"
+    NOT_FOUND = "Not Found"
+    SERVER_ERROR = "Server Error"
+    TIMEOUT = "Timeout"
+    CONNECTION_ERROR = "Connection Error"
+    OTHER = "Other"
+
+class ErrorDetails(NamedTuple):
+    category: ErrorCategory
+    message: str
+    status_code: Optional[int] = None
+    technical_details: Optional[Dict[str, Any]] = None
+
+# Statuses of pages that exist but are behind a login or a bot wall (999 is LinkedIn's)
+LOGIN_STATUSES = {401, 403, 999}
+
+def categorize_error(error: str, status_code: Optional[int] = None) -> ErrorDetails:
+    """Categorize an error message into a specific category."""
+    error_lower = error.lower()
+
+    # DNS errors
+    if "dns resolution failed" in error_lower:
+        return ErrorDetails(ErrorCategory.DNS_FAILURE, error)
+
+    # SSL errors
+    if any(ssl_term in error_lower for ssl_term in ["ssl", "certificate", "tls"]):
+        return ErrorDetails(ErrorCategory.SSL_ERROR, error)
+
+    # Authentication errors
+    if status_code in LOGIN_STATUSES or "unauthorized" in error_lower or "forbidden" in error_lower:
+        return ErrorDetails(ErrorCategory.AUTH_REQUIRED, error, status_code)
+
+    # Not found errors
+    if status_code == 404 or "not found" in error_lower:
+        return ErrorDetails(ErrorCategory.NOT_FOUND, error, status_code)
+
+    # Server errors
+    if status_code and 500 <= status_code < 600:
+        return ErrorDetails(ErrorCategory.SERVER_ERROR, error, status_code)
+
+    # Timeout errors
+    if "timeout" in error_lower:
+        return ErrorDetails(ErrorCategory.TIMEOUT, error)
+
+    # Connection errors
+    if any(conn_term in error_lower for conn_term in ["connection", "connect", "network"]):
+        return ErrorDetails(ErrorCategory.CONNECTION_ERROR, error)
+
+    # Other errors
+    return ErrorDetails(ErrorCategory.OTHER, error, status_code)
+
+# Error category reported for URLs short-circuited by the host health circuit breaker
+HOST_FAILURE_CATEGORIES = {
+    FAILURE_DNS: ErrorCategory.DNS_FAILURE,
+    FAILURE_CONNECT: ErrorCategory.CONNECTION_ERROR,
+}
+
+
+def is_reachable_status(status: int) -> bool:
+    """The one verdict every checker shares: the page answered and exists. Login
+    and bot walls count (the page is there, we just may not see it), and so does
+    416, a ranged GET of an empty page."""
+    return status < 400 or status in LOGIN_STATUSES or status == 416
+
+
+# HEAD answers meaning "ask again with GET" under HEAD_WITH_FALLBACK; a 429's
+# Retry-After is waited out by the scheduler before the GET
+HEAD_FALLBACK_STATUSES = {405, 429}
+# HEAD answers teaching a domain's strategy that it does not support HEAD
+HEAD_UNSUPPORTED_STATUSES = {405, 501}
+
+
+class CheckResult(NamedTuple):
+    """Verdict of one URL check; unpacks as (is_accessible, error_details, technical_details)."""
+
+    accessible: bool
+    error: ErrorDetails
+    details: Dict[str, Any]
+
+
+@dataclass
+class CheckContext:
+    """State handed from stage to stage while checking one URL."""
+
+    url: str  # the URL being checked
+    target: str  # the URL requested in its place: the end of its cached permanent redirects, or itself
+    shortcut: List[Redirect] = field(default_factory=list)
+    force: bool = False
+    addresses: List[str] = field(default_factory=list)  # filled by the DNS stage
+    connection: Optional[Connection] = None  # the TCP (or TLS) stage's open connection, for the first request
+    timings: RequestTimings = field(default_factory=RequestTimings)
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        parsed = urlparse(self.target)
+        self.scheme = parsed.scheme
+        self.hostname = parsed.hostname or ""
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.details = {
+            "status_code": None,
+            "content_type": None,
+            "response_time": None,
+            "final_url": None,
+            "redirect_count": len(self.shortcut),
+            "redirect_chain": chain_to_dicts(self.shortcut),
+            "ssl_valid": None,
+            "dns_resolved": None,
+            "tcp_connectable": None,
+            "method_used": None,
+            "login_required": None,
+            **self.details,
+        }
+
+    def fail(self, error: ErrorDetails, failure_kind: Optional[str]) -> CheckResult:
+        self.details["failure_kind"] = failure_kind
+        return CheckResult(False, error, self.details)
+
+    def take_connection(self) -> Optional[Connection]:
+        """The open connection to the target's host, handed out once. One the
+        server closed while the request waited for its slot is dropped."""
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return None
+        if connection.is_closing() if isinstance(connection, asyncio.Transport) else not is_open(connection):
+            connection.close()
+            return None
+        return connection
+
+    def release(self) -> None:
+        """Close a connection no request took."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Stage:
+    """One step of a URL check. ``run`` returns a result to end the check there
+    (a failure, or the HTTP verdict), or None to hand over to the next stage."""
+
+    name = ""
+
+    async def run(self, ctx: CheckContext) -> Optional[CheckResult]:
+        raise NotImplementedError
+
+    def forget_failure(self, ctx: CheckContext) -> None:
+        """Drop cached temporary failures for the context's host, before a retry."""
+
+    def finish(self, ctx: CheckContext, result: CheckResult) -> None:
+        """Called with every check's verdict, whichever stage decided it."""
+
+    async def close(self) -> None:
+        """Release what the stage keeps open between checks."""
+
+
+class DNSStage(Stage):
+    """Hostname resolution, cached with TTLs by the shared resolver."""
+
+    name = "dns"
+
+    def __init__(self, resolver: AsyncResolver):
+        self.resolver = resolver
+
+    def forget_failure(self, ctx: CheckContext) -> None:
+        self.resolver.forget_failure(ctx.hostname)
+
+    async def run(self, ctx: CheckContext) -> Optional[CheckResult]:
+        started = time.monotonic()
+        result = await self.resolver.resolve(ctx.hostname)
+        ctx.timings.add("dns_ms", started)
+        ctx.details["dns_resolved"] = result.resolved
+        if result.resolved:
+            ctx.addresses = result.addresses
+            return None
+        logger.error(f"❌ DNS resolution failed: {ctx.url}")
+        if result.definitive:
+            # Only NXDOMAIN-style answers mark the host down; SERVFAIL and timeouts may pass
+            host_health.record_failure(ctx.hostname, FAILURE_DNS, "DNS resolution failed")
+        return ctx.fail(
+            ErrorDetails(ErrorCategory.DNS_FAILURE, "DNS resolution failed"), DEFINITIVE if result.definitive else TRANSIENT
+        )
+
+
+def wall_kind(details: Dict[str, Any]) -> Optional[str]:
+    """The wall an HTTP answer came from, if any: a login page or 401 is a login
+    wall, other refusals of automated requests (403, 999) a bot wall."""
+    status = details.get("status_code")
+    if status is None or status == NOT_MODIFIED:
+        return None
+    if details.get("login_page") or status == 401:
+        return LOGIN_WALLED
+    if status in LOGIN_STATUSES:
+        return BOT_PROTECTED
+    return None
+
+
+class WallStage(Stage):
+    """Answers URLs on hosts confirmed to be behind a bot or login wall without
+    a request, and learns those hosts from every HTTP answer."""
+
+    name = "wall"
+
+    def __init__(self, walls: WallTracker):
+        self.walls = walls
+
+    async def run(self, ctx: CheckContext) -> Optional[CheckResult]:
+        wall = self.walls.verdict(ctx.hostname)
+        if wall is None:
+            return None
+        ctx.details.update(status_code=wall.status_code, login_required=True, wall=wall.kind, domain_verdict=True)
+        logger.info(f"🧱 [WALLED] {ctx.url} - {wall.kind} host")
+        error_msg = f"HTTP {wall.status_code}: {wall.kind.replace('_', ' ')} host"
+        return CheckResult(True, ErrorDetails(ErrorCategory.AUTH_REQUIRED, error_msg, wall.status_code), ctx.details)
+
+    def finish(self, ctx: CheckContext, result: CheckResult) -> None:
+        details = ctx.details
+        if details.get("domain_verdict") or details.get("status_code") in (None, NOT_MODIFIED):
+            return  # no answer from the host itself
+        details["wall"] = wall_kind(details)
+        self.walls.observe(ctx.hostname, details["wall"], details["status_code"])
+
+
+class TCPStage(Stage):
+    """Reachability of the host's port, probed once per host:port. The probe's
+    connection, while still open, is passed on for the TLS handshake or the
+    HTTP request to use."""
+
+    name = "tcp"
+
+    def __init__(self, probe: TCPProbe):
+        self.probe = probe
+
+    def forget_failure(self, ctx: CheckContext) -> None:
+        self.probe.forget_failure(ctx.hostname, ctx.port)
+
+    async def run(self, ctx: CheckContext) -> Optional[CheckResult]:
+        started = time.monotonic()
+        result = await self.probe.probe(ctx.hostname, ctx.port, ctx.addresses)
+        ctx.timings.add("connect_ms", started)
+        ctx.details["tcp_connectable"] = result.connectable
+        if result.connectable:
+            ctx.connection = self.probe.take(ctx.hostname, ctx.port)
+            return None
+        logger.error(f"❌ TCP connect failed: {ctx.url} - {result.error}")
+        if result.error_kind == "timeout":
+            return ctx.fail(ErrorDetails(ErrorCategory.TIMEOUT, f"TCP connect timeout: {result.error}"), TRANSIENT)
+        if result.error_kind == "refused":
+            host_health.record_failure(ctx.hostname, FAILURE_CONNECT, f"Connection error: {result.error}", ctx.port)
+        return ctx.fail(
+            ErrorDetails(ErrorCategory.CONNECTION_ERROR, f"Connection error: {result.error}"),
+            DEFINITIVE if result.error_kind == "refused" else TRANSIENT,
+        )
+
+
+class TLSStage(Stage):
+    """Certificate verdict for HTTPS URLs, handshaken once per host:port. The
+    verifying handshake is made on the TCP stage's connection, which then goes
+    on to the HTTP request with TLS already up: with a transport that adopts it,
+    one connection per check."""
+
+    name = "tls"
+
+    def __init__(self, probe: TLSProbe):
+        self.probe = probe
+
+    def forget_failure(self, ctx: CheckContext) -> None:
+        self.probe.forget_failure(ctx.hostname, ctx.port)
+
+    async def run(self, ctx: CheckContext) -> Optional[CheckResult]:
+        if ctx.scheme != "https":
+            return None
+        # With a cached verdict the TCP connection goes to the request untouched
+        sock = None if self.probe.cached(ctx.hostname, ctx.port) else ctx.take_connection()
+        started = time.monotonic()
+        result = await self.probe.probe(
+            ctx.hostname, ctx.port, address=ctx.addresses[0] if ctx.addresses else None, sock=sock
+        )
+        ctx.timings.add("tls_ms", started)
+        ctx.details["ssl_valid"] = result.valid
+        ctx.details["ssl_expires"] = result.cert_expires
+        if result.valid:
+            logger.debug(f"🔒 SSL valid: {ctx.url}")
+            ctx.connection = ctx.connection or self.probe.take(ctx.hostname, ctx.port)
+            return None
+        logger.error(f"❌ SSL Error: {ctx.url} - {result.error}")
+        if result.error_kind == "refused":
+            host_health.record_failure(ctx.hostname, FAILURE_CONNECT, f"SSL Error: {result.error}", ctx.port)
+        category = ErrorCategory.CONNECTION_ERROR if result.error_kind == "connection" else ErrorCategory.SSL_ERROR
+        return ctx.fail(
+            ErrorDetails(category, f"SSL Error: {result.error}"),
+            TRANSIENT if result.error_kind in ("timeout", "connection") else DEFINITIVE,
+        )
+
+
+class HTTPStage(Stage):
+    """The request itself, by the strategy learned for the host's domain: HEAD
+    first where that works, otherwise (or when HEAD is refused) a ranged GET
+    scanned for login markers. What each HEAD gets is fed back to the learner.
+
+    Requests are paced by the per-host scheduler (and capped per backend network,
+    from the DNS stage's addresses), use the host's adaptive timeout and are
+    hedged past its p95. An earlier answer's ETag/Last-Modified makes the
+    request conditional, and the permanent hops of the redirect chain are cached
+    for the next check.
+
+    One transport per event loop serves every check, so connections to a host
+    are pooled and kept alive from one URL to the next; ``close`` releases it.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        transport: str = CHECK_TRANSPORT,
+        redirects: Optional[SQLiteRedirectStore] = None,
+        validators: Optional[SQLiteValidatorStore] = None,
+        concurrency: int = HTTP_CONCURRENCY,
+        strategies: Optional[StrategyLearner] = None,
+    ):
+        self.transport = transport
+        self.redirects = redirects or redirect_cache
+        self.validators = validators or url_validators
+        self.strategies = strategies or domain_strategies
+        self.concurrency = concurrency
+        self._loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._transport: Optional[Transport] = None
+
+    def _bind(self) -> None:
+        """The semaphore and the transport's connections belong to one event loop;
+        a new loop (e.g. another asyncio.run) gets its own."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._transport = create_transport(self.transport)
+
+    async def close(self) -> None:
+        transport, loop = self._transport, self._loop
+        self._transport, self._loop = None, None
+        if transport is not None and loop is asyncio.get_running_loop():
+            await transport.close()
+
+    def strategy_for(self, hostname: str) -> str:
+        return self.strategies.strategy_for(hostname)
+
+    async def run(self, ctx: CheckContext) -> Optional[CheckResult]:
+        strategy = self.strategy_for(ctx.hostname)
+        ctx.details["strategy"] = strategy
+        validators = self.validators.get(ctx.url)
+        conditional = validators.request_headers() if validators else {}
+
+        self._bind()
+        transport = self._transport
+        if not transport.adopts_connections:
+            # Close the probes' connection now rather than hold it through the request
+            ctx.release()
+        async with self._semaphore:
+            head_dropped = False
+            if strategy != GET_RANGE:
+                try:
+                    response = await http_latency.hedged(
+                        ctx.hostname, lambda: self._fetch(transport, "HEAD", ctx, default_timeout=8, headers=conditional)
+                    )
+                    self._record_response(ctx, response, "HEAD")
+                    self._learn(ctx, response.status)
+                    if strategy == HEAD or response.status not in HEAD_FALLBACK_STATUSES:
+                        return self._verdict(ctx, response)
+                    logger.debug(f"🔄 HEAD answered {response.status} for {ctx.url}, trying GET...")
+                except TransportError as e:
+                    if strategy == HEAD:
+                        return self._transport_failure(ctx, e)
+                    head_dropped = True
+                    logger.debug(f"🔄 HEAD failed for {ctx.url}: {str(e)}, trying GET...")
+                except asyncio.TimeoutError:
+                    return self._timeout(ctx, "HEAD")
+
+            # Ranged GET: only the start of the page is needed, and reading stops
+            # as soon as the login scan has its verdict
+            try:
+                response = await http_latency.hedged(
+                    ctx.hostname, lambda: self._fetch(
+                        transport, "GET", ctx, default_timeout=10,
+                        headers={"Range": f"bytes=0-{LOGIN_SCAN_BYTES - 1}", **conditional},
+                    )
+                )
+                self._record_response(ctx, response, "GET")
+                if head_dropped:
+                    # The host answers GET, so it was the HEAD it would not take
+                    self.strategies.record(ctx.hostname, HEAD_REFUSED)
+                return self._verdict(ctx, response)
+            except TransportError as e:
+                return self._transport_failure(ctx, e)
+            except asyncio.TimeoutError:
+                return self._timeout(ctx, "GET")
+
+    def _learn(self, ctx: CheckContext, status: int) -> None:
+        """Teach the domain's strategy what its HEAD got. A 429 says nothing
+        about HEAD support and is not learned from."""
+        if status in HEAD_UNSUPPORTED_STATUSES:
+            self.strategies.record(ctx.hostname, HEAD_REFUSED)
+        elif status in LOGIN_STATUSES:
+            self.strategies.record(ctx.hostname, HEAD_BLOCKED)
+        elif status != 429:
+            self.strategies.record(ctx.hostname, HEAD_OK)
+
+    async def _fetch(
+        self,
+        transport: Transport,
+        method: str,
+        ctx: CheckContext,
+        default_timeout: float,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> FetchResult:
+        """Send one paced request, recording its latency against the host's history."""
+        hostname = ctx.hostname
+        timeout = http_latency.timeout_for(hostname, default_timeout)
+        async with host_scheduler.slot(hostname, ctx.addresses):
+            try:
+                response = await transport.request(
+                    method, ctx.target, headers=headers or None, timeout=timeout,
+                    read_bytes=LOGIN_SCAN_BYTES if method == "GET" else 0, scan_login=True,
+                    connection=ctx.take_connection(),
+                )
+            except asyncio.TimeoutError:
+                http_latency.record_timeout(hostname, timeout)
+                raise
+        http_latency.record(hostname, response.elapsed)
+        host_scheduler.observe(hostname, response.status, response.headers)
+        host_health.record_success(hostname, ctx.port)
+        return response
+
+    def _record_response(self, ctx: CheckContext, response: FetchResult, method: str) -> None:
+        """Copy a response into the check details and keep its validators for the next revalidation.
+
+        The redirect chain recorded is the full one from the checked URL: the
+        shortcut hops that were skipped, then those the request followed.
+        """
+        details = ctx.details
+        details["status_code"] = response.status
+        details["content_type"] = response.headers.get("content-type")
+        details["final_url"] = response.final_url
+        chain = [*ctx.shortcut, *response.redirects]
+        details["redirect_count"] = len(chain)
+        details["redirect_chain"] = chain_to_dicts(chain)
+        self.redirects.record(response.redirects)
+        details["response_time"] = response.elapsed
+        details["method_used"] = method
+        details["not_modified"] = response.status == NOT_MODIFIED
+        if response.body:
+            details["content_preview"] = response.body[:500].decode("utf-8", errors="ignore")
+        # HEAD then GET: the check costs both requests
+        details["bandwidth_bytes"] = details.get("bandwidth_bytes", 0) + (
+            response.timings.bytes_received if response.timings else response.size
+        )
+        if response.timings:
+            ctx.timings.merge(response.timings)
+        if 200 <= response.status < 300 or response.status == NOT_MODIFIED:
+            validators = extract_validators(ctx.url, response.headers)
+            if validators:
+                self.validators.save(validators)
+
+    def _verdict(self, ctx: CheckContext, response: FetchResult) -> CheckResult:
+        method, status = ctx.details["method_used"], response.status
+        if status == NOT_MODIFIED:
+            ctx.details["login_required"] = None  # unchanged since the last check
+        else:
+            ctx.details["login_page"] = response.login_page
+            ctx.details["login_required"] = status in LOGIN_STATUSES or bool(response.login_page)
+        if status < 400:
+            logger.info(f"✅ {method} OK: {ctx.url} [{status}] ({response.elapsed:.2f}s)")
+            return CheckResult(True, ErrorDetails(ErrorCategory.OTHER, ""), ctx.details)
+        error_msg = f"HTTP {status}: {response.reason}"
+        if is_reachable_status(status):
+            logger.info(f"🔒 {method} reachable: {ctx.url} - {error_msg}")
+            return CheckResult(True, categorize_error(error_msg, status), ctx.details)
+        logger.error(f"❌ {method} Error: {ctx.url} - {error_msg}")
+        return ctx.fail(categorize_error(error_msg, status), classify_status(status))
+
+    def _transport_failure(self, ctx: CheckContext, error: TransportError) -> CheckResult:
+        logger.error(f"❌ Connection error: {ctx.url} - {str(error)}")
+        failure_kind = classify_exception(error)
+        if isinstance(error, ConnectError) and failure_kind == DEFINITIVE:
+            host_health.record_failure(ctx.hostname, FAILURE_CONNECT, f"Connection error: {str(error)}", ctx.port)
+        return ctx.fail(categorize_error(f"Connection error: {str(error)}"), failure_kind)
+
+    def _timeout(self, ctx: CheckContext, method: str) -> CheckResult:
+        # The host accepted the connection: a slow answer does not make it down
+        logger.error(f"⏰ {method} Timeout: {ctx.url}")
+        return ctx.fail(ErrorDetails(ErrorCategory.TIMEOUT, f"{method} request timeout"), TRANSIENT)
+
+
+class URLChecker:
+    """The URL check every entry point shares: DNS → wall → TCP → TLS → HTTP.
+
+    Each stage keeps its own cache and concurrency limit (DNS answers, walled
+    hosts, TCP and TLS verdicts per host:port, the HTTP stage's scheduler slots)
+    and the first stage to return a result decides the verdict. Hosts the
+    circuit breaker marked down are answered before any stage runs. Result
+    caching and retries are the caller's.
+    """
+
+    def __init__(
+        self,
+        stages: Optional[Sequence[Stage]] = None,
+        transport: str = CHECK_TRANSPORT,
+        redirects: Optional[SQLiteRedirectStore] = None,
+    ):
+        self.redirects = redirects or redirect_cache
+        self.stages = list(stages) if stages is not None else [
+            DNSStage(dns_resolver),
+            WallStage(domain_walls),
+            TCPStage(tcp_probe),
+            TLSStage(tls_probe),
+            HTTPStage(transport, self.redirects),
+        ]
+
+    async def close(self) -> None:
+        """Close the connections the stages keep between checks (the HTTP stage's
+        pool); call on shutdown, on the loop the checks ran on."""
+        for stage in self.stages:
+            await stage.close()
+
+    async def check(self, url: str, force: bool = False) -> CheckResult:
+        """Check ``url``, going straight to the end of its cached permanent redirects.
+
+        ``force`` drops cached temporary failures first, e.g. when retrying.
+        """
+        target, shortcut = self.redirects.resolve(url)
+        result = await self._run(CheckContext(url, target, shortcut, force))
+        if shortcut and not result.accessible:
+            # The target may have moved on since: drop the shortcut and follow the chain from the bookmarked URL
+            logger.debug(f"↪️  Redirect shortcut {url} -> {target} failed, re-checking without it")
+            self.redirects.forget(url)
+            first = result
+            result = await self._run(CheckContext(url, url, [], force))
+            # The check cost both attempts
+            result.details["timings"] = RequestTimings.from_dict(first.details.get("timings")).merge(
+                RequestTimings.from_dict(result.details.get("timings"))
+            ).to_dict()
+            result.details["bandwidth_bytes"] = (
+                result.details.get("bandwidth_bytes", 0) + first.details.get("bandwidth_bytes", 0)
+            )
+        return result
+
+    async def _run(self, ctx: CheckContext) -> CheckResult:
+        if ctx.force:
+            # A retry must not be answered from a cached temporary failure, nor
+            # from the circuit breaker: it goes to the network like a half-open probe
+            for stage in self.stages:
+                stage.forget_failure(ctx)
+
+        # Short-circuit every URL on a host (or host:port) that is known to be down
+        down = None if ctx.force else host_health.check(ctx.hostname, ctx.port)
+        if down:
+            ctx.details["host_down"] = True
+            logger.info(f"🚫 [HOST DOWN] {ctx.url} - {down.last_error}")
+            category = HOST_FAILURE_CATEGORIES.get(down.failure_kind, ErrorCategory.CONNECTION_ERROR)
+            # Every kind the circuit opens on (NXDOMAIN, refused connections) is definitive
+            return ctx.fail(ErrorDetails(category, down.last_error or "Host is down"), DEFINITIVE)
+
+        result = CheckResult(True, ErrorDetails(ErrorCategory.OTHER, ""), ctx.details)
+        try:
+            for stage in self.stages:
+                verdict = await stage.run(ctx)
+                if verdict is not None:
+                    result = verdict
+                    break
+        except Exception as e:
+            logger.error(f"❌ Error checking URL: {ctx.url} - {str(e)}")
+            result = ctx.fail(categorize_error(f"Error checking URL: {str(e)}"), classify_exception(e))
+        finally:
+            ctx.release()
+        for stage in self.stages:
+            stage.finish(ctx, result)
+        ctx.details["timings"] = ctx.timings.to_dict()
+        return result
+
+
+# Singleton instance shared by the API and the scripts
+url_checker = URLChecker()
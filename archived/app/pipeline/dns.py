@@ -0,0 +1,239 @@
+import asyncio
+import socket
+import sqlite3
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from app.config import logger
+from app.config import DNS_POSITIVE_TTL_SECONDS, DNS_NEGATIVE_TTL_SECONDS, DNS_CONCURRENCY
+from app.sqlite_cache import DB_PATH
+
+# getaddrinfo errors meaning "this name does not exist" (as opposed to "try again later")
+DEFINITIVE_DNS_ERRORS = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+# Temporary failures (SERVFAIL, timeouts) are only remembered briefly and never persisted
+TRANSIENT_NEGATIVE_TTL_SECONDS = 60
+
+
+def normalize_hostname(hostname: str) -> str:
+    """Lower-case a hostname and strip the trailing root dot."""
+    return (hostname or "").strip().lower().rstrip(".")
+
+
+@dataclass
+class DNSResult:
+    hostname: str
+    addresses: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    expires_at: float = 0.0  # unix timestamp
+    definitive: bool = True  # False for temporary lookup failures
+
+    @property
+    def resolved(self) -> bool:
+        return bool(self.addresses)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class SQLiteDNSCache:
+    """Persists resolver answers (positive and negative) across runs."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dns_cache (
+                    hostname TEXT PRIMARY KEY,
+                    addresses TEXT,
+                    error TEXT,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    def load_fresh(self, now: Optional[float] = None) -> Dict[str, DNSResult]:
+        now = now if now is not None else time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                'SELECT hostname, addresses, error, expires_at FROM dns_cache WHERE expires_at > ?', (now,)
+            ).fetchall()
+        return {
+            row[0]: DNSResult(
+                hostname=row[0],
+                addresses=json.loads(row[1]) if row[1] else [],
+                error=row[2],
+                expires_at=row[3],
+            ) for row in rows
+        }
+
+    def save_many(self, results: Iterable[DNSResult]):
+        rows = [(r.hostname, json.dumps(r.addresses), r.error, r.expires_at) for r in results]
+        if not rows:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO dns_cache (hostname, addresses, error, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(hostname) DO UPDATE SET
+                    addresses=excluded.addresses,
+                    error=excluded.error,
+                    expires_at=excluded.expires_at
+            ''', rows)
+            conn.commit()
+
+    def purge_expired(self, now: Optional[float] = None):
+        now = now if now is not None else time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM dns_cache WHERE expires_at <= ?', (now,))
+            conn.commit()
+
+    def clear(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM dns_cache')
+            conn.commit()
+
+
+class AsyncResolver:
+    """Non-blocking hostname resolver with TTL-aware positive/negative caching.
+
+    Lookups run through ``loop.getaddrinfo`` (a worker thread), so the event
+    loop never stalls on DNS. Answers live in memory and are written back to
+    SQLite on ``flush()`` so later runs start warm.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteDNSCache] = None,
+        positive_ttl: int = DNS_POSITIVE_TTL_SECONDS,
+        negative_ttl: int = DNS_NEGATIVE_TTL_SECONDS,
+        concurrency: int = DNS_CONCURRENCY,
+    ):
+        self._store = store
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.concurrency = concurrency
+        self._cache: Dict[str, DNSResult] = {}
+        self._dirty: Dict[str, DNSResult] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loaded = False
+        self._loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"hits": 0, "misses": 0, "failures": 0}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._store:
+            try:
+                self._cache.update(self._store.load_fresh())
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Failed to load DNS cache: {e}")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to the running loop; recreate when called from a new one (e.g. repeated asyncio.run)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._inflight.clear()
+        return self._semaphore
+
+    def cached(self, hostname: str) -> Optional[DNSResult]:
+        """Return a fresh cached answer without performing a lookup."""
+        self._ensure_loaded()
+        entry = self._cache.get(normalize_hostname(hostname))
+        return entry if entry and entry.is_fresh() else None
+
+    def forget_failure(self, hostname: str) -> None:
+        """Drop a cached temporary lookup failure so a retry asks the resolver again."""
+        hostname = normalize_hostname(hostname)
+        entry = self._cache.get(hostname)
+        if entry and not entry.resolved and not entry.definitive:
+            del self._cache[hostname]
+
+    async def resolve(self, hostname: str) -> DNSResult:
+        """Resolve a hostname, answering from cache while the entry's TTL holds."""
+        hostname = normalize_hostname(hostname)
+        if not hostname:
+            return DNSResult(hostname, [], "Empty hostname")
+        entry = self.cached(hostname)
+        if entry:
+            self.stats["hits"] += 1
+            return entry
+
+        semaphore = self._get_semaphore()
+        if hostname in self._inflight:
+            return await asyncio.shield(self._inflight[hostname])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[hostname] = future
+        self.stats["misses"] += 1
+        try:
+            async with semaphore:
+                result = await self._lookup(hostname)
+            self._cache[hostname] = result
+            if result.resolved or result.definitive:
+                self._dirty[hostname] = result
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Nobody else may be awaiting; mark retrieved to avoid "exception never retrieved" noise
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(hostname, None)
+
+    async def _lookup(self, hostname: str) -> DNSResult:
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        try:
+            infos = await loop.getaddrinfo(hostname, None, type=socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            logger.debug(f"🔗 DNS resolved: {hostname} -> {addresses}")
+            return DNSResult(hostname, addresses, None, now + self.positive_ttl)
+        except (socket.gaierror, UnicodeError) as e:
+            definitive = isinstance(e, UnicodeError) or e.errno in DEFINITIVE_DNS_ERRORS
+            ttl = self.negative_ttl if definitive else TRANSIENT_NEGATIVE_TTL_SECONDS
+            self.stats["failures"] += 1
+            logger.debug(f"❌ DNS resolution failed: {hostname} ({e})")
+            return DNSResult(hostname, [], str(e), now + ttl, definitive)
+
+    async def prefetch(self, hostnames: Iterable[str]) -> Dict[str, DNSResult]:
+        """Bulk pre-resolve: look up every distinct hostname once before the HTTP stage."""
+        distinct = list(dict.fromkeys(normalize_hostname(h) for h in hostnames if h))
+        results = await asyncio.gather(*(self.resolve(h) for h in distinct))
+        self.flush()
+        failed = sum(1 for r in results if not r.resolved)
+        logger.info(f"🔗 Pre-resolved {len(distinct)} hostnames ({failed} failed)")
+        return dict(zip(distinct, results))
+
+    def flush(self) -> None:
+        """Persist answers gathered since the last flush."""
+        if not self._store or not self._dirty:
+            return
+        try:
+            self._store.save_many(self._dirty.values())
+            self._dirty.clear()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to persist DNS cache: {e}")
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._dirty.clear()
+        if self._store:
+            self._store.clear()
+
+
+# Singleton instance shared by the app and the scripts
+dns_resolver = AsyncResolver(SQLiteDNSCache())
@@ -0,0 +1,214 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.config import logger
+from app.config import HOST_FAILURE_THRESHOLD, HOST_DOWN_SECONDS
+from app.sqlite_cache import DB_PATH
+
+# Circuit states
+CLOSED = "closed"        # healthy, checks run normally
+OPEN = "open"            # host is down, URLs on it are answered from the recorded failure
+HALF_OPEN = "half_open"  # cool-down elapsed, one probe is allowed through
+
+# A half-open probe that never reports back is abandoned after this long
+PROBE_TIMEOUT_SECONDS = 60
+
+# Failure kinds reported by the checkers
+FAILURE_DNS = "dns"
+FAILURE_CONNECT = "connect"
+
+
+def circuit_key(host: str, port: Optional[int] = None) -> str:
+    """Breaker key: the host for DNS failures, host:port for refused connections."""
+    host = (host or "").lower()
+    return f"{host}:{port}" if port else host
+
+
+@dataclass
+class HostHealth:
+    host: str  # circuit_key: a hostname or host:port
+    state: str = CLOSED
+    failures: int = 0
+    failure_kind: Optional[str] = None
+    last_error: Optional[str] = None
+    opened_at: float = 0.0  # unix timestamp
+    probe_started: float = 0.0  # unix timestamp of the half-open probe, 0 if none
+
+
+class SQLiteHostHealthStore:
+    """Persists the host-health table so dead hosts stay short-circuited across runs."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS host_health (
+                    host TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    failures INTEGER DEFAULT 0,
+                    failure_kind TEXT,
+                    last_error TEXT,
+                    opened_at REAL
+                )
+            ''')
+            conn.commit()
+
+    def load_all(self) -> Dict[str, HostHealth]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                'SELECT host, state, failures, failure_kind, last_error, opened_at FROM host_health'
+            ).fetchall()
+        return {
+            row[0]: HostHealth(row[0], row[1], row[2] or 0, row[3], row[4], row[5] or 0.0)
+            for row in rows
+        }
+
+    def save(self, health: HostHealth):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO host_health (host, state, failures, failure_kind, last_error, opened_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(host) DO UPDATE SET
+                    state=excluded.state,
+                    failures=excluded.failures,
+                    failure_kind=excluded.failure_kind,
+                    last_error=excluded.last_error,
+                    opened_at=excluded.opened_at
+            ''', (health.host, health.state, health.failures, health.failure_kind, health.last_error, health.opened_at))
+            conn.commit()
+
+    def clear(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM host_health')
+            conn.commit()
+
+
+class HostHealthTracker:
+    """Circuit breaker per host.
+
+    Connection-level failures (DNS, TCP/TLS connect) open the circuit on the first
+    occurrence by default. While open, ``check()`` returns the recorded failure so
+    callers can answer every other URL on the host without touching the network.
+    After ``down_seconds`` one probe is let through (half-open); its outcome closes
+    or re-opens the circuit.
+
+    The URL checker only reports definitive failures (NXDOMAIN, refused
+    connections): a temporary lookup error, a reset or a slow answer must not
+    take every URL on a host down for ``down_seconds``. A DNS failure opens the
+    host's circuit; a refused connection only that of the port it was refused on.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteHostHealthStore] = None,
+        failure_threshold: int = HOST_FAILURE_THRESHOLD,
+        down_seconds: int = HOST_DOWN_SECONDS,
+    ):
+        self._store = store
+        self.failure_threshold = failure_threshold
+        self.down_seconds = down_seconds
+        self._hosts: Dict[str, HostHealth] = {}
+        self._loaded = False
+        self.stats = {"short_circuited": 0, "opened": 0, "recovered": 0}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._store:
+            try:
+                self._hosts.update(self._store.load_all())
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Failed to load host health table: {e}")
+
+    def _get(self, key: str) -> HostHealth:
+        self._ensure_loaded()
+        health = self._hosts.get(key)
+        if health is None:
+            health = self._hosts[key] = HostHealth(key)
+        return health
+
+    def _persist(self, health: HostHealth) -> None:
+        if not self._store:
+            return
+        try:
+            self._store.save(health)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to persist host health for {health.host}: {e}")
+
+    def check(self, host: str, port: Optional[int] = None) -> Optional[HostHealth]:
+        """Return the failure record if URLs on this host (and port) should be
+        short-circuited, else None."""
+        for key in dict.fromkeys((circuit_key(host), circuit_key(host, port))):
+            down = self._check(key)
+            if down:
+                return down
+        return None
+
+    def _check(self, key: str) -> Optional[HostHealth]:
+        health = self._get(key)
+        if health.state == CLOSED:
+            return None
+        now = time.time()
+        if health.state == OPEN and now - health.opened_at >= self.down_seconds:
+            health.state = HALF_OPEN
+            health.probe_started = 0.0
+        if health.state == HALF_OPEN and now - health.probe_started >= PROBE_TIMEOUT_SECONDS:
+            health.probe_started = now
+            logger.debug(f"🩺 Probing down host: {health.host}")
+            return None
+        self.stats["short_circuited"] += 1
+        return health
+
+    def record_failure(self, host: str, kind: str, message: str, port: Optional[int] = None) -> None:
+        """``port`` scopes the failure to host:port (refused connections); without
+        it the whole host is affected (DNS failures)."""
+        health = self._get(circuit_key(host, port))
+        health.failures += 1
+        health.failure_kind = kind
+        health.last_error = message
+        tripped = health.state == CLOSED and health.failures >= self.failure_threshold
+        if tripped or health.state == HALF_OPEN:
+            health.state = OPEN
+            health.opened_at = time.time()
+            health.probe_started = 0.0
+            self.stats["opened"] += 1
+            logger.info(f"🚫 Host marked down: {health.host} ({kind}: {message})")
+            self._persist(health)
+
+    def record_success(self, host: str, port: Optional[int] = None) -> None:
+        for key in dict.fromkeys((circuit_key(host), circuit_key(host, port))):
+            self._record_success(key)
+
+    def _record_success(self, key: str) -> None:
+        health = self._get(key)
+        if health.state == CLOSED and not health.failures:
+            return
+        was_down = health.state != CLOSED
+        health.state = CLOSED
+        health.failures = 0
+        health.failure_kind = None
+        health.last_error = None
+        health.probe_started = 0.0
+        if was_down:
+            self.stats["recovered"] += 1
+            logger.info(f"💚 Host recovered: {health.host}")
+            self._persist(health)
+
+    def get_down_hosts(self) -> Dict[str, HostHealth]:
+        self._ensure_loaded()
+        return {host: h for host, h in self._hosts.items() if h.state != CLOSED}
+
+    def clear(self) -> None:
+        self._hosts.clear()
+        if self._store:
+            self._store.clear()
+
+
+# Singleton instance
+host_health = HostHealthTracker(SQLiteHostHealthStore())
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import math
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from app.config import logger
+from app.config import (
+    LATENCY_MIN_SAMPLES, LATENCY_WINDOW, ADAPTIVE_TIMEOUT_MULTIPLIER,
+    ADAPTIVE_TIMEOUT_MIN_SECONDS, ADAPTIVE_TIMEOUT_MAX_SECONDS, HEDGE_REQUESTS,
+)
+from app.sqlite_cache import DB_PATH
+
+T = TypeVar("T")
+
+# Weight of the newest sample in the moving average
+EWMA_ALPHA = 0.3
+
+
+@dataclass
+class HostLatency:
+    host: str
+    ewma: float = 0.0
+    samples: List[float] = field(default_factory=list)  # most recent last, in seconds
+
+    def add(self, seconds: float, window: int = LATENCY_WINDOW) -> None:
+        self.ewma = seconds if not self.samples else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.ewma
+        self.samples.append(seconds)
+        del self.samples[:-window]
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of the recent samples (q in 0..100)."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class SQLiteLatencyStore:
+    """Persists recent per-host latencies so adaptive timeouts survive restarts."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS host_latency (
+                    kind TEXT NOT NULL,
+                    host TEXT NOT NULL,
+                    ewma REAL,
+                    samples TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (kind, host)
+                )
+            ''')
+            conn.commit()
+
+    def load_all(self, kind: str) -> Dict[str, HostLatency]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('SELECT host, ewma, samples FROM host_latency WHERE kind = ?', (kind,)).fetchall()
+        return {row[0]: HostLatency(row[0], row[1] or 0.0, json.loads(row[2] or "[]")) for row in rows}
+
+    def save_many(self, kind: str, entries: List[HostLatency]):
+        now = time.time()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO host_latency (kind, host, ewma, samples, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(kind, host) DO UPDATE SET
+                    ewma=excluded.ewma,
+                    samples=excluded.samples,
+                    updated_at=excluded.updated_at
+            ''', [(kind, e.host, e.ewma, json.dumps([round(s, 4) for s in e.samples]), now) for e in entries])
+            conn.commit()
+
+
+class LatencyTracker:
+    """Per-host latency history driving adaptive timeouts and hedged requests.
+
+    Until a host has ``min_samples`` responses the caller's default timeout is
+    used unchanged. After that the timeout is ``multiplier`` times the larger of
+    the p95 and the EWMA, clamped to [min_timeout, max_timeout]: fast hosts stop
+    waiting out the full default, slow but healthy ones get the time they need.
+    Timeouts are recorded as samples of the timeout itself, so a host that starts
+    stalling pushes its own timeout up instead of being marked broken over and over.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteLatencyStore] = None,
+        kind: str = "http",
+        min_samples: int = LATENCY_MIN_SAMPLES,
+        multiplier: float = ADAPTIVE_TIMEOUT_MULTIPLIER,
+        min_timeout: float = ADAPTIVE_TIMEOUT_MIN_SECONDS,
+        max_timeout: float = ADAPTIVE_TIMEOUT_MAX_SECONDS,
+        hedge: bool = HEDGE_REQUESTS,
+    ):
+        self._store = store
+        self.kind = kind
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.hedge = hedge
+        self._hosts: Dict[str, HostLatency] = {}
+        self._dirty: Set[str] = set()
+        self._loaded = False
+        self.stats = {"hedged": 0, "hedge_wins": 0, "timeouts": 0}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._store:
+            try:
+                self._hosts.update(self._store.load_all(self.kind))
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"⚠️  Failed to load {self.kind} latency history: {e}")
+
+    def get(self, host: str) -> Optional[HostLatency]:
+        self._ensure_loaded()
+        return self._hosts.get((host or "").lower())
+
+    def record(self, host: str, seconds: float) -> None:
+        self._ensure_loaded()
+        host = (host or "").lower()
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = HostLatency(host)
+        entry.add(seconds)
+        self._dirty.add(host)
+
+    def record_timeout(self, host: str, timeout: float) -> None:
+        self.stats["timeouts"] += 1
+        self.record(host, timeout)
+
+    def _has_history(self, entry: Optional[HostLatency]) -> bool:
+        return entry is not None and len(entry.samples) >= self.min_samples
+
+    def timeout_for(self, host: str, default: float) -> float:
+        entry = self.get(host)
+        if not self._has_history(entry):
+            return default
+        basis = max(entry.percentile(95), entry.ewma)
+        return min(self.max_timeout, max(self.min_timeout, basis * self.multiplier))
+
+    def hedge_delay(self, host: str) -> Optional[float]:
+        """Seconds after which a second request is sent, or None to never hedge."""
+        entry = self.get(host)
+        if not self.hedge or not self._has_history(entry):
+            return None
+        return entry.percentile(95)
+
+    async def hedged(self, host: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run ``attempt``; if it outlives the host's p95, race a second copy of it.
+
+        The first attempt to succeed wins and the other is cancelled. An error is
+        only raised once every running attempt has failed.
+        """
+        delay = self.hedge_delay(host)
+        first = asyncio.ensure_future(attempt())
+        if delay is None:
+            return await first
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            self.stats["hedged"] += 1
+            logger.debug(f"🔀 Hedging request to {host} after {delay:.2f}s")
+            tasks.append(asyncio.ensure_future(attempt()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def flush(self) -> None:
+        """Persist hosts whose latency changed since the last flush."""
+        if not self._store or not self._dirty:
+            return
+        entries = [self._hosts[host] for host in self._dirty]
+        try:
+            self._store.save_many(self.kind, entries)
+            self._dirty.clear()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to persist {self.kind} latency history: {e}")
+
+    def clear(self) -> None:
+        self._hosts.clear()
+        self._dirty.clear()
+
+
+# Singleton instances: HTTP request latency, and TLS handshake latency (which
+# never hedges - the probe runs once per host and is shared already)
+_latency_store = SQLiteLatencyStore()
+http_latency = LatencyTracker(_latency_store, kind="http")
+tls_latency = LatencyTracker(_latency_store, kind="tls", min_timeout=1.0, max_timeout=10.0, hedge=False)
@@ -0,0 +1,95 @@
+import functools
+import re
+from typing import Optional, Tuple
+
+# Bytes of a page scanned for login markers; ranged GETs ask for no more than this
+LOGIN_SCAN_BYTES = 2048
+
+# Login-page markers, matched case-insensitively. Tag patterns stay inside one tag
+# (``[^>]``) and every gap is bounded, so no match is longer than MAX_MATCH_BYTES
+LOGIN_PATTERNS = [
+    rb'<form[^>]{0,200}(?:login|log-in|signin|sign-in)',
+    rb'<input[^>]{0,200}password',
+    rb'<title>[^<]{0,200}(?:sign ?in|log ?in)',
+    rb'class="[^"]{0,100}login',
+    rb'id="login',
+    rb'authentication required',
+    rb'access denied',
+    rb'unauthorized',
+]
+LOGIN_RE = re.compile(b'|'.join(LOGIN_PATTERNS), re.IGNORECASE)
+MAX_MATCH_BYTES = 256
+
+# Content types that can hold a login page; anything else is not scanned at all
+SCANNED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+
+class LoginDetector:
+    """Incremental login-page matcher.
+
+    ``feed`` response chunks as they arrive; it returns True at the first login
+    marker, False once ``limit`` bytes were scanned without one, and None while
+    undecided. Matches spanning two chunks are found: the end of the previous
+    chunk is rescanned with the next one.
+    """
+
+    def __init__(self, limit: int = LOGIN_SCAN_BYTES):
+        self.limit = limit
+        self.scanned = 0
+        self.verdict: Optional[bool] = None
+        self.match: Optional[bytes] = None
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        if self.verdict is not None:
+            return self.verdict
+        chunk = chunk[:self.limit - self.scanned]
+        self.scanned += len(chunk)
+        window = self._tail + chunk
+        found = LOGIN_RE.search(window)
+        if found:
+            self.verdict, self.match = True, found.group(0)
+        elif self.scanned >= self.limit:
+            self.verdict = False
+        else:
+            self._tail = window[-MAX_MATCH_BYTES:]
+        return self.verdict
+
+    def finish(self) -> bool:
+        """The content ended; no marker so far means no login page."""
+        if self.verdict is None:
+            self.verdict = False
+        return self.verdict
+
+
+def detect_login_page(content: bytes) -> bool:
+    """One-shot check of content already read."""
+    detector = LoginDetector(limit=len(content))
+    detector.feed(content)
+    return detector.finish()
+
+
+def is_scannable(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return True  # unlabelled: could be anything, including HTML
+    return content_type.split(';')[0].strip().lower() in SCANNED_CONTENT_TYPES
+
+
+async def scan_for_login(stream, content_type: Optional[str] = None, limit: int = LOGIN_SCAN_BYTES) -> Tuple[bool, bytes]:
+    """Read ``stream`` (an aiohttp or asyncio StreamReader) only until the login
+    verdict is known, returning (login page?, bytes read). Content types that
+    cannot be a login page are not read at all."""
+    if not is_scannable(content_type):
+        return False, b""
+    # asyncio's read(n) returns whatever is buffered, like aiohttp's readany()
+    read = getattr(stream, "readany", None) or functools.partial(stream.read, limit)
+    detector = LoginDetector(limit)
+    content = bytearray()
+    while detector.verdict is None:
+        chunk = await read()
+        if not chunk:
+            detector.finish()
+            break
+        content += chunk[:limit - len(content)]
+        detector.feed(chunk)
+    return detector.verdict, bytes(content)
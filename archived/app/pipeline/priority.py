@@ -0,0 +1,127 @@
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Generic, Iterable, List, Mapping, Optional, Tuple, TypeVar
+
+from app.config import CACHE_FRESHNESS_HOURS, REVALIDATION_WEIGHTS, LAST_USED_HALF_LIFE_DAYS
+from app.models import Bookmark
+from app.pipeline.retry import TRANSIENT
+from app.sqlite_cache import BookmarkCacheEntry, CheckHistory
+
+T = TypeVar("T")
+
+# Seconds between the Chrome/Windows epoch (1601-01-01) and the Unix epoch
+CHROME_EPOCH_OFFSET = 11644473600
+
+# How much a re-check is worth given the last recorded outcome. Broken links are
+# worth confirming before anyone acts on them, transient failures are unsettled,
+# and an unknown outcome sits in between.
+STATUS_VALUES = {"broken": 1.0, TRANSIENT: 1.0, "ok": 0.0}
+UNKNOWN_STATUS_VALUE = 0.5
+
+
+@dataclass(frozen=True)
+class RevalidationWeights:
+    staleness: float = 0.4
+    flakiness: float = 0.2
+    last_used: float = 0.25
+    status: float = 0.15
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, float] = REVALIDATION_WEIGHTS) -> "RevalidationWeights":
+        return cls(**config)
+
+
+def _chrome_time_to_unix(value: int) -> float:
+    return value / 1_000_000 - CHROME_EPOCH_OFFSET
+
+
+def _iso_to_unix(value: str) -> float:
+    """Cache timestamps are naive UTC ISO strings (``datetime.utcnow().isoformat()``)."""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def revalidation_score(
+    bookmark: Bookmark,
+    entry: Optional[BookmarkCacheEntry],
+    history: Optional[CheckHistory],
+    now: Optional[float] = None,
+    weights: RevalidationWeights = RevalidationWeights(),
+) -> float:
+    """Value of re-checking ``bookmark`` now, as a weighted sum of components in [0, 1].
+
+    - staleness: age of the last check relative to twice the freshness window
+      (never checked counts as fully stale)
+    - flakiness: how often the outcome flipped between consecutive checks
+    - last_used: halves every LAST_USED_HALF_LIFE_DAYS since the bookmark was
+      last opened; never-opened bookmarks score 0
+    - status: the last outcome, see STATUS_VALUES
+    """
+    now = time.time() if now is None else now
+
+    staleness = 1.0
+    if entry and entry.last_checked:
+        last_checked = _iso_to_unix(entry.last_checked)
+        staleness = min(1.0, max(0.0, now - last_checked) / (2 * CACHE_FRESHNESS_HOURS * 3600))
+
+    flakiness = history.flakiness if history else 0.0
+
+    last_used = 0.0
+    if bookmark.date_last_used:
+        idle_days = max(0.0, now - _chrome_time_to_unix(bookmark.date_last_used)) / 86400
+        last_used = 0.5 ** (idle_days / LAST_USED_HALF_LIFE_DAYS)
+
+    status = UNKNOWN_STATUS_VALUE
+    if entry and entry.broken_status:
+        transient = (entry.error_details or {}).get("failure_kind") == TRANSIENT
+        status = STATUS_VALUES.get(TRANSIENT if transient else entry.broken_status, UNKNOWN_STATUS_VALUE)
+
+    return (
+        weights.staleness * staleness
+        + weights.flakiness * flakiness
+        + weights.last_used * last_used
+        + weights.status * status
+    )
+
+
+class RevalidationQueue(Generic[T]):
+    """Max-heap of items by score; equal scores come out in insertion order."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, T]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: T, score: float) -> None:
+        heapq.heappush(self._heap, (-score, next(self._counter), item))
+
+    def pop(self) -> T:
+        return heapq.heappop(self._heap)[2]
+
+    def peek_score(self) -> float:
+        return -self._heap[0][0]
+
+    def drain(self) -> Iterable[T]:
+        while self._heap:
+            yield self.pop()
+
+
+def prioritize(
+    bookmarks: Iterable[Bookmark],
+    entries: Mapping[str, BookmarkCacheEntry],
+    history: Mapping[str, CheckHistory],
+    now: Optional[float] = None,
+    weights: Optional[RevalidationWeights] = None,
+) -> List[Bookmark]:
+    """Order ``bookmarks`` most valuable re-check first, so a run that is cut short
+    has already done the checks that matter most."""
+    now = time.time() if now is None else now
+    weights = weights or RevalidationWeights.from_config()
+    queue: RevalidationQueue[Bookmark] = RevalidationQueue()
+    for bookmark in bookmarks:
+        queue.push(bookmark, revalidation_score(bookmark, entries.get(bookmark.id), history.get(bookmark.id), now, weights))
+    return list(queue.drain())
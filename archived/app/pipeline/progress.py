@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+# Events queued per subscriber before further per-URL results are dropped for it;
+# counters are sent as snapshots, so a slow client still sees correct totals
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Event names
+EVENT_RESULT = "result"
+EVENT_PROGRESS = "progress"
+EVENT_DONE = "done"
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class ValidationProgress:
+    """Live counters and per-URL results of one validation, fanned out to any
+    number of subscribers (e.g. SSE clients).
+
+    Publishing never blocks the validation: each subscriber has a bounded queue
+    and per-URL results it cannot keep up with are dropped for it alone.
+    """
+
+    def __init__(self, total: int = 0):
+        self.counters: Dict[str, int] = {
+            "total": total,
+            "completed": 0,
+            "cache_hits": 0,
+            "network_checks": 0,
+            "broken": 0,
+            "dns_failures": 0,
+            "bandwidth_bytes": 0,
+            "in_flight": 0,
+            "retries": 0,
+        }
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.dropped = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self.finished or time.time()
+        return {**self.counters, "elapsed": round(now - self.started, 3), "done": self.done}
+
+    def _publish(self, event: Optional[Tuple[str, Dict[str, Any]]]) -> None:
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    def set_total(self, total: int) -> None:
+        self.counters["total"] = total
+
+    def check_started(self) -> None:
+        self.counters["in_flight"] += 1
+
+    def check_finished(self, retrying: bool = False) -> None:
+        self.counters["in_flight"] = max(0, self.counters["in_flight"] - 1)
+        if retrying:
+            self.counters["retries"] += 1
+
+    def record(
+        self,
+        bookmark_id: str,
+        url: str,
+        source: str,
+        broken: bool,
+        error: Optional[Dict[str, Any]] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Count a settled bookmark; ``source`` is "cache" or "network"."""
+        details = details or {}
+        self.counters["completed"] += 1
+        self.counters["cache_hits" if source == "cache" else "network_checks"] += 1
+        if broken:
+            self.counters["broken"] += 1
+        if details.get("dns_resolved") is False:
+            self.counters["dns_failures"] += 1
+        self.counters["bandwidth_bytes"] += details.get("bandwidth_bytes") or 0
+        self._publish((EVENT_RESULT, {
+            "id": bookmark_id,
+            "url": url,
+            "source": source,
+            "broken": broken,
+            "error": (error or {}).get("message") if broken else None,
+            "status_code": details.get("status_code"),
+        }))
+
+    def finish(self) -> None:
+        if not self.done:
+            self.finished = time.time()
+            self._publish(None)
+
+    async def events(self, interval: float = 1.0) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Per-URL results as they happen, a counter snapshot at least every
+        ``interval`` seconds, and a final ``done`` snapshot."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield EVENT_PROGRESS, self.snapshot()
+            last_snapshot = time.monotonic()
+            while not self.done or not queue.empty():
+                timeout = max(0.0, interval - (time.monotonic() - last_snapshot))
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    event = EVENT_PROGRESS, self.snapshot()
+                if event is None:
+                    break
+                if event[0] == EVENT_PROGRESS:
+                    last_snapshot = time.monotonic()
+                yield event
+            yield EVENT_DONE, self.snapshot()
+        finally:
+            self._subscribers.discard(queue)
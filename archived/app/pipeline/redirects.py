@@ -0,0 +1,115 @@
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from app.config import logger, REDIRECT_SHORTCUT_MAX_AGE_DAYS
+from app.sqlite_cache import DB_PATH
+
+# Only these promise the move is for good; 302/303/307 are re-followed every time
+PERMANENT_REDIRECT_STATUSES = {301, 308}
+MAX_SHORTCUT_HOPS = 10
+
+
+class Redirect(NamedTuple):
+    url: str       # the URL requested
+    status: int    # the redirect status it answered
+    location: str  # absolute URL it pointed to
+
+    @property
+    def permanent(self) -> bool:
+        return self.status in PERMANENT_REDIRECT_STATUSES
+
+
+def redirect_chain(history: Sequence[Any], final_url: str) -> Tuple[Redirect, ...]:
+    """Hops of an aiohttp response: ``history`` holds the redirect responses in order."""
+    urls = [str(r.url) for r in history] + [final_url]
+    return tuple(Redirect(urls[i], r.status, urls[i + 1]) for i, r in enumerate(history))
+
+
+def chain_to_dicts(chain: Iterable[Redirect]) -> List[Dict[str, Any]]:
+    return [hop._asdict() for hop in chain]
+
+
+class SQLiteRedirectStore:
+    """Permanent (301/308) redirects seen by URL checks.
+
+    A later check of a URL starts at the end of its cached permanent hops
+    instead of following them again. Shortcuts expire after ``max_age_days`` so
+    the full chain is re-verified now and then.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_age_days: float = REDIRECT_SHORTCUT_MAX_AGE_DAYS):
+        self.db_path = db_path
+        self.max_age_days = max_age_days
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS permanent_redirects (
+                    url TEXT PRIMARY KEY,
+                    location TEXT NOT NULL,
+                    status INTEGER NOT NULL,
+                    recorded_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    def record(self, chain: Iterable[Redirect]) -> None:
+        """Remember the permanent hops of a chain; a URL that now redirects
+        temporarily loses any permanent hop cached for it."""
+        chain = list(chain)
+        if not chain:
+            return
+        now = time.time()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany('''
+                    INSERT INTO permanent_redirects (url, location, status, recorded_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        location=excluded.location,
+                        status=excluded.status,
+                        recorded_at=excluded.recorded_at
+                ''', [(hop.url, hop.location, hop.status, now) for hop in chain if hop.permanent])
+                conn.executemany(
+                    'DELETE FROM permanent_redirects WHERE url = ?',
+                    [(hop.url,) for hop in chain if not hop.permanent]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to save redirects for {chain[0].url}: {e}")
+
+    def resolve(self, url: str) -> Tuple[str, List[Redirect]]:
+        """Where ``url`` ends up after its cached permanent hops, and those hops."""
+        hops: List[Redirect] = []
+        cutoff = time.time() - self.max_age_days * 86400
+        seen = {url}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                while len(hops) < MAX_SHORTCUT_HOPS:
+                    row = conn.execute(
+                        'SELECT location, status FROM permanent_redirects WHERE url = ? AND recorded_at >= ?',
+                        (url, cutoff)
+                    ).fetchone()
+                    if not row or row[0] in seen:
+                        break
+                    hops.append(Redirect(url, row[1], row[0]))
+                    url = row[0]
+                    seen.add(url)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to read redirects for {url}: {e}")
+        return url, hops
+
+    def forget(self, url: str) -> None:
+        """Drop the cached hop starting at ``url``."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('DELETE FROM permanent_redirects WHERE url = ?', (url,))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to forget redirect for {url}: {e}")
+
+
+# Singleton instance
+redirect_cache = SQLiteRedirectStore()
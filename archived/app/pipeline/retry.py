@@ -0,0 +1,119 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+import aiohttp
+
+from app.config import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS
+from app.pipeline.transport import TransportError
+
+T = TypeVar("T")
+
+# Failure classification
+TRANSIENT = "transient"    # worth retrying: the same request may succeed shortly
+DEFINITIVE = "definitive"  # the answer will not change by asking again
+
+TRANSIENT_STATUSES = {408, 429, 502, 503, 504}
+
+
+def classify_status(status: int) -> Optional[str]:
+    """Classify an HTTP status; None for successful responses."""
+    if status < 400:
+        return None
+    return TRANSIENT if status in TRANSIENT_STATUSES else DEFINITIVE
+
+
+def classify_exception(error: BaseException) -> str:
+    """Timeouts, dropped connections and resets are transient; refused connections,
+    certificate problems and anything unrecognised are definitive."""
+    if isinstance(error, TransportError):
+        if error.transient:
+            return TRANSIENT
+        return classify_exception(error.__cause__) if error.__cause__ is not None else DEFINITIVE
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ServerDisconnectedError, aiohttp.ClientPayloadError)):
+        return TRANSIENT
+    if isinstance(error, (aiohttp.ClientSSLError, aiohttp.ClientConnectorError)):
+        # ClientConnectorError wraps the OSError that refused or failed the connect
+        cause = getattr(error, "os_error", None)
+        return TRANSIENT if isinstance(cause, (ConnectionResetError, TimeoutError)) else DEFINITIVE
+    if isinstance(error, (ConnectionResetError, ConnectionAbortedError, aiohttp.ClientOSError)):
+        return TRANSIENT
+    return DEFINITIVE
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY_SECONDS
+    max_delay: float = RETRY_MAX_DELAY_SECONDS
+
+    def should_retry(self, attempt: int, kind: Optional[str]) -> bool:
+        """``attempt`` is the 1-based number of the attempt that just failed."""
+        return kind == TRANSIENT and attempt < self.max_attempts
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential back-off with full jitter, so retries of one host spread out."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+async def call_with_retries(
+    attempt_fn: Callable[[int], Awaitable[T]],
+    classify: Callable[[T], Optional[str]],
+    policy: RetryPolicy = RetryPolicy(),
+) -> T:
+    """Call ``attempt_fn(attempt)`` until it returns a non-transient result or attempts
+    run out. Back-off sleeps happen outside ``attempt_fn``, so callers that hold a
+    slot only inside it free the slot while waiting."""
+    attempt = 1
+    while True:
+        result = await attempt_fn(attempt)
+        if not policy.should_retry(attempt, classify(result)):
+            return result
+        await asyncio.sleep(policy.backoff(attempt))
+        attempt += 1
+
+
+class DelayQueue(Generic[T]):
+    """Queue whose items only become available once their delay has passed.
+
+    Lets a pipeline park a retry without holding a worker for the back-off.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, T]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _event(self) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        if self._wakeup is None or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def put(self, item: T, delay: float) -> None:
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def get(self) -> T:
+        event = self._event()
+        while True:
+            timeout = None
+            if self._heap:
+                timeout = self._heap[0][0] - time.monotonic()
+                if timeout <= 0:
+                    return heapq.heappop(self._heap)[2]
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
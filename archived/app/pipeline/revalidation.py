@@ -0,0 +1,110 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import logger
+from app.sqlite_cache import DB_PATH, MAX_QUERY_PARAMS
+
+NOT_MODIFIED = 304
+
+
+@dataclass
+class Validators:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    updated_at: float = 0.0  # unix timestamp
+
+    def request_headers(self) -> Dict[str, str]:
+        """Conditional request headers; a 304 answer means the page is unchanged."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def extract_validators(url: str, headers: Any) -> Optional[Validators]:
+    """Validators from a 2xx response's headers, or None if the server sent neither."""
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return Validators(url, etag, last_modified, time.time())
+
+
+def response_bytes(status: int, reason: Optional[str], raw_headers: Iterable, body_bytes: int = 0) -> int:
+    """Bytes received for a response: status line, headers and whatever body was read."""
+    size = len(f"HTTP/1.1 {status} {reason or ''}\r\n") + 2
+    size += sum(len(name) + len(value) + 4 for name, value in raw_headers)
+    return size + body_bytes
+
+
+class SQLiteValidatorStore:
+    """ETag/Last-Modified validators per URL, used to revalidate with conditional requests."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS url_validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    updated_at REAL
+                )
+            ''')
+            conn.commit()
+
+    def get(self, url: str) -> Optional[Validators]:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    'SELECT url, etag, last_modified, updated_at FROM url_validators WHERE url = ?', (url,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to read validators for {url}: {e}")
+            return None
+        return Validators(*row) if row else None
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Validators]:
+        urls = list(dict.fromkeys(urls))
+        found: Dict[str, Validators] = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for i in range(0, len(urls), MAX_QUERY_PARAMS):
+                chunk = urls[i:i + MAX_QUERY_PARAMS]
+                rows = conn.execute(
+                    f'SELECT url, etag, last_modified, updated_at FROM url_validators WHERE url IN ({",".join("?" * len(chunk))})',
+                    chunk,
+                ).fetchall()
+                found.update((row[0], Validators(*row)) for row in rows)
+        return found
+
+    def save(self, validators: Validators):
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('''
+                    INSERT INTO url_validators (url, etag, last_modified, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        etag=excluded.etag,
+                        last_modified=excluded.last_modified,
+                        updated_at=excluded.updated_at
+                ''', (validators.url, validators.etag, validators.last_modified, validators.updated_at))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to save validators for {validators.url}: {e}")
+
+    def delete(self, url: str):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM url_validators WHERE url = ?', (url,))
+            conn.commit()
+
+
+# Singleton instance
+url_validators = SQLiteValidatorStore()
@@ -0,0 +1,193 @@
+import sqlite3
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from app.config import logger
+from app.sqlite_cache import DB_PATH, BookmarkCacheEntry, MAX_QUERY_PARAMS
+
+# Run states
+RUNNING = "running"      # started and not finished; the next run of the same kind resumes it
+COMPLETED = "completed"
+
+# Item states
+PENDING = "pending"
+DONE = "done"
+
+# Run kinds, one resumable run per kind
+RUN_BROKEN = "broken"
+RUN_SMART_V2 = "smart_v2"
+
+
+@dataclass
+class ValidationRun:
+    """One validation run and its work queue: the bookmarks it set out to check,
+    in order, and which of them are done."""
+
+    run_id: str
+    kind: str
+    started_at: str  # ISO timestamp, same clock as bookmarks_cache.last_checked
+    store: "SQLiteRunStore" = field(repr=False)
+    positions: Dict[str, int] = field(default_factory=dict)
+    done: Set[str] = field(default_factory=set)
+    resumed: bool = False
+
+    @property
+    def pending(self) -> int:
+        return len(self.positions) - len(self.done & self.positions.keys())
+
+    def reconcile(self, entries: Mapping[str, BookmarkCacheEntry]) -> None:
+        """Mark items done whose result reached the cache after the run started.
+
+        Results are written before they are marked done, so a crash between the
+        two would otherwise re-check them.
+        """
+        written = [
+            id for id, entry in entries.items()
+            if id in self.positions and id not in self.done
+            and entry.last_checked and entry.last_checked >= self.started_at
+        ]
+        self.mark_done(written)
+
+    def order(self, items: List, key=lambda b: b.id, url=lambda b: b.url.full) -> List:
+        """Put ``items`` in this run's queue order, skipping done ones. Items the
+        run has not seen (bookmarks added since it started) join at the end."""
+        new = [item for item in items if key(item) not in self.positions]
+        if new:
+            self.store.add_items(self, [(key(item), url(item)) for item in new])
+        todo = [item for item in items if key(item) not in self.done]
+        return sorted(todo, key=lambda item: self.positions[key(item)])
+
+    def mark_done(self, ids: Iterable[str]) -> None:
+        ids = [id for id in ids if id not in self.done]
+        if ids:
+            self.store.mark_done(self.run_id, ids)
+            self.done.update(ids)
+
+    def finish(self) -> None:
+        """Close the run if its queue is empty; otherwise leave it to be resumed."""
+        if self.pending == 0:
+            self.store.complete(self.run_id)
+            logger.info(f"🏁 Run {self.run_id} completed ({len(self.done)} items)")
+        else:
+            logger.info(f"⏸️  Run {self.run_id} paused with {self.pending} items pending")
+
+
+class SQLiteRunStore:
+    """Persists validation runs and their work queues so an interrupted run can
+    pick up exactly where it stopped."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS validation_runs (
+                    run_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS validation_run_items (
+                    run_id TEXT NOT NULL,
+                    bookmark_id TEXT NOT NULL,
+                    url TEXT,
+                    position INTEGER NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    PRIMARY KEY (run_id, bookmark_id)
+                )
+            ''')
+            conn.commit()
+
+    def start_or_resume(self, kind: str, items: Iterable[Tuple[str, str]] = ()) -> ValidationRun:
+        """Resume the open run of ``kind``, or start one queueing ``items`` ((id, url), in order)."""
+        run = self.resume(kind)
+        if run is None:
+            run = self.start(kind, items)
+        return run
+
+    def resume(self, kind: str) -> Optional[ValidationRun]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                'SELECT run_id, started_at FROM validation_runs WHERE kind = ? AND status = ? '
+                'ORDER BY started_at DESC LIMIT 1',
+                (kind, RUNNING)
+            ).fetchone()
+            if not row:
+                return None
+            items = conn.execute(
+                'SELECT bookmark_id, position, state FROM validation_run_items WHERE run_id = ?', (row[0],)
+            ).fetchall()
+        run = ValidationRun(
+            run_id=row[0], kind=kind, started_at=row[1], store=self, resumed=True,
+            positions={id: position for id, position, _ in items},
+            done={id for id, _, state in items if state == DONE},
+        )
+        logger.info(f"▶️  Resuming run {run.run_id} ({len(run.done)} done, {run.pending} pending)")
+        return run
+
+    def start(self, kind: str, items: Iterable[Tuple[str, str]] = ()) -> ValidationRun:
+        now = datetime.utcnow().isoformat()
+        run = ValidationRun(run_id=uuid.uuid4().hex[:12], kind=kind, started_at=now, store=self)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'INSERT INTO validation_runs (run_id, kind, status, started_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (run.run_id, kind, RUNNING, now, now)
+            )
+            conn.commit()
+        self.add_items(run, items)
+        logger.info(f"🆕 Started run {run.run_id} with {len(run.positions)} items")
+        return run
+
+    def add_items(self, run: ValidationRun, items: Iterable[Tuple[str, str]]) -> None:
+        rows = []
+        for bookmark_id, url in items:
+            if bookmark_id not in run.positions:
+                run.positions[bookmark_id] = len(run.positions)
+                rows.append((run.run_id, bookmark_id, url, run.positions[bookmark_id]))
+        if not rows:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO validation_run_items (run_id, bookmark_id, url, position) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            conn.commit()
+
+    def mark_done(self, run_id: str, ids: List[str]) -> None:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                for i in range(0, len(ids), MAX_QUERY_PARAMS):
+                    chunk = ids[i:i + MAX_QUERY_PARAMS]
+                    placeholders = ','.join('?' * len(chunk))
+                    conn.execute(
+                        f'UPDATE validation_run_items SET state = ? WHERE run_id = ? AND bookmark_id IN ({placeholders})',
+                        (DONE, run_id, *chunk)
+                    )
+                conn.execute(
+                    'UPDATE validation_runs SET updated_at = ? WHERE run_id = ?',
+                    (datetime.utcnow().isoformat(), run_id)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            # Not fatal: reconcile() recovers done items from the cache on resume
+            logger.warning(f"⚠️  Failed to checkpoint run {run_id}: {e}")
+
+    def complete(self, run_id: str) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'UPDATE validation_runs SET status = ?, updated_at = ? WHERE run_id = ?',
+                (COMPLETED, datetime.utcnow().isoformat(), run_id)
+            )
+            # The queue of a finished run is only needed while it can be resumed
+            conn.execute('DELETE FROM validation_run_items WHERE run_id = ?', (run_id,))
+            conn.commit()
+
+
+validation_runs = SQLiteRunStore()
@@ -0,0 +1,253 @@
+import asyncio
+import ipaddress
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+from app.config import logger
+from app.config import (
+    HOST_RATE_PER_SECOND, HOST_BURST, HOST_MAX_CONCURRENCY, HOST_POLICY_OVERRIDES,
+    IP_MAX_CONCURRENCY, IP_GROUP_PREFIX,
+    MAX_RETRY_AFTER_SECONDS, DEFAULT_RATE_LIMIT_BACKOFF_SECONDS,
+)
+
+# Statuses that signal "slow down" rather than a broken page
+THROTTLE_STATUSES = {429, 503}
+
+# Poll interval while a host is at its concurrency cap
+_MAX_POLL_SECONDS = 0.25
+
+# IPv6 hosts are grouped by their /64, the usual allocation for one network
+IPV6_GROUP_PREFIX = 64
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    rate: float = HOST_RATE_PER_SECOND  # sustained requests per second
+    burst: int = HOST_BURST  # bucket capacity
+    concurrency: int = HOST_MAX_CONCURRENCY  # simultaneous requests
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until_token(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class _HostState:
+    policy: HostPolicy
+    bucket: TokenBucket
+    in_flight: int = 0
+    blocked_until: float = 0.0  # monotonic time, set from Retry-After
+    stats: Dict[str, int] = field(default_factory=lambda: {"requests": 0, "throttled": 0})
+
+
+@dataclass
+class _GroupState:
+    """Hosts served from one network, e.g. every GitHub Pages site."""
+
+    in_flight: int = 0
+    stats: Dict[str, int] = field(default_factory=lambda: {"requests": 0, "waits": 0})
+    hosts: Set[str] = field(default_factory=set)
+
+
+def ip_group(address: Optional[str], prefix: int = IP_GROUP_PREFIX) -> Optional[str]:
+    """The network an address is grouped under: its IPv4 /``prefix`` or IPv6 /64."""
+    try:
+        ip = ipaddress.ip_address(address or "")
+    except ValueError:
+        return None
+    return str(ipaddress.ip_network(f"{ip}/{prefix if ip.version == 4 else IPV6_GROUP_PREFIX}", strict=False))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def interleave_by_host(items: Iterable[Any], key: Callable[[Any], Optional[str]]) -> List[Any]:
+    """Reorder items round-robin across hosts so one big host cannot monopolise the workers."""
+    queues: "OrderedDict[Optional[str], deque]" = OrderedDict()
+    for item in items:
+        queues.setdefault(key(item), deque()).append(item)
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return ordered
+
+
+class HostScheduler:
+    """Per-host politeness: token-bucket rate, concurrency cap and Retry-After back-off.
+
+    Hosts resolving into the same network (shared hosting, a CDN edge) also
+    share ``ip_concurrency`` requests in flight, so per-host caps do not add up
+    to an overloaded backend. Callers pass the host's resolved addresses; the
+    first, the one connected to, decides its group.
+    """
+
+    def __init__(
+        self,
+        default_policy: Optional[HostPolicy] = None,
+        overrides: Optional[Mapping[str, Mapping[str, float]]] = None,
+        max_retry_after: float = MAX_RETRY_AFTER_SECONDS,
+        ip_concurrency: int = IP_MAX_CONCURRENCY,
+    ):
+        self.default_policy = default_policy or HostPolicy()
+        self.overrides = {
+            domain.lower(): HostPolicy(
+                rate=float(cfg.get("rate", self.default_policy.rate)),
+                burst=int(cfg.get("burst", self.default_policy.burst)),
+                concurrency=int(cfg.get("concurrency", self.default_policy.concurrency)),
+            )
+            for domain, cfg in (HOST_POLICY_OVERRIDES if overrides is None else overrides).items()
+        }
+        self.max_retry_after = max_retry_after
+        self.ip_concurrency = ip_concurrency
+        self._hosts: Dict[str, _HostState] = {}
+        self._groups: Dict[str, _GroupState] = {}
+
+    def policy_for(self, host: str) -> HostPolicy:
+        host = (host or "").lower()
+        labels = host.split(".")
+        # Most specific configured suffix wins: a.b.github.com -> b.github.com -> github.com
+        for i in range(len(labels)):
+            policy = self.overrides.get(".".join(labels[i:]))
+            if policy:
+                return policy
+        return self.default_policy
+
+    def _state(self, host: str) -> _HostState:
+        host = (host or "").lower()
+        state = self._hosts.get(host)
+        if state is None:
+            policy = self.policy_for(host)
+            state = _HostState(policy, TokenBucket(policy.rate, policy.burst))
+            self._hosts[host] = state
+        return state
+
+    def _group(self, host: str, addresses: Sequence[str]) -> Optional[_GroupState]:
+        key = ip_group(addresses[0]) if addresses and self.ip_concurrency > 0 else None
+        if key is None:
+            return None
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _GroupState()
+        group.hosts.add((host or "").lower())
+        return group
+
+    def _try_acquire(self, state: _HostState, group: Optional[_GroupState] = None) -> float:
+        """Take a slot if possible; otherwise return how long to wait before trying again."""
+        now = time.monotonic()
+        if state.blocked_until > now:
+            return state.blocked_until - now
+        if state.in_flight >= state.policy.concurrency:
+            return _MAX_POLL_SECONDS
+        if group and group.in_flight >= self.ip_concurrency:
+            group.stats["waits"] += 1
+            return _MAX_POLL_SECONDS
+        wait = state.bucket.time_until_token(now)
+        if wait > 0:
+            return wait
+        state.bucket.take(now)
+        state.in_flight += 1
+        state.stats["requests"] += 1
+        if group:
+            group.in_flight += 1
+            group.stats["requests"] += 1
+        return 0.0
+
+    async def acquire(self, host: str, addresses: Sequence[str] = ()) -> None:
+        state, group = self._state(host), self._group(host, addresses)
+        while True:
+            wait = self._try_acquire(state, group)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, host: str, addresses: Sequence[str] = ()) -> None:
+        state, group = self._state(host), self._group(host, addresses)
+        state.in_flight = max(0, state.in_flight - 1)
+        if group:
+            group.in_flight = max(0, group.in_flight - 1)
+
+    @asynccontextmanager
+    async def slot(self, host: str, addresses: Sequence[str] = ()):
+        """Hold one of ``host``'s request slots; ``addresses`` (from the DNS stage)
+        also count the request against the host's network."""
+        await self.acquire(host, addresses)
+        try:
+            yield
+        finally:
+            self.release(host, addresses)
+
+    def observe(self, host: str, status: Optional[int], headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """Record a response; on 429/503 block the host for Retry-After seconds.
+
+        Returns the back-off applied, or None if the response was not a throttle signal.
+        A Retry-After longer than ``max_retry_after`` is capped.
+        """
+        if status not in THROTTLE_STATUSES:
+            return None
+        retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+        if retry_after is None:
+            if status != 429:
+                return None  # A plain 503 is a server error, not a throttle
+            retry_after = DEFAULT_RATE_LIMIT_BACKOFF_SECONDS
+        delay = min(retry_after, self.max_retry_after)
+        state = self._state(host)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+        state.stats["throttled"] += 1
+        logger.info(f"🐢 Throttled by {host} [{status}], backing off {delay:.1f}s")
+        return delay
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            host: {**state.stats, "in_flight": state.in_flight, "rate": state.policy.rate}
+            for host, state in self._hosts.items()
+        }
+
+    def get_group_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per network: requests, waits at the shared cap, in flight and hosts seen on it."""
+        return {
+            network: {**group.stats, "in_flight": group.in_flight, "hosts": len(group.hosts)}
+            for network, group in self._groups.items()
+        }
+
+
+# Singleton instance shared by every checker in the process
+host_scheduler = HostScheduler()
@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import multiprocessing
+import queue
+import traceback
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Sequence, TypeVar
+
+from app.config import logger
+
+T = TypeVar("T")
+
+# Messages a shard sends back: (shard, kind, payload)
+SHARD_RESULT = "result"
+SHARD_DONE = "done"
+SHARD_FAILED = "failed"
+
+# How often the parent wakes up to notice a shard that died without reporting
+SHARD_POLL_SECONDS = 0.5
+
+
+def shard_for(key: Optional[str], shards: int) -> int:
+    """Stable shard index for ``key``.
+
+    Uses blake2b rather than ``hash()``, which is salted per process and would send
+    the same host to different shards in different runs.
+    """
+    digest = hashlib.blake2b((key or "").lower().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def partition(items: Iterable[T], shards: int, key: Callable[[T], Optional[str]]) -> List[List[T]]:
+    """Split ``items`` into ``shards`` lists, keeping items with equal keys together and in order."""
+    parts: List[List[T]] = [[] for _ in range(shards)]
+    for item in items:
+        parts[shard_for(key(item), shards)].append(item)
+    return parts
+
+
+def _run_shard(shard: int, target, items: Sequence[Any], results, args: tuple) -> None:
+    """Process entry point: drain ``target(items, *args)`` on a fresh event loop."""
+    async def drain():
+        async for result in target(items, *args):
+            results.put((shard, SHARD_RESULT, result))
+
+    try:
+        asyncio.run(drain())
+    except BaseException:
+        results.put((shard, SHARD_FAILED, traceback.format_exc()))
+    else:
+        results.put((shard, SHARD_DONE, None))
+
+
+async def iter_sharded(
+    target: Callable[..., AsyncIterator[Any]],
+    partitions: Sequence[Sequence[Any]],
+    args: tuple = (),
+) -> AsyncIterator[Any]:
+    """Run ``target(items, *args)`` in one process per non-empty partition and yield
+    everything the shards produce, in arrival order.
+
+    ``target`` must be an async generator function importable by the child (a
+    module-level function), and items, args and results must pickle. Processes
+    are spawned, not forked, so no event loop, connection pool or SQLite handle is
+    inherited from the parent. A shard that fails is logged and its remaining
+    items are skipped; the other shards carry on.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = {}
+    for shard, items in enumerate(partitions):
+        if items:
+            processes[shard] = context.Process(
+                target=_run_shard,
+                args=(shard, target, list(items), results, args),
+                name=f"check-shard-{shard}",
+                daemon=True,
+            )
+            processes[shard].start()
+    logger.info(f"🧩 Started {len(processes)} shards: {', '.join(f'{s}={len(partitions[s])}' for s in processes)}")
+
+    loop = asyncio.get_running_loop()
+    running = set(processes)
+    exited = set()
+    try:
+        while running:
+            try:
+                shard, kind, payload = await loop.run_in_executor(None, results.get, True, SHARD_POLL_SECONDS)
+            except queue.Empty:
+                # A child flushes its queue before exiting, so a shard that was already
+                # dead on the previous empty poll has nothing left to say
+                for shard in [s for s in running if s in exited]:
+                    logger.error(f"❌ Shard {shard} exited with code {processes[shard].exitcode} without finishing")
+                    running.discard(shard)
+                exited = {s for s in running if not processes[s].is_alive()}
+                continue
+            if kind == SHARD_RESULT:
+                yield payload
+            elif kind == SHARD_FAILED:
+                logger.error(f"❌ Shard {shard} failed:\n{payload}")
+                running.discard(shard)
+            else:
+                running.discard(shard)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join()
+        results.close()
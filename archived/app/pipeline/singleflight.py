@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.config import logger
+from app.config import CHECK_LEASE_SECONDS, CHECK_LEASE_POLL_SECONDS
+from app.sqlite_cache import DB_PATH
+
+T = TypeVar("T")
+
+
+class SQLiteCheckLeases:
+    """Short-lived per-URL leases so separate processes (API server, CLI, scripts)
+    never fetch the same URL at the same time."""
+
+    def __init__(self, db_path: str = DB_PATH, lease_seconds: int = CHECK_LEASE_SECONDS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        # Leases are ephemeral, durability is not worth an fsync per check
+        conn.execute('PRAGMA synchronous=OFF')
+        return conn
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS check_leases (
+                    url_key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    def try_acquire(self, url_key: str, owner: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute('''
+                INSERT INTO check_leases (url_key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(url_key) DO UPDATE SET
+                    owner=excluded.owner,
+                    expires_at=excluded.expires_at
+                WHERE check_leases.expires_at < ?
+            ''', (url_key, owner, now + self.lease_seconds, now))
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def release(self, url_key: str, owner: str):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM check_leases WHERE url_key = ? AND owner = ?', (url_key, owner))
+            conn.commit()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight call.
+
+    Callers that arrive while a call for ``key`` is running await its result
+    instead of starting their own. With a lease store, the same holds across
+    processes: a caller waits for the other process to finish and then runs
+    ``fn``, which is expected to find the fresh result in the shared cache.
+    """
+
+    def __init__(self, leases: Optional[SQLiteCheckLeases] = None, poll_seconds: float = CHECK_LEASE_POLL_SECONDS):
+        self._leases = leases
+        self.poll_seconds = poll_seconds
+        self._owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loop = None
+        self.stats = {"calls": 0, "coalesced": 0, "lease_waits": 0}
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._inflight.clear()
+
+        existing = self._inflight.get(key)
+        if existing is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(existing)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        self.stats["calls"] += 1
+        leased = False
+        try:
+            leased = await self._acquire_lease(key)
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            try:
+                if leased:
+                    await self._release_lease(key)
+            finally:
+                self._inflight.pop(key, None)
+
+    async def _acquire_lease(self, key: str) -> bool:
+        if not self._leases:
+            return False
+        # Lease writes run on the default executor so SQLite never blocks the event loop
+        loop = asyncio.get_running_loop()
+        waited = False
+        while True:
+            try:
+                if await loop.run_in_executor(None, self._leases.try_acquire, key, self._owner):
+                    return True
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Check lease unavailable, continuing without it: {e}")
+                return False
+            if not waited:
+                waited = True
+                self.stats["lease_waits"] += 1
+                logger.debug(f"⏳ Waiting for another process checking {key}")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _release_lease(self, key: str) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._leases.release, key, self._owner)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to release check lease for {key}: {e}")
+
+
+# Singleton instances: every URL check (CLI, scripts, API) goes through url_checks
+check_leases = SQLiteCheckLeases()
+url_checks = SingleFlight(check_leases)
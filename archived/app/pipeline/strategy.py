@@ -0,0 +1,222 @@
+import ipaddress
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.config import logger
+from app.config import STRATEGY_MIN_OBSERVATIONS, STRATEGY_REPROBE_DAYS
+from app.sqlite_cache import DB_PATH
+
+# HTTP strategies
+HEAD = "HEAD"  # HEAD only
+GET_RANGE = "GET_RANGE"  # ranged GET only, scanning the body for login markers
+HEAD_WITH_FALLBACK = "HEAD_WITH_FALLBACK"  # HEAD, then a ranged GET if HEAD is refused
+
+# What a domain's HEAD request got
+HEAD_OK = "ok"  # a usable answer
+HEAD_REFUSED = "refused"  # 405/429/501 or a dropped connection, so a GET was needed
+HEAD_BLOCKED = "blocked"  # a bot-block status (401/403/999) that a GET may get past
+
+# Starting points for domains without history, from the hand-kept table this replaces
+SEED_STRATEGIES = {
+    'google.com': GET_RANGE,
+    'twitter.com': GET_RANGE,
+    'x.com': GET_RANGE,
+    'linkedin.com': GET_RANGE,
+    'facebook.com': GET_RANGE,
+    'instagram.com': GET_RANGE,
+    'notion.so': GET_RANGE,
+    'github.com': HEAD,
+    'reddit.com': HEAD,
+    'stackoverflow.com': HEAD,
+    'youtube.com': HEAD,
+    'medium.com': HEAD,
+}
+
+# Public suffixes with more than one label; without a public-suffix list this
+# covers the ones bookmarks actually use
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk', 'co.jp', 'ne.jp', 'or.jp', 'ac.jp',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'co.nz', 'org.nz', 'co.in', 'co.za',
+    'com.br', 'com.cn', 'com.mx', 'com.tr', 'com.sg', 'com.hk', 'com.tw',
+    'github.io', 'gitlab.io', 'herokuapp.com', 'blogspot.com', 'appspot.com',
+    'netlify.app', 'vercel.app', 'pages.dev', 'web.app', 'firebaseapp.com',
+}
+
+# Answers kept per domain: beyond this the older history is halved, so a
+# domain that changed its HEAD handling is re-learned within a few checks
+STRATEGY_HISTORY = 20
+
+
+def registrable_domain(hostname: str) -> str:
+    """The domain a site's owner registered: ``docs.google.com`` -> ``google.com``,
+    ``news.bbc.co.uk`` -> ``bbc.co.uk``. IP addresses are returned as they are."""
+    hostname = (hostname or "").lower().rstrip(".")
+    try:
+        ipaddress.ip_address(hostname.strip("[]"))
+        return hostname
+    except ValueError:
+        pass
+    labels = hostname.split(".")
+    keep = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    return ".".join(labels[-keep:])
+
+
+@dataclass
+class DomainStrategy:
+    """HEAD history of one registrable domain; counts decay as they are replaced."""
+
+    domain: str
+    head_ok: float = 0.0
+    head_refused: float = 0.0
+    head_blocked: float = 0.0
+    head_tried_at: float = 0.0  # unix timestamp of the last HEAD sent to the domain
+
+    @property
+    def observations(self) -> float:
+        return self.head_ok + self.head_refused + self.head_blocked
+
+    def record(self, outcome: str, now: float) -> None:
+        if self.observations >= STRATEGY_HISTORY:
+            self.head_ok, self.head_refused, self.head_blocked = (
+                self.head_ok / 2, self.head_refused / 2, self.head_blocked / 2
+            )
+        if outcome == HEAD_OK:
+            self.head_ok += 1
+        elif outcome == HEAD_REFUSED:
+            self.head_refused += 1
+        else:
+            self.head_blocked += 1
+        self.head_tried_at = now
+
+    def strategy(self, now: float, min_observations: int, reprobe_seconds: float) -> Optional[str]:
+        """The learned strategy, or None while the history is too short to tell."""
+        if self.observations < min_observations:
+            return None
+        if self.head_refused + self.head_blocked <= self.head_ok:
+            return HEAD_WITH_FALLBACK
+        if now - self.head_tried_at >= reprobe_seconds:
+            return HEAD_WITH_FALLBACK  # time to see whether HEAD works there now
+        return GET_RANGE
+
+
+class SQLiteStrategyStore:
+    """Persists per-domain HEAD history so learned strategies survive restarts."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS domain_strategies (
+                    domain TEXT PRIMARY KEY,
+                    head_ok REAL DEFAULT 0,
+                    head_refused REAL DEFAULT 0,
+                    head_blocked REAL DEFAULT 0,
+                    head_tried_at REAL DEFAULT 0
+                )
+            ''')
+            conn.commit()
+
+    def load_all(self) -> Dict[str, DomainStrategy]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                'SELECT domain, head_ok, head_refused, head_blocked, head_tried_at FROM domain_strategies'
+            ).fetchall()
+        return {row[0]: DomainStrategy(*row) for row in rows}
+
+    def save(self, entry: DomainStrategy):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO domain_strategies (domain, head_ok, head_refused, head_blocked, head_tried_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(domain) DO UPDATE SET
+                    head_ok=excluded.head_ok,
+                    head_refused=excluded.head_refused,
+                    head_blocked=excluded.head_blocked,
+                    head_tried_at=excluded.head_tried_at
+            ''', (entry.domain, entry.head_ok, entry.head_refused, entry.head_blocked, entry.head_tried_at))
+            conn.commit()
+
+    def clear(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM domain_strategies')
+            conn.commit()
+
+
+class StrategyLearner:
+    """Cheapest reliable first request per registrable domain, learned from what
+    its HEAD requests got.
+
+    Domains whose HEAD is mostly refused or bot-blocked go straight to a ranged
+    GET, saving the HEAD round trip; the rest start with HEAD and fall back to
+    GET. Domains without enough history use ``SEED_STRATEGIES`` or HEAD with
+    fallback.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteStrategyStore] = None,
+        min_observations: int = STRATEGY_MIN_OBSERVATIONS,
+        reprobe_days: float = STRATEGY_REPROBE_DAYS,
+    ):
+        self._store = store
+        self.min_observations = min_observations
+        self.reprobe_seconds = reprobe_days * 86400
+        self._domains: Dict[str, DomainStrategy] = {}
+        self._loaded = False
+        self.stats = {"learned": 0, "seeded": 0, "default": 0}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._store:
+            try:
+                self._domains.update(self._store.load_all())
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Failed to load domain strategies: {e}")
+
+    def strategy_for(self, hostname: str) -> str:
+        self._ensure_loaded()
+        domain = registrable_domain(hostname)
+        entry = self._domains.get(domain)
+        learned = entry.strategy(time.time(), self.min_observations, self.reprobe_seconds) if entry else None
+        if learned:
+            self.stats["learned"] += 1
+            return learned
+        if domain in SEED_STRATEGIES:
+            self.stats["seeded"] += 1
+            return SEED_STRATEGIES[domain]
+        self.stats["default"] += 1
+        return HEAD_WITH_FALLBACK
+
+    def record(self, hostname: str, outcome: str) -> None:
+        """Add what a HEAD request to ``hostname`` got to its domain's history."""
+        self._ensure_loaded()
+        domain = registrable_domain(hostname)
+        entry = self._domains.get(domain)
+        if entry is None:
+            entry = self._domains[domain] = DomainStrategy(domain)
+        before = entry.strategy(time.time(), self.min_observations, self.reprobe_seconds)
+        entry.record(outcome, time.time())
+        after = entry.strategy(time.time(), self.min_observations, self.reprobe_seconds)
+        if after != before and after is not None:
+            logger.info(f"🧠 Learned strategy for {domain}: {after}")
+        if self._store:
+            try:
+                self._store.save(entry)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Failed to persist strategy for {domain}: {e}")
+
+    def clear(self) -> None:
+        self._domains.clear()
+        if self._store:
+            self._store.clear()
+
+
+# Singleton instance
+domain_strategies = StrategyLearner(SQLiteStrategyStore())
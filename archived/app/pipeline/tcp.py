@@ -0,0 +1,186 @@
+import asyncio
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.config import logger
+from app.config import TCP_TIMEOUT_SECONDS, TCP_CACHE_TTL_SECONDS, TCP_CONCURRENCY, TCP_HANDOFF_SECONDS
+
+# Failed connects are retried sooner than successful verdicts are
+TCP_NEGATIVE_TTL_SECONDS = 300
+
+
+@dataclass
+class TCPResult:
+    host: str
+    port: int
+    connectable: bool
+    address: Optional[str] = None  # the address that accepted the connection
+    error: Optional[str] = None
+    error_kind: Optional[str] = None  # 'timeout', 'refused' or 'connection'
+    expires_at: float = 0.0  # when this cached verdict must be re-probed
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+def is_open(sock: socket.socket) -> bool:
+    """Whether the peer has not closed ``sock``, without consuming anything from it."""
+    try:
+        return sock.recv(1, socket.MSG_PEEK) != b""
+    except BlockingIOError:
+        return True  # nothing to read yet: still open
+    except OSError:
+        return False
+
+
+class TCPProbe:
+    """Async TCP connect probe, run once per host:port and reused by every URL on it.
+
+    Tries the host's resolved addresses in order. The connection that answered
+    is not thrown away: it is parked for ``handoff`` seconds so the HTTP request
+    that follows can ``take`` it instead of connecting again, and closed if
+    nobody does.
+    """
+
+    def __init__(
+        self,
+        timeout: float = TCP_TIMEOUT_SECONDS,
+        ttl: int = TCP_CACHE_TTL_SECONDS,
+        concurrency: int = TCP_CONCURRENCY,
+        handoff: float = TCP_HANDOFF_SECONDS,
+    ):
+        self.timeout = timeout
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.handoff = handoff
+        self._cache: Dict[Tuple[str, int], TCPResult] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._parked: Dict[Tuple[str, int], Tuple[socket.socket, asyncio.TimerHandle]] = {}
+        self._loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {"hits": 0, "probes": 0, "failures": 0, "handed_off": 0}
+
+    def cached(self, host: str, port: int) -> Optional[TCPResult]:
+        entry = self._cache.get((host.lower(), port))
+        return entry if entry and entry.is_fresh() else None
+
+    def forget_failure(self, host: str, port: int) -> None:
+        """Drop a cached connect timeout or reset so a retry probes again.
+        Refused connections stay cached."""
+        key = (host.lower(), port)
+        entry = self._cache.get(key)
+        if entry and entry.error_kind in ("timeout", "connection"):
+            del self._cache[key]
+
+    async def probe(self, host: str, port: int, addresses: Sequence[str] = ()) -> TCPResult:
+        """Return whether host:port accepts connections, connecting only on a cache miss.
+
+        ``addresses`` lets callers reuse IPs from the DNS stage instead of resolving again.
+        """
+        key = (host.lower(), port)
+        entry = self.cached(*key)
+        if entry:
+            self.stats["hits"] += 1
+            return entry
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphores bind to the running loop; recreate when called from a new one
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._inflight.clear()
+            self._close_parked()
+        if key in self._inflight:
+            self.stats["hits"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            async with self._semaphore:
+                result, sock = await self._connect(key[0], port, list(addresses) or [key[0]])
+            self._cache[key] = result
+            if sock is not None:
+                self._park(key, sock)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _connect(
+        self, host: str, port: int, addresses: Sequence[str]
+    ) -> Tuple[TCPResult, Optional[socket.socket]]:
+        self.stats["probes"] += 1
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        kind, error = "connection", "no addresses"
+        for address in dict.fromkeys(addresses):
+            # A bare socket rather than a stream, so either HTTP client can adopt it
+            sock = socket.socket(socket.AF_INET6 if ":" in address else socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            try:
+                await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                kind, error = "timeout", f"TCP connect timed out after {self.timeout:.1f}s"
+            except ConnectionRefusedError as e:
+                kind, error = "refused", str(e)
+            except OSError as e:
+                kind, error = "connection", str(e)
+            else:
+                logger.debug(f"🔌 TCP connectable: {host}:{port} via {address}")
+                return TCPResult(host, port, True, address, expires_at=now + self.ttl), sock
+            sock.close()
+        self.stats["failures"] += 1
+        logger.debug(f"❌ TCP connect failed: {host}:{port} - {error}")
+        return TCPResult(host, port, False, None, error, kind, now + min(self.ttl, TCP_NEGATIVE_TTL_SECONDS)), None
+
+    def _park(self, key: Tuple[str, int], sock: socket.socket) -> None:
+        self._discard(key)
+        if self.handoff <= 0:
+            sock.close()
+            return
+        self._parked[key] = (sock, self._loop.call_later(self.handoff, self._discard, key))
+
+    def _discard(self, key: Tuple[str, int]) -> None:
+        parked = self._parked.pop(key, None)
+        if parked:
+            parked[1].cancel()
+            parked[0].close()
+
+    def _close_parked(self) -> None:
+        for sock, _ in self._parked.values():
+            sock.close()
+        self._parked.clear()
+
+    def take(self, host: str, port: int) -> Optional[socket.socket]:
+        """The connection the probe of host:port left open, if it is still usable.
+
+        It is handed over once; the caller owns it from then on and must close it.
+        """
+        parked = self._parked.pop((host.lower(), port), None)
+        if not parked:
+            return None
+        sock, expiry = parked
+        expiry.cancel()
+        if not is_open(sock):
+            sock.close()
+            return None
+        self.stats["handed_off"] += 1
+        return sock
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._close_parked()
+
+
+# Singleton instance
+tcp_probe = TCPProbe()
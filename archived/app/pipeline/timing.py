@@ -0,0 +1,123 @@
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+from app.pipeline.revalidation import response_bytes
+
+
+@dataclass
+class RequestTimings:
+    """Measured cost of a check's HTTP traffic, summed over its requests and
+    redirect hops. Times are in milliseconds; None means the phase did not
+    happen (e.g. a pooled connection needs no DNS lookup or connect).
+
+    aiohttp does the TLS handshake inside its connect and has no hook between
+    the two, so with it ``connect_ms`` includes TLS and ``tls_ms`` stays None.
+    """
+
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    first_byte_ms: Optional[float] = None  # request sent -> response headers in
+    transfer_ms: Optional[float] = None  # response headers in -> body read
+    bytes_sent: int = 0  # request lines, headers and bodies
+    bytes_received: int = 0  # status lines, headers and body bytes off the wire
+
+    def add(self, phase: str, started: float) -> None:
+        """Add the time since ``started`` (a ``time.monotonic()`` reading) to ``phase``."""
+        setattr(self, phase, (getattr(self, phase) or 0.0) + (time.monotonic() - started) * 1000)
+
+    def merge(self, other: "RequestTimings") -> "RequestTimings":
+        for f in fields(self):
+            mine, theirs = getattr(self, f.name), getattr(other, f.name)
+            if theirs is not None:
+                setattr(self, f.name, theirs if mine is None else mine + theirs)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: round(value, 2) if isinstance(value, float) else value for name, value in asdict(self).items()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]]) -> "RequestTimings":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in names})
+
+
+def request_bytes(method: str, target: str, headers: Mapping[str, str]) -> int:
+    """Bytes of an HTTP/1.1 request head as written on the wire."""
+    size = len(f"{method} {target} HTTP/1.1\r\n") + 2
+    return size + sum(len(name) + len(value) + 4 for name, value in headers.items())
+
+
+def _timings(trace_config_ctx) -> Optional[RequestTimings]:
+    timings = trace_config_ctx.trace_request_ctx
+    return timings if isinstance(timings, RequestTimings) else None
+
+
+async def _on_dns_start(session, ctx, params):
+    ctx.dns_started = time.monotonic()
+
+
+async def _on_dns_end(session, ctx, params):
+    timings = _timings(ctx)
+    if timings:
+        timings.add("dns_ms", ctx.dns_started)
+
+
+async def _on_connect_start(session, ctx, params):
+    ctx.connect_started = time.monotonic()
+
+
+async def _on_connect_end(session, ctx, params):
+    timings = _timings(ctx)
+    if timings:
+        timings.add("connect_ms", ctx.connect_started)
+
+
+async def _on_headers_sent(session, ctx, params):
+    ctx.sent = time.monotonic()
+    timings = _timings(ctx)
+    if timings:
+        timings.bytes_sent += request_bytes(params.method, params.url.raw_path_qs, params.headers)
+
+
+async def _on_chunk_sent(session, ctx, params):
+    timings = _timings(ctx)
+    if timings:
+        timings.bytes_sent += len(params.chunk)
+
+
+async def _on_response(session, ctx, params):
+    """Response headers are in, for a redirect hop or the final response."""
+    timings = _timings(ctx)
+    if timings:
+        timings.add("first_byte_ms", ctx.sent)
+        response = params.response
+        timings.bytes_received += response_bytes(response.status, response.reason, response.raw_headers)
+
+
+def record_body(timings: RequestTimings, response: aiohttp.ClientResponse, read_started: float) -> None:
+    """Account for the final response's body, read since ``read_started``: every
+    byte that arrived counts, not just the ones the check looked at."""
+    timings.add("transfer_ms", read_started)
+    timings.bytes_received += response.content.total_bytes
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """Hooks filling the ``RequestTimings`` passed as a request's ``trace_request_ctx``.
+
+    The final response's body is not traced (aiohttp only reports chunks for
+    whole-body reads); call ``record_body`` once it has been read.
+    """
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connect_start)
+    config.on_connection_create_end.append(_on_connect_end)
+    config.on_request_headers_sent.append(_on_headers_sent)
+    config.on_request_chunk_sent.append(_on_chunk_sent)
+    config.on_request_redirect.append(_on_response)
+    config.on_request_end.append(_on_response)
+    return config
@@ -0,0 +1,217 @@
+import asyncio
+import socket
+import ssl
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from app.config import logger
+from app.config import TLS_TIMEOUT_SECONDS, TLS_CACHE_TTL_SECONDS, TLS_CONCURRENCY, TLS_HANDOFF_SECONDS
+from app.pipeline.latency import LatencyTracker, tls_latency
+
+# Failed handshakes are retried sooner than successful verdicts are
+TLS_NEGATIVE_TTL_SECONDS = 300
+
+
+@dataclass
+class TLSResult:
+    host: str
+    port: int
+    valid: bool
+    error: Optional[str] = None
+    error_kind: Optional[str] = None  # 'ssl', 'timeout', 'refused' or 'connection'
+    cert_expires: Optional[str] = None  # ISO format string (certificate notAfter)
+    expires_at: float = 0.0  # when this cached verdict must be re-probed
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class TLSProbe:
+    """Async TLS handshake probe, run once per host:port and reused by every URL on it.
+
+    The handshake verifies the certificate, on the TCP probe's connection when
+    it is given one. A connection that passed is parked for ``handoff`` seconds
+    so the HTTP request can ``take`` it, handshake done, and closed if nobody
+    does.
+
+    With a latency tracker, ``timeout`` is only the default until the host has a
+    handshake history of its own.
+    """
+
+    def __init__(
+        self,
+        timeout: float = TLS_TIMEOUT_SECONDS,
+        ttl: int = TLS_CACHE_TTL_SECONDS,
+        latency: Optional[LatencyTracker] = None,
+        concurrency: int = TLS_CONCURRENCY,
+        handoff: float = TLS_HANDOFF_SECONDS,
+        context: Optional[ssl.SSLContext] = None,
+    ):
+        self.timeout = timeout
+        self.latency = latency
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.handoff = handoff
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: Dict[Tuple[str, int], TLSResult] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._parked: Dict[Tuple[str, int], Tuple[asyncio.Transport, asyncio.TimerHandle]] = {}
+        self._loop = None
+        self._context = context or ssl.create_default_context()
+        self.stats = {"hits": 0, "probes": 0, "failures": 0, "handed_off": 0}
+
+    def cached(self, host: str, port: int = 443) -> Optional[TLSResult]:
+        entry = self._cache.get((host.lower(), port))
+        return entry if entry and entry.is_fresh() else None
+
+    def forget_failure(self, host: str, port: int = 443) -> None:
+        """Drop a cached handshake timeout or dropped connection so a retry probes again.
+        Certificate errors and refused connections stay cached."""
+        key = (host.lower(), port)
+        entry = self._cache.get(key)
+        if entry and entry.error_kind in ("timeout", "connection"):
+            del self._cache[key]
+
+    async def probe(
+        self, host: str, port: int = 443, address: Optional[str] = None, sock: Optional[socket.socket] = None
+    ) -> TLSResult:
+        """Return the certificate verdict for host:port, handshaking only on a cache miss.
+
+        ``address`` lets callers reuse an IP from the DNS stage instead of resolving
+        again; ``sock``, a connected socket to host:port, is handshaken on instead
+        of connecting at all. The probe owns ``sock`` and closes it if unused.
+        """
+        key = (host.lower(), port)
+        entry = self.cached(*key)
+        if entry:
+            self.stats["hits"] += 1
+            if sock is not None:
+                sock.close()
+            return entry
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._inflight.clear()
+            self._close_parked()
+        if key in self._inflight:
+            self.stats["hits"] += 1
+            if sock is not None:
+                sock.close()
+            return await asyncio.shield(self._inflight[key])
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            async with self._semaphore:
+                result, connection = await self._handshake(key[0], port, address, sock)
+            self._cache[key] = result
+            if connection is not None:
+                self._park(key, connection)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _handshake(
+        self, host: str, port: int, address: Optional[str], sock: Optional[socket.socket]
+    ) -> Tuple[TLSResult, Optional[asyncio.Transport]]:
+        self.stats["probes"] += 1
+        now = time.time()
+        timeout = self.latency.timeout_for(host, self.timeout) if self.latency else self.timeout
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            # A bare protocol: the transport is only held until a request adopts it
+            if sock is not None:
+                connect = loop.create_connection(asyncio.Protocol, sock=sock, ssl=self._context, server_hostname=host)
+            else:
+                connect = loop.create_connection(
+                    asyncio.Protocol, address or host, port, ssl=self._context, server_hostname=host
+                )
+            transport, _ = await asyncio.wait_for(connect, timeout=timeout)
+            if self.latency:
+                self.latency.record(host, time.monotonic() - started)
+            cert = transport.get_extra_info("peercert") or {}
+            cert_expires = None
+            ttl = self.ttl
+            if cert.get("notAfter"):
+                not_after = ssl.cert_time_to_seconds(cert["notAfter"])
+                cert_expires = datetime.fromtimestamp(not_after, tz=timezone.utc).isoformat()
+                # Never trust a cached verdict past the certificate's own expiry
+                ttl = max(0, min(ttl, not_after - now))
+            logger.debug(f"🔒 SSL valid: {host}:{port} (expires {cert_expires})")
+            result = TLSResult(host, port, bool(cert), None, None, cert_expires, now + ttl)
+            if not result.valid:
+                transport.close()
+                transport = None
+            return result, transport
+        except ssl.SSLError as e:
+            kind, error = "ssl", str(e)
+        except asyncio.TimeoutError:
+            kind, error = "timeout", f"TLS handshake timed out after {timeout:.1f}s"
+            if self.latency:
+                self.latency.record_timeout(host, timeout)
+        except ConnectionRefusedError as e:
+            kind, error = "refused", str(e)
+        except OSError as e:
+            kind, error = "connection", str(e)
+        if sock is not None:
+            sock.close()
+        self.stats["failures"] += 1
+        logger.debug(f"❌ TLS probe failed: {host}:{port} - {error}")
+        return TLSResult(host, port, False, error, kind, None, now + min(self.ttl, TLS_NEGATIVE_TTL_SECONDS)), None
+
+    def _park(self, key: Tuple[str, int], transport: asyncio.Transport) -> None:
+        self._discard(key)
+        if self.handoff <= 0:
+            transport.close()
+            return
+        self._parked[key] = (transport, self._loop.call_later(self.handoff, self._discard, key))
+
+    def _discard(self, key: Tuple[str, int]) -> None:
+        parked = self._parked.pop(key, None)
+        if parked:
+            parked[1].cancel()
+            parked[0].close()
+
+    def _close_parked(self) -> None:
+        for transport, _ in self._parked.values():
+            try:
+                transport.close()
+            except RuntimeError:
+                pass  # its event loop is already closed
+        self._parked.clear()
+
+    def take(self, host: str, port: int = 443) -> Optional[asyncio.Transport]:
+        """The verified connection the probe of host:port left open, if it is still usable.
+
+        It is handed over once; the caller owns it from then on and must close it.
+        """
+        parked = self._parked.pop((host.lower(), port), None)
+        if not parked:
+            return None
+        transport, expiry = parked
+        expiry.cancel()
+        if transport.is_closing():
+            return None
+        self.stats["handed_off"] += 1
+        return transport
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._close_parked()
+
+
+# Singleton instance
+tls_probe = TLSProbe(latency=tls_latency)
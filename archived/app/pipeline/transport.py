@@ -0,0 +1,357 @@
+import asyncio
+import platform
+import socket
+import ssl
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from app.config import CHECK_TRANSPORT
+from app.pipeline.revalidation import response_bytes
+from app.pipeline.redirects import Redirect, redirect_chain
+from app.pipeline.timing import RequestTimings, record_body, trace_config
+from app.pipeline.login import scan_for_login
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10
+# Largest status line + header block the raw prober accepts
+MAX_HEADER_BYTES = 64 * 1024
+
+
+# An open connection a probe hands to the request: the TCP probe's plain socket,
+# or the TLS probe's transport with the (verified) handshake already done
+Connection = Union[socket.socket, asyncio.Transport]
+
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def _unverified_context() -> ssl.SSLContext:
+    """Shared client context; building one loads the CA store, far too slow per request.
+    Certificates are checked by the TLS stage, here we only want the status."""
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+        _ssl_context.check_hostname = False
+        _ssl_context.verify_mode = ssl.CERT_NONE
+    return _ssl_context
+
+
+class FetchResult(NamedTuple):
+    status: int
+    reason: Optional[str]
+    headers: Any  # case-insensitive mapping
+    final_url: str
+    elapsed: float  # seconds, including the body read for GET
+    size: int  # bytes received over every hop: status lines, headers and body read
+    redirects: Tuple[Redirect, ...] = ()  # hops followed to reach final_url, in order
+    timings: Optional[RequestTimings] = None  # measured phases and bytes, over every hop
+    body: bytes = b""  # start of the final response's body, as read
+    login_page: Optional[bool] = None  # login markers in the body; None unless scanned
+
+
+class TransportError(Exception):
+    """The request failed below HTTP: broken connection, malformed response, too many redirects."""
+
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class ConnectError(TransportError):
+    """No connection could be made to the host."""
+
+
+class Transport:
+    """Sends a single HTTP request for a URL check and summarises the response.
+
+    Timeouts surface as ``asyncio.TimeoutError``, every other failure as a
+    ``TransportError`` chained to the underlying exception.
+    """
+
+    name = ""
+    # Whether ``request`` can carry a probe's open ``connection``
+    adopts_connections = False
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+        read_bytes: int = 0,
+        scan_login: bool = False,
+        connection: Optional[Connection] = None,
+    ) -> FetchResult:
+        """``read_bytes`` of a GET body are read at most; with ``scan_login`` reading
+        stops as soon as the body is known to be a login page or not.
+
+        ``connection``, an open connection to the URL's host and port (a probe's),
+        carries the first request instead of a new one on transports that
+        ``adopts_connections``; a TLS transport is used as it is, without another
+        handshake. The transport owns it from then on.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "Transport":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class AiohttpTransport(Transport):
+    """Full-featured client: connection pooling, redirects, content decoding.
+
+    aiohttp has no public way to adopt an open connection, so a probe's is
+    closed and the request opens (and pools) its own.
+    """
+
+    name = "aiohttp"
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self._session = session
+        self._owns_session = session is None
+
+    async def request(
+        self, method, url, headers=None, timeout=10.0, read_bytes=0, scan_login=False, connection=None
+    ) -> FetchResult:
+        if connection is not None:
+            connection.close()
+        if self._session is None:
+            self._session = aiohttp.ClientSession(trace_configs=[trace_config()])
+        start = time.monotonic()
+        timings = RequestTimings()
+        try:
+            async with self._session.request(
+                method,
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                allow_redirects=True,
+                ssl=False,  # Certificates are checked by the TLS stage
+                trace_request_ctx=timings,
+            ) as response:
+                read_started = time.monotonic()
+                body, login_page = b"", None
+                if read_bytes and scan_login:
+                    login_page, body = await scan_for_login(response.content, response.headers.get("Content-Type"), read_bytes)
+                elif read_bytes:
+                    body = await response.content.read(read_bytes)
+                record_body(timings, response, read_started)
+                size = sum(response_bytes(r.status, r.reason, r.raw_headers) for r in response.history)
+                size += response_bytes(response.status, response.reason, response.raw_headers, len(body))
+                return FetchResult(
+                    response.status, response.reason, response.headers, str(response.url),
+                    time.monotonic() - start, size, redirect_chain(response.history, str(response.url)), timings,
+                    body, login_page,
+                )
+        except asyncio.TimeoutError:
+            raise
+        except aiohttp.ClientConnectorError as e:
+            raise ConnectError(str(e)) from e
+        except aiohttp.ClientError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+
+    async def close(self) -> None:
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+
+
+class RawHTTPTransport(Transport):
+    """Lean HTTP/1.1 prober on plain asyncio streams.
+
+    One connection per request (``Connection: close``), no pooling and no body
+    decoding: a GET returns at most ``read_bytes`` raw bytes. Enough for status
+    probes, and far less work per check than a full client session.
+    """
+
+    name = "raw"
+    adopts_connections = True
+
+    def __init__(self, max_redirects: int = MAX_REDIRECTS):
+        self.max_redirects = max_redirects
+        self.user_agent = f"Python/{platform.python_version()} bookmark-checker"
+
+    async def request(
+        self, method, url, headers=None, timeout=10.0, read_bytes=0, scan_login=False, connection=None
+    ) -> FetchResult:
+        start = time.monotonic()
+        handed = [connection] if connection is not None else []
+
+        async def follow() -> FetchResult:
+            current, current_method, size = url, method, 0
+            redirects: List[Redirect] = []
+            timings = RequestTimings()
+            for _ in range(self.max_redirects + 1):
+                # Only the first hop is to the connection's host
+                status, reason, raw_headers, body, login_page = await self._exchange(
+                    current_method, current, headers, read_bytes, scan_login, timings, handed.pop() if handed else None
+                )
+                size += response_bytes(status, reason, raw_headers, len(body))
+                response_headers = CIMultiDictProxy(CIMultiDict(
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in raw_headers
+                ))
+                location = response_headers.get("Location")
+                if status in REDIRECT_STATUSES and location:
+                    redirects.append(Redirect(current, status, urljoin(current, location)))
+                    current = redirects[-1].location
+                    if status == 303 and current_method != "HEAD":
+                        current_method = "GET"
+                    continue
+                return FetchResult(
+                    status, reason, response_headers, current, time.monotonic() - start, size, tuple(redirects), timings,
+                    body, login_page,
+                )
+            raise TransportError(f"Too many redirects: {url}")
+
+        try:
+            return await asyncio.wait_for(follow(), timeout)
+        finally:
+            for unused in handed:
+                unused.close()
+
+    async def _exchange(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        read_bytes: int,
+        scan_login: bool,
+        timings: RequestTimings,
+        connection: Optional[Connection] = None,
+    ) -> Tuple[int, str, List[Tuple[bytes, bytes]], bytes, Optional[bool]]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            if connection is not None:
+                connection.close()
+            raise TransportError(f"Unsupported URL: {url}")
+        host = parts.hostname
+        default_port = 443 if parts.scheme == "https" else 80
+        port = parts.port or default_port
+        secured = False
+        if isinstance(connection, socket.socket):
+            reader, writer = await asyncio.open_connection(sock=connection, limit=MAX_HEADER_BYTES)
+        elif connection is not None:
+            reader, writer = self._adopt(connection)
+            secured = True
+        else:
+            # DNS, TCP connect and TLS handshake as separate steps, so each is timed on its own
+            started = time.monotonic()
+            try:
+                addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            except OSError as e:
+                raise ConnectError(f"Cannot connect to host {host}:{port} [{e.strerror or e}]") from e
+            finally:
+                timings.add("dns_ms", started)
+            started = time.monotonic()
+            try:
+                reader, writer = await self._connect(host, [info[4][0] for info in addresses], port)
+            finally:
+                timings.add("connect_ms", started)
+
+        try:
+            if parts.scheme == "https" and not secured:
+                started = time.monotonic()
+                try:
+                    await writer.start_tls(_unverified_context(), server_hostname=host)
+                except (OSError, asyncio.IncompleteReadError) as e:
+                    raise ConnectError(f"Cannot connect to host {host}:{port} [TLS: {e}]") from e
+                finally:
+                    timings.add("tls_ms", started)
+
+            host_header = f"[{host}]" if ":" in host else host
+            if port != default_port:
+                host_header = f"{host_header}:{port}"
+            target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            lines = [
+                f"{method} {target} HTTP/1.1",
+                f"Host: {host_header}",
+                f"User-Agent: {self.user_agent}",
+                "Accept: */*",
+                "Connection: close",
+            ]
+            lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+            request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+            writer.write(request)
+            await writer.drain()
+            timings.bytes_sent += len(request)
+
+            sent = time.monotonic()
+            head = await reader.readuntil(b"\r\n\r\n")
+            timings.add("first_byte_ms", sent)
+            timings.bytes_received += len(head)
+            status_line, *header_lines = head[:-4].split(b"\r\n")
+            version, _, rest = status_line.partition(b" ")
+            code, _, reason = rest.partition(b" ")
+            if not version.startswith(b"HTTP/") or not code.isdigit():
+                raise TransportError(f"Malformed status line from {host}: {status_line[:100]!r}")
+            raw_headers = []
+            for line in header_lines:
+                name, sep, value = line.partition(b":")
+                if sep:
+                    raw_headers.append((name.strip(), value.strip()))
+
+            status = int(code)
+            body, login_page = b"", None
+            if read_bytes and method != "HEAD" and status not in (204, 304):
+                read_started = time.monotonic()
+                if scan_login:
+                    content_type = next(
+                        (value.decode("latin-1") for name, value in raw_headers if name.lower() == b"content-type"), None
+                    )
+                    login_page, body = await scan_for_login(reader, content_type, read_bytes)
+                else:
+                    body = await reader.read(read_bytes)
+                timings.add("transfer_ms", read_started)
+                timings.bytes_received += len(body)
+            return status, reason.decode("latin-1"), raw_headers, body, login_page
+        except asyncio.IncompleteReadError as e:
+            raise TransportError(f"Server disconnected: {host}", transient=True) from e
+        except asyncio.LimitOverrunError as e:
+            raise TransportError(f"Response headers from {host} exceed {MAX_HEADER_BYTES} bytes") from e
+        except ConnectionError as e:
+            raise TransportError(f"Connection lost: {host} [{e}]") from e
+        finally:
+            writer.close()
+
+
+    @staticmethod
+    def _adopt(transport: asyncio.Transport) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Streams over an already established (TLS) transport."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_HEADER_BYTES, loop=loop)
+        protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+        transport.set_protocol(protocol)
+        protocol.connection_made(transport)
+        return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+
+    @staticmethod
+    async def _connect(host: str, addresses: List[str], port: int) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Plain TCP connection to the first of ``host``'s ``addresses`` that accepts one."""
+        error: Optional[OSError] = None
+        for address in dict.fromkeys(addresses):
+            try:
+                return await asyncio.open_connection(address, port, limit=MAX_HEADER_BYTES)
+            except OSError as e:
+                error = e
+        raise ConnectError(f"Cannot connect to host {host}:{port} [{error.strerror or error}]") from error
+
+
+TRANSPORTS = {
+    AiohttpTransport.name: AiohttpTransport,
+    RawHTTPTransport.name: RawHTTPTransport,
+}
+
+
+def create_transport(name: str = CHECK_TRANSPORT) -> Transport:
+    try:
+        return TRANSPORTS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown transport {name!r}, expected one of {sorted(TRANSPORTS)}")
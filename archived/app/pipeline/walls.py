@@ -0,0 +1,178 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.config import logger
+from app.config import WALL_CONFIRM_CHECKS, WALL_SAMPLE_HOURS
+from app.sqlite_cache import DB_PATH
+
+# Kinds of wall
+BOT_PROTECTED = "bot_protected"  # automated requests are refused (403/999) but browsers get through
+LOGIN_WALLED = "login_walled"  # the content needs an account (401 or a login page)
+
+
+@dataclass
+class DomainWall:
+    host: str
+    kind: str
+    status_code: Optional[int] = None  # status of the latest walled answer
+    walled_checks: int = 0  # walled answers in a row
+    confirmed: bool = False
+    sampled_at: float = 0.0  # unix timestamp of the latest answer from the host itself
+
+
+class SQLiteWallStore:
+    """Persists walled hosts so confirmed walls are not re-learned every run."""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS domain_walls (
+                    host TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status_code INTEGER,
+                    walled_checks INTEGER DEFAULT 0,
+                    confirmed INTEGER DEFAULT 0,
+                    sampled_at REAL
+                )
+            ''')
+            conn.commit()
+
+    def load_all(self) -> Dict[str, DomainWall]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                'SELECT host, kind, status_code, walled_checks, confirmed, sampled_at FROM domain_walls'
+            ).fetchall()
+        return {row[0]: DomainWall(row[0], row[1], row[2], row[3] or 0, bool(row[4]), row[5] or 0.0) for row in rows}
+
+    def save(self, wall: DomainWall):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO domain_walls (host, kind, status_code, walled_checks, confirmed, sampled_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(host) DO UPDATE SET
+                    kind=excluded.kind,
+                    status_code=excluded.status_code,
+                    walled_checks=excluded.walled_checks,
+                    confirmed=excluded.confirmed,
+                    sampled_at=excluded.sampled_at
+            ''', (wall.host, wall.kind, wall.status_code, wall.walled_checks, int(wall.confirmed), wall.sampled_at))
+            conn.commit()
+
+    def delete(self, host: str):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM domain_walls WHERE host = ?', (host,))
+            conn.commit()
+
+    def clear(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM domain_walls')
+            conn.commit()
+
+
+class WallTracker:
+    """Hosts confirmed to answer every URL from a bot wall or a login wall.
+
+    A host is confirmed after ``confirm_checks`` walled answers in a row; from
+    then on ``verdict`` answers its URLs without a request, except one sample
+    check per ``sample_hours`` that re-confirms the wall or, if the host answers
+    normally, drops it. Tracked per hostname, not per registrable domain:
+    docs.google.com is walled, www.google.com is not.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteWallStore] = None,
+        confirm_checks: int = WALL_CONFIRM_CHECKS,
+        sample_hours: float = WALL_SAMPLE_HOURS,
+    ):
+        self._store = store
+        self.confirm_checks = confirm_checks
+        self.sample_seconds = sample_hours * 3600
+        self._hosts: Dict[str, DomainWall] = {}
+        self._loaded = False
+        self.stats = {"classified": 0, "sampled": 0, "confirmed": 0, "dropped": 0}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._store:
+            try:
+                self._hosts.update(self._store.load_all())
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Failed to load walled hosts: {e}")
+
+    def _persist(self, wall: DomainWall) -> None:
+        if not self._store:
+            return
+        try:
+            self._store.save(wall)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  Failed to persist wall for {wall.host}: {e}")
+
+    def verdict(self, host: str) -> Optional[DomainWall]:
+        """The host's confirmed wall, if its URLs can be classified without a request.
+
+        Once the sample interval has passed this returns None to a single caller,
+        whose check becomes the host's sample; the others keep getting the wall.
+        """
+        self._ensure_loaded()
+        wall = self._hosts.get((host or "").lower())
+        if not wall or not wall.confirmed:
+            return None
+        now = time.time()
+        if now - wall.sampled_at >= self.sample_seconds:
+            wall.sampled_at = now
+            self.stats["sampled"] += 1
+            logger.debug(f"🩺 Sampling walled host: {wall.host}")
+            return None
+        self.stats["classified"] += 1
+        return wall
+
+    def observe(self, host: str, kind: Optional[str], status_code: Optional[int]) -> None:
+        """Record what a request to ``host`` got: a wall of ``kind``, or None for a normal answer."""
+        self._ensure_loaded()
+        host = (host or "").lower()
+        wall = self._hosts.get(host)
+        if kind is None:
+            if wall:
+                del self._hosts[host]
+                if wall.confirmed:
+                    self.stats["dropped"] += 1
+                    logger.info(f"🧱 Host no longer walled: {host}")
+                if self._store:
+                    try:
+                        self._store.delete(host)
+                    except sqlite3.Error as e:
+                        logger.warning(f"⚠️  Failed to drop wall for {host}: {e}")
+            return
+        if wall is None:
+            wall = self._hosts[host] = DomainWall(host, kind)
+        wall.kind = kind
+        wall.status_code = status_code
+        wall.walled_checks += 1
+        wall.sampled_at = time.time()
+        if not wall.confirmed and wall.walled_checks >= self.confirm_checks:
+            wall.confirmed = True
+            self.stats["confirmed"] += 1
+            logger.info(f"🧱 Host confirmed walled: {host} ({kind}, HTTP {status_code})")
+        self._persist(wall)
+
+    def get_walled_hosts(self) -> Dict[str, DomainWall]:
+        self._ensure_loaded()
+        return {host: wall for host, wall in self._hosts.items() if wall.confirmed}
+
+    def clear(self) -> None:
+        self._hosts.clear()
+        if self._store:
+            self._store.clear()
+
+
+# Singleton instance
+domain_walls = WallTracker(SQLiteWallStore())
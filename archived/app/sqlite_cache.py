@@ -16,12 +16,58 @@ class BookmarkCacheEntry:
     broken_status: Optional[str] = None
     login_required: Optional[str] = None  # 'yes', 'no', 'unknown'
     error_details: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None  # measured cost of the check, see METRIC_COLUMNS
+
+@dataclass
+class CheckHistory:
+    """Outcome counts for one bookmark across every check ever written to the cache."""
+    id: str
+    checks: int = 0
+    failures: int = 0
+    flips: int = 0  # times broken_status changed between consecutive checks
+    last_status: Optional[str] = None
+    last_checked: Optional[str] = None
+
+    @property
+    def flakiness(self) -> float:
+        """Share of consecutive checks whose outcome flipped (0 = stable, 1 = alternates every time)."""
+        return self.flips / (self.checks - 1) if self.checks > 1 else 0.0
+
+# Measured cost of the last check (app.pipeline.timing.RequestTimings), kept as real
+# columns so cost analysis can aggregate them in SQL
+METRIC_COLUMNS = {
+    'dns_ms': 'REAL',
+    'connect_ms': 'REAL',
+    'tls_ms': 'REAL',
+    'first_byte_ms': 'REAL',
+    'transfer_ms': 'REAL',
+    'bytes_sent': 'INTEGER',
+    'bytes_received': 'INTEGER',
+}
+
+# Explicit column order: migrated databases have login_required after error_details
+ENTRY_COLUMNS = 'id, url, name, last_checked, broken_status, login_required, error_details, ' + ', '.join(METRIC_COLUMNS)
+
+# SQLite's default limit on host parameters per statement is 999
+MAX_QUERY_PARAMS = 900
 
 class SQLiteBookmarkCache:
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
         self._init_db()
 
+    def _row_to_entry(self, row) -> BookmarkCacheEntry:
+        return BookmarkCacheEntry(
+            id=row[0],
+            url=row[1],
+            name=row[2],
+            last_checked=row[3],
+            broken_status=row[4],
+            login_required=row[5] or 'unknown',
+            error_details=self._safe_json_loads(row[6]),
+            metrics=dict(zip(METRIC_COLUMNS, row[7:])) if any(v is not None for v in row[7:]) else None
+        )
+
     def _safe_json_loads(self, data):
         """Safely load JSON data, return None if invalid"""
         try:
@@ -43,91 +89,128 @@ class SQLiteBookmarkCache:
                     error_details TEXT
                 )
             ''')
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(bookmarks_cache)")}
+            for column, column_type in METRIC_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE bookmarks_cache ADD COLUMN {column} {column_type}")
+            # Filled by triggers, so every writer of bookmarks_cache (including the
+            # standalone scripts) contributes to the history without extra code.
+            # Rewrites of the same check (same last_checked) are not counted twice.
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS check_history (
+                    id TEXT PRIMARY KEY,
+                    checks INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    flips INTEGER NOT NULL DEFAULT 0,
+                    last_status TEXT,
+                    last_checked TEXT
+                )
+            ''')
+            for event in ('INSERT', 'UPDATE OF broken_status, last_checked'):
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS check_history_{event.split()[0].lower()}
+                    AFTER {event} ON bookmarks_cache
+                    WHEN NEW.broken_status IS NOT NULL
+                    BEGIN
+                        INSERT INTO check_history (id, checks, failures, flips, last_status, last_checked)
+                        VALUES (NEW.id, 1, NEW.broken_status = 'broken', 0, NEW.broken_status, NEW.last_checked)
+                        ON CONFLICT(id) DO UPDATE SET
+                            checks = checks + 1,
+                            failures = failures + (excluded.last_status = 'broken'),
+                            flips = flips + (last_status IS NOT excluded.last_status),
+                            last_status = excluded.last_status,
+                            last_checked = excluded.last_checked
+                        WHERE check_history.last_checked IS NOT excluded.last_checked;
+                    END
+                ''')
             conn.commit()
 
     def upsert(self, entry: BookmarkCacheEntry):
+        self.upsert_many([entry])
+
+    def upsert_many(self, entries: List[BookmarkCacheEntry]):
+        """Write several entries in a single transaction."""
+        if not entries:
+            return
+        metric_columns = ', '.join(METRIC_COLUMNS)
+        metric_updates = ', '.join(f'{column}=excluded.{column}' for column in METRIC_COLUMNS)
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO bookmarks_cache (id, url, name, last_checked, broken_status, login_required, error_details)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+            conn.executemany(f'''
+                INSERT INTO bookmarks_cache (id, url, name, last_checked, broken_status, login_required, error_details, {metric_columns})
+                VALUES ({', '.join('?' * (7 + len(METRIC_COLUMNS)))})
                 ON CONFLICT(id) DO UPDATE SET
                     url=excluded.url,
                     name=excluded.name,
                     last_checked=excluded.last_checked,
                     broken_status=excluded.broken_status,
                     login_required=excluded.login_required,
-                    error_details=excluded.error_details
-            ''', (
+                    error_details=excluded.error_details,
+                    {metric_updates}
+            ''', [(
                 entry.id,
                 entry.url,
                 entry.name,
                 entry.last_checked,
                 entry.broken_status,
                 entry.login_required,
-                json.dumps(entry.error_details) if entry.error_details else None
-            ))
+                json.dumps(entry.error_details) if entry.error_details else None,
+                *((entry.metrics or {}).get(column) for column in METRIC_COLUMNS)
+            ) for entry in entries])
             conn.commit()
 
     def get(self, id: str) -> Optional[BookmarkCacheEntry]:
         with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute('SELECT * FROM bookmarks_cache WHERE id = ?', (id,)).fetchone()
-            if row:
-                return BookmarkCacheEntry(
-                    id=row[0],
-                    url=row[1],
-                    name=row[2],
-                    last_checked=row[3],
-                    broken_status=row[4],
-                    login_required=row[6] if len(row) > 6 else 'unknown',
-                    error_details=self._safe_json_loads(row[5]) if len(row) > 5 else None
-                )
-            return None
+            row = conn.execute(f'SELECT {ENTRY_COLUMNS} FROM bookmarks_cache WHERE id = ?', (id,)).fetchone()
+            return self._row_to_entry(row) if row else None
+
+    def get_many(self, ids: List[str]) -> Dict[str, BookmarkCacheEntry]:
+        """Look up several entries at once, keyed by id (missing ids are omitted)."""
+        entries = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for i in range(0, len(ids), MAX_QUERY_PARAMS):
+                chunk = ids[i:i + MAX_QUERY_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT {ENTRY_COLUMNS} FROM bookmarks_cache WHERE id IN ({placeholders})', chunk
+                ).fetchall()
+                for row in rows:
+                    entries[row[0]] = self._row_to_entry(row)
+        return entries
+
+    def get_history_many(self, ids: List[str]) -> Dict[str, CheckHistory]:
+        """Check history for several bookmarks, keyed by id (ids never checked are omitted)."""
+        history = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for i in range(0, len(ids), MAX_QUERY_PARAMS):
+                chunk = ids[i:i + MAX_QUERY_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT id, checks, failures, flips, last_status, last_checked FROM check_history WHERE id IN ({placeholders})',
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    history[row[0]] = CheckHistory(*row)
+        return history
 
     def get_by_url(self, url: str) -> Optional[BookmarkCacheEntry]:
         with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute('SELECT * FROM bookmarks_cache WHERE url = ?', (url,)).fetchone()
-            if row:
-                return BookmarkCacheEntry(
-                    id=row[0],
-                    url=row[1],
-                    name=row[2],
-                    last_checked=row[3],
-                    broken_status=row[4],
-                    login_required=row[6] if len(row) > 6 else 'unknown',
-                    error_details=self._safe_json_loads(row[5]) if len(row) > 5 else None
-                )
-            return None
+            row = conn.execute(f'SELECT {ENTRY_COLUMNS} FROM bookmarks_cache WHERE url = ?', (url,)).fetchone()
+            return self._row_to_entry(row) if row else None
 
     def get_all(self) -> List[BookmarkCacheEntry]:
         with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute('SELECT * FROM bookmarks_cache').fetchall()
-            return [
-                BookmarkCacheEntry(
-                    id=row[0],
-                    url=row[1],
-                    name=row[2],
-                    last_checked=row[3],
-                    broken_status=row[4],
-                    login_required=row[6] if len(row) > 6 else 'unknown',
-                    error_details=self._safe_json_loads(row[5]) if len(row) > 5 else None
-                ) for row in rows
-            ]
+            rows = conn.execute(f'SELECT {ENTRY_COLUMNS} FROM bookmarks_cache').fetchall()
+            return [self._row_to_entry(row) for row in rows]
 
     def get_stale(self, max_age_hours: int = 24) -> List[BookmarkCacheEntry]:
+        """Entries older than ``max_age_hours``, never-checked and oldest first."""
         cutoff = (datetime.utcnow() - timedelta(hours=max_age_hours)).isoformat()
         with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute('SELECT * FROM bookmarks_cache WHERE last_checked IS NULL OR last_checked < ?', (cutoff,)).fetchall()
-            return [
-                BookmarkCacheEntry(
-                    id=row[0],
-                    url=row[1],
-                    name=row[2],
-                    last_checked=row[3],
-                    broken_status=row[4],
-                    login_required=row[6] if len(row) > 6 else 'unknown',
-                    error_details=self._safe_json_loads(row[5]) if len(row) > 5 else None
-                ) for row in rows
-            ]
+            rows = conn.execute(
+                f'SELECT {ENTRY_COLUMNS} FROM bookmarks_cache WHERE last_checked IS NULL OR last_checked < ? '
+                'ORDER BY last_checked IS NOT NULL, last_checked', (cutoff,)
+            ).fetchall()
+            return [self._row_to_entry(row) for row in rows]
 
     def delete(self, id: str):
         with sqlite3.connect(self.db_path) as conn:
@@ -0,0 +1,194 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from app import bookmarks_data
+from app.bookmarks_data import BookmarkStore, ErrorCategory, ErrorDetails
+from app.pipeline.budget import RunBudget, STOP_BYTES, STOP_DEADLINE
+from app.pipeline.dns import AsyncResolver
+from app.pipeline.retry import RetryPolicy, TRANSIENT, DEFINITIVE
+from app.pipeline.runs import SQLiteRunStore
+from app.sqlite_cache import SQLiteBookmarkCache, BookmarkCacheEntry
+
+
+def _bookmark(i: int) -> dict:
+    return {
+        "type": "url",
+        "id": str(i),
+        "guid": f"guid-{i}",
+        "name": f"Bookmark {i}",
+        "url": f"http://localhost/{i}",
+        "date_added": "13300000000000000",
+        "date_last_used": "0",
+    }
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    bookmarks_file = tmp_path / "Bookmarks"
+    bookmarks_file.write_text(json.dumps({"roots": {"bookmark_bar": {
+        "type": "folder", "id": "1", "guid": "root", "name": "Bookmarks Bar",
+        "date_added": "0", "date_last_used": "0", "date_modified": "0",
+        "children": [_bookmark(i) for i in range(2, 32)],
+    }}}))
+    cache = SQLiteBookmarkCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(bookmarks_data, "sqlite_cache", cache)
+    monkeypatch.setattr(bookmarks_data, "dns_resolver", AsyncResolver())
+    monkeypatch.setattr(bookmarks_data, "validation_runs", SQLiteRunStore(str(tmp_path / "cache.db")))
+    store = BookmarkStore(str(bookmarks_file))
+    return store
+
+
+def test_pipeline_bounds_concurrency_and_streams_broken(store):
+    in_flight = 0
+    peak = 0
+
+    async def fake_check(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if url.endswith("0"):
+            return False, ErrorDetails(ErrorCategory.NOT_FOUND, "HTTP 404", 404), {}
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {}
+
+    store._check_url_accessible = fake_check
+
+    async def run():
+        return [r async for r in store.iter_broken_bookmarks(concurrency=4, write_batch_size=7)]
+
+    broken = asyncio.run(run())
+    assert peak == 4
+    assert sorted(b.id for b, _, _ in broken) == ["10", "20", "30"]
+    assert len(bookmarks_data.sqlite_cache.get_all()) == 30
+
+
+def test_fresh_cache_entries_skip_network(store):
+    bookmarks_data.sqlite_cache.upsert_many([
+        BookmarkCacheEntry(id=str(i), url=f"http://localhost/{i}", last_checked=datetime.utcnow().isoformat(),
+                           broken_status="broken" if i == 2 else "ok", error_details={"message": "gone"})
+        for i in range(2, 32)
+    ])
+
+    async def fail_check(url):
+        raise AssertionError("network check should not run")
+
+    store._check_url_accessible = fail_check
+    broken = asyncio.run(store.get_broken_bookmarks())
+    assert [b.id for b, _, _ in broken] == ["2"]
+
+
+def test_transient_failures_are_retried_without_holding_a_worker(store):
+    attempts = {}
+
+    async def flaky_check(url, force=False):
+        attempts[url] = attempts.get(url, 0) + 1
+        if url.endswith("/2") and attempts[url] < 3:
+            return False, ErrorDetails(ErrorCategory.TIMEOUT, "GET request timeout"), {"failure_kind": TRANSIENT}
+        if url.endswith("/3"):
+            return False, ErrorDetails(ErrorCategory.TIMEOUT, "GET request timeout"), {"failure_kind": TRANSIENT}
+        if url.endswith("/4"):
+            return False, ErrorDetails(ErrorCategory.NOT_FOUND, "HTTP 404", 404), {"failure_kind": DEFINITIVE}
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {}
+
+    store._check_url_accessible = flaky_check
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+
+    async def run():
+        return [r async for r in store.iter_broken_bookmarks(concurrency=2, retry_policy=policy)]
+
+    broken = asyncio.run(run())
+    assert sorted(b.id for b, _, _ in broken) == ["3", "4"]
+    assert attempts["http://localhost/2"] == 3
+    assert attempts["http://localhost/3"] == 3
+    assert attempts["http://localhost/4"] == 1
+
+    cached = bookmarks_data.sqlite_cache.get_many(["3", "4"])
+    assert cached["3"].error_details["failure_kind"] == TRANSIENT
+    assert "failure_kind" not in cached["4"].error_details
+
+
+def test_byte_budget_defers_the_rest_of_the_run(store):
+    async def check(url, force=False):
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {"bandwidth_bytes": 1000}
+
+    store._check_url_accessible = check
+    budget = RunBudget(max_bytes=10_000, bytes_estimate=1000)
+
+    async def run():
+        return [r async for r in store.iter_broken_bookmarks(concurrency=1, budget=budget)]
+
+    asyncio.run(run())
+    assert budget.report.covered == 10
+    assert budget.report.bytes_used == 10_000
+    assert len(budget.report.deferred) == 20
+    assert budget.report.stop_reason == STOP_BYTES
+    # Deferred bookmarks are not written, so the next run picks them up
+    assert len(bookmarks_data.sqlite_cache.get_all()) == 10
+
+
+def test_deadline_cancels_checks_in_flight(store):
+    cancelled = 0
+
+    async def slow_check(url, force=False):
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(0.05 if url.endswith(("/2", "/3")) else 10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {}
+
+    store._check_url_accessible = slow_check
+    budget = RunBudget(deadline_seconds=0.5, seconds_estimate=0.01)
+
+    async def run():
+        return [r async for r in store.iter_broken_bookmarks(concurrency=4, budget=budget)]
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert budget.report.covered == 2
+    assert budget.report.stop_reason == STOP_DEADLINE
+    assert len(budget.report.deferred) == 28
+    assert cancelled == 4
+    assert budget.in_flight == 0
+
+
+def test_interrupted_run_resumes_where_it_stopped(store, monkeypatch):
+    # Nothing is fresh by age, so only the run's checkpoints can skip work
+    monkeypatch.setattr(bookmarks_data, "CACHE_FRESHNESS_HOURS", 0)
+    checked = []
+
+    async def check(url, force=False):
+        checked.append(url)
+        if len(checked) == 11:
+            return False, ErrorDetails(ErrorCategory.NOT_FOUND, "HTTP 404", 404), {}
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {}
+
+    store._check_url_accessible = check
+
+    async def stop_at_first_broken():
+        async for _ in store.iter_broken_bookmarks(concurrency=1, write_batch_size=1):
+            break
+
+    async def run_to_end():
+        return [r async for r in store.iter_broken_bookmarks(concurrency=1, write_batch_size=1)]
+
+    asyncio.run(stop_at_first_broken())
+    # Checks that ran ahead of the consumer were never written, so they do not count
+    written = checked[:11]
+    checked_before = len(checked)
+
+    broken = asyncio.run(run_to_end())
+    resumed = checked[checked_before:]
+    assert len(resumed) == 19
+    assert not set(written) & set(resumed)
+    # The bookmark found broken before the interruption is still reported
+    assert len(broken) == 1
+
+    # The finished run is closed: the next call starts a new run over everything
+    checked.clear()
+    asyncio.run(run_to_end())
+    assert len(checked) == 30
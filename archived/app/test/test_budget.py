@@ -0,0 +1,35 @@
+from app.pipeline.budget import RunBudget, STOP_BYTES, STOP_DEADLINE
+
+
+def test_unlimited_budget_admits_everything():
+    budget = RunBudget()
+    assert not budget.limited
+    assert all(budget.admit() for _ in range(1000))
+    assert budget.remaining_seconds() is None
+
+
+def test_byte_budget_reserves_for_checks_in_flight():
+    budget = RunBudget(max_bytes=5000, bytes_estimate=2000)
+    assert budget.admit() and budget.admit()
+    # A third check at the estimated 2000 bytes would overshoot with two in flight
+    assert not budget.admit()
+    assert budget.stop_reason == STOP_BYTES
+
+
+def test_projection_switches_to_measured_cost():
+    budget = RunBudget(max_bytes=5000, bytes_estimate=2000)
+    budget.admit()
+    budget.settle(500, 0.1)
+    assert budget.expected_bytes() == 500
+    assert budget.admit() and budget.admit() and budget.admit()
+
+
+def test_deadline_stops_admission_when_a_check_would_not_finish():
+    budget = RunBudget(deadline_seconds=1.0, seconds_estimate=2.0)
+    assert not budget.admit()
+    assert budget.stop_reason == STOP_DEADLINE
+
+    report = budget.finish(0, ["https://example.com/"])
+    assert report.stop_reason == STOP_DEADLINE
+    assert "1 deferred" in report.summary()
+    assert budget.finish(3, []).stop_reason is None
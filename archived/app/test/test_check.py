@@ -0,0 +1,329 @@
+import asyncio
+import socket
+import ssl
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+
+import pytest
+
+from app.api import simple_verdict
+from app.pipeline.check import (
+    CheckResult, DNSStage, ErrorCategory, ErrorDetails, HTTPStage, Stage, TCPStage, TLSStage,
+    URLChecker, WallStage, is_reachable_status,
+)
+from app.pipeline import check
+from app.pipeline.dns import AsyncResolver, DNSResult
+from app.pipeline.host_health import HostHealthTracker
+from app.pipeline.latency import LatencyTracker
+from app.pipeline.redirects import SQLiteRedirectStore
+from app.pipeline.retry import DEFINITIVE, TRANSIENT
+from app.pipeline.revalidation import SQLiteValidatorStore
+from app.pipeline.strategy import GET_RANGE, StrategyLearner
+from app.pipeline.tcp import TCPProbe
+from app.pipeline.tls import TLSProbe, tls_probe
+from app.pipeline.walls import BOT_PROTECTED, WallTracker
+
+LOGIN_PAGE = b"<html><head><title>Sign in - Example</title></head>" + b" " * 4000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(("HEAD", self.path, self.headers.get("Range")))
+        self.send_response(405 if self.path == "/no-head" else 403 if self.path.startswith("/private") else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.requests.append(("GET", self.path, self.headers.get("Range")))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(LOGIN_PAGE)))
+        self.end_headers()
+        self.wfile.write(LOGIN_PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def latency(monkeypatch):
+    # A fresh history: local responses are fast enough to trigger hedging otherwise
+    monkeypatch.setattr(check, "http_latency", LatencyTracker())
+
+
+class _CountingServer(HTTPServer):
+    connections = 0
+
+    def process_request(self, request, client_address):
+        type(self).connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def server():
+    httpd = _CountingServer(("127.0.0.1", 0), _Handler)
+    _CountingServer.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class _KeepAliveHandler(_Handler):
+    protocol_version = "HTTP/1.1"
+
+
+class _KeepAliveServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def process_request(self, request, client_address):
+        type(self).connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def keep_alive_server():
+    httpd = _KeepAliveServer(("127.0.0.1", 0), _KeepAliveHandler)
+    _KeepAliveServer.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _KeepAliveHandler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def https_server(tmp_path):
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    try:
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+             "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", str(key), "-out", str(cert)],
+            check=True, capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("openssl is needed to make a test certificate")
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    httpd = _CountingServer(("127.0.0.1", 0), _Handler)
+    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+    _CountingServer.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.requests = []
+    yield f"https://127.0.0.1:{httpd.server_port}", ssl.create_default_context(cafile=str(cert))
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _checker(tmp_path, transport="aiohttp", strategies=None, walls=None):
+    db = str(tmp_path / "cache.db")
+    redirects = SQLiteRedirectStore(db)
+    return URLChecker(stages=[
+        DNSStage(AsyncResolver()),
+        WallStage(walls or WallTracker()),
+        TCPStage(TCPProbe()),
+        TLSStage(tls_probe),
+        HTTPStage(transport, redirects, SQLiteValidatorStore(db), strategies=strategies or StrategyLearner()),
+    ], redirects=redirects)
+
+
+def test_verdict_table():
+    for status in (200, 204, 301, 304, 401, 403, 999, 416):
+        assert is_reachable_status(status), status
+    for status in (404, 410, 429, 500, 503):
+        assert not is_reachable_status(status), status
+
+
+def test_first_failing_stage_ends_the_check(tmp_path):
+    ran = []
+
+    class Fails(Stage):
+        async def run(self, ctx):
+            ran.append("fails")
+            return ctx.fail(ErrorDetails(ErrorCategory.CONNECTION_ERROR, "nope"), TRANSIENT)
+
+    class Never(Stage):
+        async def run(self, ctx):
+            ran.append("never")
+
+    checker = URLChecker(stages=[Fails(), Never()], redirects=SQLiteRedirectStore(str(tmp_path / "cache.db")))
+    is_accessible, error, details = asyncio.run(checker.check("https://unreachable.example/"))
+    assert not is_accessible
+    assert error.message == "nope"
+    assert details["failure_kind"] == TRANSIENT
+    assert ran == ["fails"]
+
+
+@pytest.mark.parametrize("definitive", [True, False])
+def test_only_definitive_failures_mark_the_host_down(definitive, monkeypatch, tmp_path):
+    class Resolver:
+        def forget_failure(self, hostname):
+            pass
+
+        async def resolve(self, hostname):
+            return DNSResult(hostname, error="lookup failed", definitive=definitive)
+
+    health = HostHealthTracker()
+    monkeypatch.setattr(check, "host_health", health)
+    checker = URLChecker(stages=[DNSStage(Resolver())], redirects=SQLiteRedirectStore(str(tmp_path / "cache.db")))
+    result = asyncio.run(checker.check("https://flaky.example/"))
+    assert result.details["failure_kind"] == (DEFINITIVE if definitive else TRANSIENT)
+    assert bool(health.check("flaky.example")) is definitive
+
+
+def test_retries_bypass_the_open_circuit(monkeypatch, tmp_path):
+    ran = []
+
+    class Resolves(Stage):
+        async def run(self, ctx):
+            ran.append(ctx.hostname)
+
+    health = HostHealthTracker()
+    health.record_failure("flaky.example", "dns", "DNS resolution failed")
+    monkeypatch.setattr(check, "host_health", health)
+    checker = URLChecker(stages=[Resolves()], redirects=SQLiteRedirectStore(str(tmp_path / "cache.db")))
+
+    short_circuited = asyncio.run(checker.check("https://flaky.example/"))
+    assert short_circuited.details["host_down"] and short_circuited.details["failure_kind"] == DEFINITIVE
+    assert ran == []
+    assert asyncio.run(checker.check("https://flaky.example/", force=True)).accessible
+    assert ran == ["flaky.example"]
+
+
+def test_tcp_probe_caches_per_host_and_port():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    port = listener.getsockname()[1]
+    probe = TCPProbe()
+
+    async def run():
+        first = await probe.probe("127.0.0.1", port, ["127.0.0.1"])
+        second = await probe.probe("127.0.0.1", port)
+        handed, again = probe.take("127.0.0.1", port), probe.take("127.0.0.1", port)
+        handed.close()
+        listener.close()
+        refused = await probe.probe("127.0.0.1", port + 1 if port < 65535 else port - 1)
+        return first, second, handed, again, refused
+
+    first, second, handed, again, refused = asyncio.run(run())
+    assert first.connectable and first.address == "127.0.0.1"
+    assert second is first
+    assert handed is not None and again is None
+    assert probe.stats == {"hits": 1, "probes": 2, "failures": 1, "handed_off": 1}
+    assert not refused.connectable and refused.error_kind in ("refused", "connection")
+
+
+@pytest.mark.parametrize("transport", ["aiohttp", "raw"])
+def test_refused_head_falls_back_to_a_ranged_get_scanned_for_login(server, transport, tmp_path):
+    is_accessible, _, details = asyncio.run(_checker(tmp_path, transport).check(f"{server}/no-head"))
+    assert is_accessible
+    assert details["method_used"] == "GET"
+    assert details["login_required"] is True
+    assert details["dns_resolved"] and details["tcp_connectable"]
+    assert _Handler.requests == [("HEAD", "/no-head", None), ("GET", "/no-head", "bytes=0-2047")]
+    assert details["content_preview"].startswith("<html><head><title>Sign in")
+
+
+def test_learned_get_skips_the_refused_head(server, tmp_path):
+    checker = _checker(tmp_path, strategies=StrategyLearner(min_observations=1))
+    first = asyncio.run(checker.check(f"{server}/no-head"))
+    assert [method for method, _, _ in _Handler.requests] == ["HEAD", "GET"]
+    _Handler.requests.clear()
+    second = asyncio.run(checker.check(f"{server}/no-head"))
+    assert [method for method, _, _ in _Handler.requests] == ["GET"]
+    assert first.accessible and second.accessible
+    assert second.details["strategy"] == GET_RANGE
+    assert second.details["bandwidth_bytes"] < first.details["bandwidth_bytes"]
+
+
+# aiohttp cannot adopt the probe's connection and opens its own
+@pytest.mark.parametrize("transport, connections", [("aiohttp", 2), ("raw", 1)])
+def test_http_request_reuses_the_tcp_probe_connection(server, transport, connections, tmp_path):
+    probe = TCPProbe()
+    checker = _checker(tmp_path, transport)
+    checker.stages[2] = TCPStage(probe)
+    result = asyncio.run(checker.check(f"{server}/page"))
+    assert result.accessible and result.details["tcp_connectable"]
+    assert _Handler.requests == [("HEAD", "/page", None)]
+    assert _CountingServer.connections == connections
+    assert probe.stats["handed_off"] == 1
+
+
+@pytest.mark.parametrize("transport, connections", [("aiohttp", 2), ("raw", 1)])
+def test_https_check_verifies_and_requests_on_the_tcp_probe_connection(https_server, transport, connections, tmp_path):
+    url, trusted = https_server
+    tcp, tls = TCPProbe(), TLSProbe(context=trusted)
+    checker = _checker(tmp_path, transport)
+    checker.stages[2:4] = [TCPStage(tcp), TLSStage(tls)]
+
+    async def run():
+        try:
+            return await checker.check(f"{url}/page")
+        finally:
+            await checker.close()
+
+    result = asyncio.run(run())
+    assert result.accessible and result.details["ssl_valid"]
+    assert _Handler.requests == [("HEAD", "/page", None)]
+    # Connect and verifying handshake on one connection, which the raw prober also requests on
+    assert _CountingServer.connections == connections
+    assert tcp.stats["handed_off"] == 1 and tls.stats["handed_off"] == 1
+
+
+def test_checks_of_one_host_share_pooled_connections(keep_alive_server, tmp_path):
+    checker = _checker(tmp_path)
+
+    async def run():
+        try:
+            return [await checker.check(f"{keep_alive_server}/page{i}") for i in range(3)]
+        finally:
+            await checker.close()
+
+    results = asyncio.run(run())
+    assert all(result.accessible for result in results)
+    assert [path for _, path, _ in _KeepAliveHandler.requests] == ["/page0", "/page1", "/page2"]
+    # The probe's connection, then one pooled connection for every request
+    assert _KeepAliveServer.connections == 2
+
+
+def test_login_walls_are_reachable(server, tmp_path):
+    result = asyncio.run(_checker(tmp_path).check(f"{server}/private"))
+    assert result.accessible
+    assert result.error.category == ErrorCategory.AUTH_REQUIRED
+    assert result.details["login_required"] is True
+    assert simple_verdict(result) == {
+        "status_code": 403, "is_broken": False, "login_required": True, "reason": "access_forbidden",
+    }
+
+
+def test_confirmed_bot_walls_are_answered_without_a_request(server, tmp_path):
+    walls = WallTracker(confirm_checks=2)
+    checker = _checker(tmp_path, walls=walls)
+    for path in ("/private", "/private?page=2"):
+        assert asyncio.run(checker.check(f"{server}{path}")).details["wall"] == BOT_PROTECTED
+    _Handler.requests.clear()
+    result = asyncio.run(checker.check(f"{server}/private?page=3"))
+    assert _Handler.requests == []
+    assert result.accessible and result.details["login_required"] is True
+    assert result.details["domain_verdict"] and result.details["status_code"] == 403
+    assert walls.stats["classified"] == 1
+
+
+def test_simple_verdict_only_reports_definitive_failures_as_broken():
+    timeout = CheckResult(False, ErrorDetails(ErrorCategory.TIMEOUT, "GET request timeout"), {
+        "status_code": None, "failure_kind": TRANSIENT,
+    })
+    gone = CheckResult(False, ErrorDetails(ErrorCategory.OTHER, "HTTP 410: Gone", 410), {
+        "status_code": 410, "failure_kind": "definitive",
+    })
+    assert simple_verdict(timeout)["is_broken"] is False
+    assert simple_verdict(gone) == {"status_code": 410, "is_broken": True, "login_required": False, "reason": "gone"}
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import bookmarks_data
+from app.bookmarks_data import BookmarkStore, ErrorCategory, ErrorDetails
+from app.daemon import RevalidationDaemon
+from app.pipeline.dns import AsyncResolver
+from app.sqlite_cache import BookmarkCacheEntry, SQLiteBookmarkCache
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    bookmarks_file = tmp_path / "Bookmarks"
+    bookmarks_file.write_text(json.dumps({"roots": {"bookmark_bar": {
+        "type": "folder", "id": "1", "guid": "root", "name": "Bookmarks Bar",
+        "date_added": "0", "date_last_used": "0", "date_modified": "0",
+        "children": [{
+            "type": "url", "id": str(i), "guid": f"guid-{i}", "name": f"Bookmark {i}",
+            "url": f"http://localhost/{i}", "date_added": "0", "date_last_used": "0",
+        } for i in range(2, 8)],
+    }}}))
+    monkeypatch.setattr(bookmarks_data, "dns_resolver", AsyncResolver())
+    store = BookmarkStore(str(bookmarks_file))
+    store.load_data()
+
+    async def check(url, force=False):
+        if url.endswith("/2"):
+            return False, ErrorDetails(ErrorCategory.NOT_FOUND, "HTTP 404", 404), {}
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {}
+
+    store._check_url_accessible = check
+    return store
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteBookmarkCache(str(tmp_path / "cache.db"))
+    now = datetime.utcnow()
+    cache.upsert_many([
+        BookmarkCacheEntry(id="2", url="http://localhost/2", broken_status="ok", last_checked=(now - timedelta(days=30)).isoformat()),
+        BookmarkCacheEntry(id="3", url="http://localhost/3", broken_status="ok", last_checked=now.isoformat()),
+        BookmarkCacheEntry(id="4", url="http://localhost/4", broken_status="ok", last_checked=now.isoformat()),
+        # URL-level rows and removed bookmarks are not the daemon's business
+        BookmarkCacheEntry(id="url_123", url="http://localhost/x", last_checked=(now - timedelta(days=30)).isoformat()),
+        BookmarkCacheEntry(id="99", url="http://localhost/99", last_checked=(now - timedelta(days=30)).isoformat()),
+    ])
+    return cache
+
+
+def test_due_covers_stale_and_never_checked(store, cache):
+    daemon = RevalidationDaemon(store, cache, freshness_hours=24)
+    assert sorted(b.id for b in asyncio.run(daemon.due(10))) == ["2", "5", "6", "7"]
+    assert len(asyncio.run(daemon.due(2))) == 2
+
+
+def test_default_rate_spreads_bookmarks_over_the_freshness_window(store, cache):
+    daemon = RevalidationDaemon(store, cache, freshness_hours=6)
+    assert daemon.rate * 6 * 3600 == pytest.approx(6)
+    assert RevalidationDaemon(store, cache, rate_per_minute=30).rate == 0.5
+
+
+def test_daemon_revalidates_until_fresh_and_stops_cleanly(store, cache):
+    daemon = RevalidationDaemon(store, cache, concurrency=2, rate_per_minute=6000, freshness_hours=24, idle_seconds=0.05)
+
+    async def run():
+        daemon.start()
+        for _ in range(100):
+            if not await daemon.due(10):
+                break
+            await asyncio.sleep(0.02)
+        await daemon.stop()
+
+    asyncio.run(run())
+    assert asyncio.run(daemon.due(10)) == []
+    assert daemon.stats["checked"] == 4 and daemon.stats["broken"] == 1
+    assert cache.get("2").broken_status == "broken"
+    assert not daemon.status()["running"]
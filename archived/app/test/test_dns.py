@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from app.pipeline.dns import AsyncResolver, DNSResult, SQLiteDNSCache
+
+
+def test_resolve_caches_positive_answer(tmp_path):
+    resolver = AsyncResolver(SQLiteDNSCache(str(tmp_path / "cache.db")))
+
+    async def run():
+        first = await resolver.resolve("localhost")
+        second = await resolver.resolve("LOCALHOST.")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.resolved
+    assert second is first
+    assert resolver.stats["misses"] == 1
+    assert resolver.stats["hits"] == 1
+
+
+def test_negative_answer_is_cached(tmp_path):
+    resolver = AsyncResolver(SQLiteDNSCache(str(tmp_path / "cache.db")), negative_ttl=120)
+
+    async def run():
+        await resolver.resolve("does-not-exist.invalid")
+        return await resolver.resolve("does-not-exist.invalid")
+
+    result = asyncio.run(run())
+    assert not result.resolved
+    assert result.error
+    assert resolver.stats["misses"] == 1
+
+
+def test_prefetch_resolves_each_host_once_and_persists(tmp_path):
+    store = SQLiteDNSCache(str(tmp_path / "cache.db"))
+    resolver = AsyncResolver(store)
+
+    results = asyncio.run(resolver.prefetch(["localhost", "localhost", "Localhost", None]))
+
+    assert list(results) == ["localhost"]
+    assert resolver.stats["misses"] == 1
+    assert "localhost" in store.load_fresh()
+
+
+def test_expired_entries_are_not_loaded(tmp_path):
+    store = SQLiteDNSCache(str(tmp_path / "cache.db"))
+    store.save_many([
+        DNSResult("fresh.example", ["192.0.2.1"], None, time.time() + 60),
+        DNSResult("stale.example", ["192.0.2.2"], None, time.time() - 60),
+    ])
+
+    resolver = AsyncResolver(store)
+    assert resolver.cached("fresh.example").addresses == ["192.0.2.1"]
+    assert resolver.cached("stale.example") is None
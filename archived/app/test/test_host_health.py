@@ -0,0 +1,72 @@
+import time
+
+from app.pipeline.host_health import (
+    HostHealthTracker, SQLiteHostHealthStore, OPEN, HALF_OPEN, CLOSED,
+    FAILURE_DNS, FAILURE_CONNECT,
+)
+
+
+def test_first_dns_failure_opens_circuit():
+    tracker = HostHealthTracker()
+    assert tracker.check("dead.example") is None
+
+    tracker.record_failure("dead.example", FAILURE_DNS, "DNS resolution failed")
+
+    down = tracker.check("dead.example")
+    assert down.state == OPEN
+    assert down.last_error == "DNS resolution failed"
+    assert tracker.check("other.example") is None
+
+
+def test_threshold_needs_consecutive_failures():
+    tracker = HostHealthTracker(failure_threshold=3)
+    tracker.record_failure("flaky.example", FAILURE_DNS, "DNS resolution failed")
+    tracker.record_failure("flaky.example", FAILURE_DNS, "DNS resolution failed")
+    tracker.record_success("flaky.example")
+    tracker.record_failure("flaky.example", FAILURE_DNS, "DNS resolution failed")
+    assert tracker.check("flaky.example") is None
+
+    tracker.record_failure("flaky.example", FAILURE_DNS, "DNS resolution failed")
+    tracker.record_failure("flaky.example", FAILURE_DNS, "DNS resolution failed")
+    assert tracker.check("flaky.example").state == OPEN
+
+
+def test_refused_connection_only_takes_its_port_down():
+    tracker = HostHealthTracker()
+    tracker.record_failure("mixed.example", FAILURE_CONNECT, "Connection refused", 8443)
+
+    assert tracker.check("mixed.example", 8443).state == OPEN
+    assert tracker.check("mixed.example", 443) is None
+    assert tracker.check("mixed.example") is None
+
+    tracker.record_failure("mixed.example", FAILURE_DNS, "DNS resolution failed")
+    assert tracker.check("mixed.example", 443).failure_kind == FAILURE_DNS
+    tracker.record_success("mixed.example", 8443)
+    assert tracker.get_down_hosts() == {}
+
+
+def test_half_open_lets_one_probe_through():
+    tracker = HostHealthTracker(down_seconds=0)
+    tracker.record_failure("flaky.example", FAILURE_DNS, "DNS resolution failed")
+
+    assert tracker.check("flaky.example") is None  # the probe
+    assert tracker.check("flaky.example").state == HALF_OPEN  # everyone else waits on it
+
+    tracker.record_success("flaky.example")
+    assert tracker.check("flaky.example") is None
+    assert tracker.get_down_hosts() == {}
+
+
+def test_failed_probe_reopens_and_state_persists(tmp_path):
+    store = SQLiteHostHealthStore(str(tmp_path / "cache.db"))
+    tracker = HostHealthTracker(store, down_seconds=0)
+    tracker.record_failure("dead.example", FAILURE_DNS, "DNS resolution failed")
+    tracker.check("dead.example")
+    tracker.record_failure("dead.example", FAILURE_DNS, "DNS resolution failed")
+
+    reloaded = HostHealthTracker(store, down_seconds=3600)
+    down = reloaded.check("dead.example")
+    assert down.state == OPEN
+    assert down.opened_at <= time.time()
+    assert reloaded.get_down_hosts().keys() == {"dead.example"}
+    assert CLOSED not in {h.state for h in reloaded.get_down_hosts().values()}
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import bookmarks_data
+from app.bookmarks_data import BookmarkStore, ErrorCategory, ErrorDetails
+from app.jobs import COMPLETED, JobQueueFull, ValidationJobManager
+from app.pipeline.dns import AsyncResolver
+from app.sqlite_cache import BookmarkCacheEntry, SQLiteBookmarkCache
+
+
+def _url(id, url):
+    return {"type": "url", "id": id, "guid": f"guid-{id}", "name": f"Bookmark {id}",
+            "url": url, "date_added": "0", "date_last_used": "0"}
+
+
+def _folder(id, name, children):
+    return {"type": "folder", "id": id, "guid": f"guid-{id}", "name": name, "date_added": "0",
+            "date_last_used": "0", "date_modified": "0", "children": children}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    bookmarks_file = tmp_path / "Bookmarks"
+    bookmarks_file.write_text(json.dumps({"roots": {"bookmark_bar": _folder("1", "Bookmarks Bar", [
+        _url("2", "http://localhost/2"),
+        _url("3", "http://docs.example.com/3"),
+        _folder("10", "Work", [
+            _url("4", "http://example.com/4"),
+            _folder("11", "Old", [_url("5", "http://notexample.com/5")]),
+        ]),
+    ])}}))
+    monkeypatch.setattr(bookmarks_data, "dns_resolver", AsyncResolver())
+    store = BookmarkStore(str(bookmarks_file))
+    store.load_data()
+    store.checked = []
+
+    async def check(url, force=False):
+        store.checked.append(url)
+        await asyncio.sleep(0.01)
+        if url.endswith("/2"):
+            return False, ErrorDetails(ErrorCategory.NOT_FOUND, "HTTP 404", 404), {}
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {}
+
+    store._check_url_accessible = check
+    return store
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteBookmarkCache(str(tmp_path / "cache.db"))
+    now = datetime.utcnow()
+    cache.upsert_many([
+        BookmarkCacheEntry(id="2", url="http://localhost/2", broken_status="broken", last_checked=now.isoformat()),
+        BookmarkCacheEntry(id="3", url="http://docs.example.com/3", broken_status="ok", last_checked=(now - timedelta(days=30)).isoformat()),
+        BookmarkCacheEntry(id="4", url="http://example.com/4", broken_status="ok", last_checked=now.isoformat()),
+    ])
+    return cache
+
+
+def test_scopes_select_bookmarks(store, cache):
+    jobs = ValidationJobManager(store, cache, freshness_hours=24)
+
+    def ids(scope, value=None):
+        return [b.id for b in jobs.select(scope, value)]
+
+    assert ids("all") == ["2", "3", "4", "5"]
+    assert ids("stale") == ["3", "5"]
+    assert ids("broken") == ["2"]
+    assert ids("folder", "Work") == ["4", "5"]
+    assert ids("folder", "11") == ["5"]
+    assert ids("domain", "example.com") == ["3", "4"]
+
+
+def test_duplicate_jobs_merge_and_full_queue_is_refused(store, cache):
+    async def run():
+        jobs = ValidationJobManager(store, cache, workers=1, max_queued=2)
+        first, merged = jobs.submit("domain", "Example.com.")
+        assert not merged
+        again, merged = jobs.submit("domain", "example.com")
+        assert merged and again is first
+        jobs.submit("all")
+        # The worker has not picked up a job yet, so the queue is full
+        with pytest.raises(JobQueueFull):
+            jobs.submit("broken")
+        with pytest.raises(ValueError):
+            jobs.submit("folder")
+        await jobs.stop()
+
+    asyncio.run(run())
+
+
+def test_job_runs_to_completion_and_reports_results(store, cache):
+    async def run():
+        jobs = ValidationJobManager(store, cache, workers=1, concurrency=2)
+        job, _ = jobs.submit("folder", "Bookmarks Bar")
+        for _ in range(200):
+            if not job.active:
+                break
+            await asyncio.sleep(0.01)
+        # Finished jobs no longer absorb new submissions
+        rerun, merged = jobs.submit("folder", "Bookmarks Bar")
+        assert not merged and rerun.id != job.id
+        await jobs.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.status == COMPLETED
+    report = job.to_dict()
+    assert report["progress"]["total"] == 4 and report["progress"]["completed"] == 4
+    assert [b["id"] for b in report["broken"]] == ["2"]
+    assert cache.get("5").broken_status == "ok"
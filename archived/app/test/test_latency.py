@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.pipeline.latency import HostLatency, LatencyTracker, SQLiteLatencyStore
+
+
+def test_timeout_uses_default_until_host_has_history():
+    tracker = LatencyTracker(min_samples=3, multiplier=4, min_timeout=1, max_timeout=30)
+    tracker.record("fast.example", 0.1)
+    assert tracker.timeout_for("fast.example", 8) == 8
+
+    tracker.record("fast.example", 0.1)
+    tracker.record("fast.example", 0.2)
+    assert tracker.timeout_for("fast.example", 8) == pytest.approx(1.0)  # clamped to min_timeout
+
+    for _ in range(3):
+        tracker.record("slow.example", 6.0)
+    assert tracker.timeout_for("slow.example", 8) == 24.0
+    assert tracker.timeout_for("unknown.example", 8) == 8
+
+
+def test_timeouts_push_the_host_timeout_up():
+    tracker = LatencyTracker(min_samples=3, multiplier=2, min_timeout=1, max_timeout=30)
+    for _ in range(3):
+        tracker.record("stalling.example", 1.0)
+    before = tracker.timeout_for("stalling.example", 8)
+    tracker.record_timeout("stalling.example", before)
+    assert tracker.timeout_for("stalling.example", 8) > before
+
+
+def test_percentile_and_window():
+    entry = HostLatency("example.com")
+    for value in range(1, 101):
+        entry.add(value / 100, window=20)
+    assert len(entry.samples) == 20
+    assert entry.percentile(95) == 0.99
+    assert entry.percentile(50) == 0.9
+
+
+def test_hedged_request_wins_when_first_stalls():
+    tracker = LatencyTracker(min_samples=1, hedge=True)
+    tracker.record("example.com", 0.01)
+    attempts = []
+
+    async def attempt():
+        attempts.append(1)
+        await asyncio.sleep(1.0 if len(attempts) == 1 else 0.01)
+        return len(attempts)
+
+    async def run():
+        return await tracker.hedged("example.com", attempt)
+
+    assert asyncio.run(run()) == 2
+    assert tracker.stats == {"hedged": 1, "hedge_wins": 1, "timeouts": 0}
+
+
+def test_no_hedge_without_history_and_errors_need_all_attempts():
+    tracker = LatencyTracker(min_samples=1, hedge=True)
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise asyncio.TimeoutError()
+
+    async def run():
+        return await tracker.hedged("example.com", fail)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    assert tracker.stats["hedged"] == 0
+
+    tracker.record("example.com", 0.005)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    assert tracker.stats["hedged"] == 1
+
+
+def test_history_persists(tmp_path):
+    store = SQLiteLatencyStore(str(tmp_path / "cache.db"))
+    tracker = LatencyTracker(store, kind="http", min_samples=2)
+    tracker.record("example.com", 0.5)
+    tracker.record("example.com", 0.7)
+    tracker.flush()
+
+    reloaded = LatencyTracker(store, kind="http", min_samples=2)
+    assert reloaded.get("example.com").samples == [0.5, 0.7]
+    assert LatencyTracker(store, kind="tls").get("example.com") is None
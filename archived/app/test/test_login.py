@@ -0,0 +1,55 @@
+import asyncio
+
+from app.pipeline.login import LoginDetector, detect_login_page, scan_for_login
+
+
+class _Stream:
+    """Stand-in for aiohttp's StreamReader, counting how much was read."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.reads = 0
+
+    async def readany(self):
+        self.reads += 1
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def test_matches_any_case():
+    assert detect_login_page(b"<html><TITLE>Sign In - Example</TITLE>")
+    assert detect_login_page(b'<Input type="PASSWORD" name="pw">')
+    assert not detect_login_page(b"<html><title>Recipes</title><p>passwords are not here</p>")
+
+
+def test_match_split_across_chunks():
+    detector = LoginDetector()
+    assert detector.feed(b"<html>" + b" " * 500 + b"<form action='/lo") is None
+    assert detector.feed(b"gin' method=post>") is True
+
+
+def test_stops_reading_at_first_marker():
+    stream = _Stream([b"<html><head>", b"<title>Log in</title>", b"x" * 1000, b"y" * 1000])
+    login, content = asyncio.run(scan_for_login(stream, "text/html; charset=utf-8"))
+    assert login is True
+    assert stream.reads == 2
+    assert content == b"<html><head><title>Log in</title>"
+
+
+def test_no_marker_within_limit():
+    stream = _Stream([b"a" * 1500, b"b" * 1500, b"<title>login</title>"])
+    login, content = asyncio.run(scan_for_login(stream, "text/html", limit=2048))
+    assert login is False
+    assert stream.reads == 2
+    assert len(content) == 2048
+
+
+def test_short_page_without_marker():
+    login, content = asyncio.run(scan_for_login(_Stream([b"<p>hello</p>"])))
+    assert login is False
+    assert content == b"<p>hello</p>"
+
+
+def test_non_html_is_not_read():
+    stream = _Stream([b"unauthorized"])
+    assert asyncio.run(scan_for_login(stream, "image/png")) == (False, b"")
+    assert stream.reads == 0
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from app.models import URL, Bookmark
+from app.pipeline.priority import RevalidationQueue, RevalidationWeights, prioritize, revalidation_score
+from app.sqlite_cache import BookmarkCacheEntry, CheckHistory, SQLiteBookmarkCache
+
+NOW = datetime(2026, 1, 1)
+
+
+def _bookmark(id: str, last_used_days_ago=None) -> Bookmark:
+    last_used = 0
+    if last_used_days_ago is not None:
+        last_used = int(((NOW - timedelta(days=last_used_days_ago)) - datetime(1601, 1, 1)).total_seconds() * 1_000_000)
+    return Bookmark(
+        id=id, guid=id, name=id, type="url", url=URL(f"https://example.com/{id}", "https", "example.com", None, f"/{id}", None, None, None, None, 0),
+        date_added=0, date_last_used=last_used,
+    )
+
+
+def _entry(id: str, status: str, checked_days_ago: float, **details) -> BookmarkCacheEntry:
+    return BookmarkCacheEntry(
+        id=id, url=f"https://example.com/{id}", broken_status=status,
+        last_checked=(NOW - timedelta(days=checked_days_ago)).isoformat(), error_details=details or None,
+    )
+
+
+def test_history_counts_checks_failures_and_flips(tmp_path):
+    cache = SQLiteBookmarkCache(str(tmp_path / "cache.db"))
+    for day, status in enumerate(["ok", "broken", "broken", "ok"]):
+        cache.upsert(_entry("1", status, 10 - day))
+    # Rewriting the same check (same last_checked) is not a new check
+    cache.upsert(_entry("1", "ok", 7))
+
+    history = cache.get_history_many(["1", "2"])
+    assert history.keys() == {"1"}
+    assert (history["1"].checks, history["1"].failures, history["1"].flips) == (4, 2, 2)
+    assert history["1"].flakiness == 2 / 3
+    assert CheckHistory("x", checks=1).flakiness == 0.0
+
+
+def test_score_components():
+    now = (NOW - datetime(1970, 1, 1)).total_seconds()
+
+    def only(**weights):
+        return RevalidationWeights(**{"staleness": 0, "flakiness": 0, "last_used": 0, "status": 0, **weights})
+
+    never_checked = revalidation_score(_bookmark("a"), None, None, now, only(staleness=1))
+    checked_today = revalidation_score(_bookmark("a"), _entry("a", "ok", 0), None, now, only(staleness=1))
+    assert never_checked == 1.0 and checked_today == 0.0
+
+    used_today = revalidation_score(_bookmark("a", 0), None, None, now, only(last_used=1))
+    used_month_ago = revalidation_score(_bookmark("a", 30), None, None, now, only(last_used=1))
+    never_used = revalidation_score(_bookmark("a"), None, None, now, only(last_used=1))
+    assert round(used_today, 6) == 1.0 and round(used_month_ago, 6) == 0.5 and never_used == 0.0
+
+    def status(entry):
+        return revalidation_score(_bookmark("a"), entry, None, now, only(status=1))
+
+    assert status(_entry("a", "broken", 1)) == 1.0
+    assert status(_entry("a", "broken", 1, failure_kind="transient")) == 1.0
+    assert status(_entry("a", "ok", 1)) == 0.0
+    assert status(None) == 0.5
+
+
+def test_prioritize_orders_most_valuable_first():
+    now = (NOW - datetime(1970, 1, 1)).total_seconds()
+    bookmarks = [_bookmark("stable-ok", 400), _bookmark("broken"), _bookmark("flaky"), _bookmark("new", 1)]
+    entries = {
+        "stable-ok": _entry("stable-ok", "ok", 10),
+        "broken": _entry("broken", "broken", 10),
+        "flaky": _entry("flaky", "ok", 10),
+    }
+    history = {"flaky": CheckHistory("flaky", checks=5, flips=4), "stable-ok": CheckHistory("stable-ok", checks=5)}
+
+    ordered = prioritize(bookmarks, entries, history, now=now)
+    assert [b.id for b in ordered] == ["new", "flaky", "broken", "stable-ok"]
+
+
+def test_queue_is_a_stable_max_heap():
+    queue = RevalidationQueue()
+    for item, score in [("low", 0.1), ("high", 0.9), ("mid", 0.5), ("mid-2", 0.5)]:
+        queue.push(item, score)
+    assert queue.peek_score() == 0.9
+    assert list(queue.drain()) == ["high", "mid", "mid-2", "low"]
+
+
+def test_get_stale_returns_oldest_first(tmp_path):
+    cache = SQLiteBookmarkCache(str(tmp_path / "cache.db"))
+    cache.upsert_many([
+        BookmarkCacheEntry(id="recent", url="u", last_checked=(datetime.utcnow() - timedelta(days=2)).isoformat()),
+        BookmarkCacheEntry(id="never", url="u"),
+        BookmarkCacheEntry(id="old", url="u", last_checked=(datetime.utcnow() - timedelta(days=30)).isoformat()),
+    ])
+    assert [e.id for e in cache.get_stale(24)] == ["never", "old", "recent"]
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api, bookmarks_data
+from app.bookmarks_data import BookmarkStore, ErrorCategory, ErrorDetails
+from app.pipeline.dns import AsyncResolver
+from app.pipeline.progress import ValidationProgress, format_sse
+from app.pipeline.runs import SQLiteRunStore
+from app.sqlite_cache import SQLiteBookmarkCache
+
+
+def test_subscribers_get_results_snapshots_and_done():
+    progress = ValidationProgress(total=2)
+
+    async def run():
+        events = []
+
+        async def listen():
+            async for event in progress.events(interval=0.05):
+                events.append(event)
+
+        listener = asyncio.create_task(listen())
+        await asyncio.sleep(0)
+        progress.check_started()
+        progress.check_finished()
+        progress.record("1", "https://a.example/", "network", True, {"message": "HTTP 404"},
+                        {"status_code": 404, "bandwidth_bytes": 300, "dns_resolved": True})
+        await asyncio.sleep(0.12)
+        progress.record("2", "https://b.example/", "cache", False)
+        progress.finish()
+        await listener
+        return events
+
+    events = asyncio.run(run())
+    names = [name for name, _ in events]
+    assert names[0] == "progress" and names[-1] == "done"
+    assert names.count("result") == 2
+    assert names.count("progress") >= 2  # the initial one and at least one periodic
+    assert events[1][1] == {"id": "1", "url": "https://a.example/", "source": "network", "broken": True,
+                            "error": "HTTP 404", "status_code": 404}
+    final = events[-1][1]
+    assert (final["completed"], final["cache_hits"], final["network_checks"], final["broken"]) == (2, 1, 1, 1)
+    assert final["bandwidth_bytes"] == 300 and final["in_flight"] == 0 and final["done"]
+
+
+def test_late_subscriber_to_finished_validation_gets_done():
+    progress = ValidationProgress()
+    progress.finish()
+
+    async def run():
+        return [name async for name, _ in progress.events()]
+
+    assert asyncio.run(run()) == ["progress", "done"]
+    assert format_sse("done", {"a": 1}) == 'event: done\ndata: {"a": 1}\n\n'
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    bookmarks_file = tmp_path / "Bookmarks"
+    bookmarks_file.write_text(json.dumps({"roots": {"bookmark_bar": {
+        "type": "folder", "id": "1", "guid": "root", "name": "Bookmarks Bar",
+        "date_added": "0", "date_last_used": "0", "date_modified": "0",
+        "children": [{
+            "type": "url", "id": str(i), "guid": f"guid-{i}", "name": f"Bookmark {i}",
+            "url": f"http://localhost/{i}", "date_added": "0", "date_last_used": "0",
+        } for i in range(2, 7)],
+    }}}))
+    monkeypatch.setattr(bookmarks_data, "sqlite_cache", SQLiteBookmarkCache(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(bookmarks_data, "validation_runs", SQLiteRunStore(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(bookmarks_data, "dns_resolver", AsyncResolver())
+    store = BookmarkStore(str(bookmarks_file))
+
+    async def check(url, force=False):
+        if url.endswith("/2"):
+            return False, ErrorDetails(ErrorCategory.NOT_FOUND, "HTTP 404", 404), {"status_code": 404}
+        return True, ErrorDetails(ErrorCategory.OTHER, ""), {"status_code": 200}
+
+    store._check_url_accessible = check
+    return store
+
+
+def test_validate_stream_sends_server_sent_events(store, monkeypatch):
+    monkeypatch.setattr(api, "_live_progress", None)
+    app = FastAPI()
+    app.include_router(api.router)
+    app.dependency_overrides[api.get_bookmark_store] = lambda: store
+
+    with TestClient(app) as client, client.stream("GET", "/validate/stream?interval=0.05") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    messages = [m for m in body.split("\n\n") if m]
+    events = [(m.split("\n")[0][len("event: "):], json.loads(m.split("\n")[1][len("data: "):])) for m in messages]
+    results = [data for name, data in events if name == "result"]
+    assert sorted(r["id"] for r in results) == ["2", "3", "4", "5", "6"]
+    assert [r["id"] for r in results if r["broken"]] == ["2"]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["network_checks"] == 5 and events[-1][1]["broken"] == 1
+
+
+def test_stopping_live_validation_cancels_the_run(store, monkeypatch):
+    monkeypatch.setattr(api, "_live_progress", None)
+    monkeypatch.setattr(api, "_live_task", None)
+
+    async def hang(url, force=False):
+        await asyncio.sleep(60)
+
+    store._check_url_accessible = hang
+
+    async def run():
+        progress = api._start_live_validation(store)
+        task = api._live_task
+        await asyncio.sleep(0.05)
+        await api.stop_live_validation()
+        return progress, task
+
+    progress, task = asyncio.run(run())
+    assert task.cancelled()
+    assert progress.done
+    assert api._live_task is None
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app import bookmarks_data
+from app.pipeline import check
+from app.bookmarks_data import BookmarkStore
+from app.pipeline.dns import AsyncResolver
+from app.pipeline.latency import LatencyTracker
+from app.pipeline.strategy import StrategyLearner
+from app.pipeline.walls import WallTracker
+from app.pipeline.redirects import Redirect, SQLiteRedirectStore
+from app.pipeline.revalidation import SQLiteValidatorStore
+from app.pipeline.singleflight import SingleFlight
+from app.sqlite_cache import SQLiteBookmarkCache
+
+REDIRECTS = {
+    "/old": (301, "/mid"),
+    "/mid": (302, "/new"),
+    "/moved": (308, "/new"),
+}
+
+
+class _RedirectHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(self.path)
+        if self.path in REDIRECTS:
+            status, location = REDIRECTS[self.path]
+            self.send_response(status)
+            self.send_header("Location", location)
+        else:
+            self.send_response(200 if self.path == "/new" else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _RedirectHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _RedirectHandler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def redirects(tmp_path, monkeypatch):
+    store = SQLiteRedirectStore(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(bookmarks_data, "redirect_cache", store)
+    monkeypatch.setattr(check, "redirect_cache", store)
+    monkeypatch.setattr(bookmarks_data, "sqlite_cache", SQLiteBookmarkCache(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(check, "url_validators", SQLiteValidatorStore(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(check, "dns_resolver", AsyncResolver())
+    monkeypatch.setattr(check, "http_latency", LatencyTracker())
+    monkeypatch.setattr(check, "domain_strategies", StrategyLearner())
+    monkeypatch.setattr(check, "domain_walls", WallTracker())
+    monkeypatch.setattr(bookmarks_data, "url_checks", SingleFlight())
+    return store
+
+
+def test_only_permanent_hops_become_shortcuts(tmp_path):
+    store = SQLiteRedirectStore(str(tmp_path / "cache.db"))
+    store.record([
+        Redirect("http://a/", 301, "http://b/"),
+        Redirect("http://b/", 308, "http://c/"),
+        Redirect("http://c/", 302, "http://d/"),
+    ])
+    assert store.resolve("http://a/") == ("http://c/", [
+        Redirect("http://a/", 301, "http://b/"), Redirect("http://b/", 308, "http://c/"),
+    ])
+    assert store.resolve("http://x/") == ("http://x/", [])
+
+    # A hop that turned temporary is dropped; an expired one is ignored
+    store.record([Redirect("http://b/", 307, "http://c/")])
+    assert store.resolve("http://a/")[0] == "http://b/"
+    assert SQLiteRedirectStore(store.db_path, max_age_days=0).resolve("http://a/")[1] == []
+    store.forget("http://a/")
+    assert store.resolve("http://a/") == ("http://a/", [])
+
+
+def test_redirect_loops_are_not_followed(tmp_path):
+    store = SQLiteRedirectStore(str(tmp_path / "cache.db"))
+    store.record([Redirect("http://a/", 301, "http://b/"), Redirect("http://b/", 301, "http://a/")])
+    assert store.resolve("http://a/") == ("http://b/", [Redirect("http://a/", 301, "http://b/")])
+
+
+@pytest.mark.parametrize("transport", ["aiohttp", "raw"])
+def test_chain_is_recorded_and_permanent_hops_skipped(server, redirects, transport, tmp_path):
+    store = BookmarkStore(str(tmp_path / "Bookmarks"), transport=transport)
+
+    first = asyncio.run(store._check_url_accessible(f"{server}/old"))
+    assert first[0]
+    assert first[2]["redirect_count"] == 2
+    assert [(hop["status"], hop["location"]) for hop in first[2]["redirect_chain"]] == [
+        (301, f"{server}/mid"), (302, f"{server}/new"),
+    ]
+    assert _RedirectHandler.requests == ["/old", "/mid", "/new"]
+
+    second = asyncio.run(store._check_url_accessible(f"{server}/old", force=True))
+    # The 301 is skipped, the 302 is followed again; the full chain is still reported
+    assert _RedirectHandler.requests[3:] == ["/mid", "/new"]
+    assert second[0] and second[2]["redirect_count"] == 2
+
+
+def test_failing_shortcut_falls_back_to_the_bookmarked_url(server, redirects, tmp_path):
+    redirects.record([Redirect(f"{server}/moved", 301, f"{server}/missing")])
+    store = BookmarkStore(str(tmp_path / "Bookmarks"))
+
+    is_accessible, _, details = asyncio.run(store._check_url_accessible(f"{server}/moved"))
+    assert is_accessible
+    assert _RedirectHandler.requests == ["/missing", "/moved", "/new"]
+    assert details["redirect_chain"] == [{"url": f"{server}/moved", "status": 308, "location": f"{server}/new"}]
+    assert redirects.resolve(f"{server}/moved")[0] == f"{server}/new"
+
+
+def test_rewrite_redirected_urls(redirects, tmp_path):
+    bookmarks_file = tmp_path / "Bookmarks"
+    bookmarks_file.write_text(json.dumps({"roots": {"bookmark_bar": {
+        "type": "folder", "id": "1", "guid": "root", "name": "Bookmarks Bar",
+        "date_added": "0", "date_last_used": "0", "date_modified": "0",
+        "children": [{
+            "type": "url", "id": str(i), "guid": f"guid-{i}", "name": f"Bookmark {i}",
+            "url": f"http://site{i}.example/", "date_added": "0", "date_last_used": "0",
+        } for i in range(2, 4)],
+    }}}))
+    redirects.record([
+        Redirect("http://site2.example/", 301, "https://site2.example/"),
+        Redirect("https://site2.example/", 308, "https://www.site2.example/"),
+        Redirect("http://site3.example/", 302, "http://site3.example/login"),
+    ])
+    store = BookmarkStore(str(bookmarks_file))
+    store.load_data()
+
+    preview = store.rewrite_redirected_urls()
+    assert [(b.id, target) for b, target in preview] == [("2", "https://www.site2.example/")]
+    assert "www.site2" not in bookmarks_file.read_text()
+
+    store.rewrite_redirected_urls(apply=True)
+    saved = json.loads(bookmarks_file.read_text())["roots"]["bookmark_bar"]["children"]
+    assert [node["url"] for node in saved] == ["https://www.site2.example/", "http://site3.example/"]
+    assert store._bookmarks[0].url.full == "https://www.site2.example/"
+    assert store.rewrite_redirected_urls() == []
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import aiohttp
+
+from app.pipeline.retry import (
+    RetryPolicy, DelayQueue, call_with_retries, classify_status, classify_exception, TRANSIENT, DEFINITIVE,
+)
+
+
+def test_classify_status():
+    assert classify_status(200) is None
+    assert classify_status(301) is None
+    assert classify_status(503) == TRANSIENT
+    assert classify_status(504) == TRANSIENT
+    assert classify_status(404) == DEFINITIVE
+    assert classify_status(410) == DEFINITIVE
+
+
+def test_classify_exception():
+    assert classify_exception(asyncio.TimeoutError()) == TRANSIENT
+    assert classify_exception(aiohttp.ServerDisconnectedError()) == TRANSIENT
+    assert classify_exception(ConnectionResetError()) == TRANSIENT
+    assert classify_exception(ValueError("bad url")) == DEFINITIVE
+
+
+def test_backoff_is_bounded_and_jittered():
+    policy = RetryPolicy(max_attempts=5, base_delay=1, max_delay=4)
+    delays = [policy.backoff(attempt) for attempt in range(1, 6) for _ in range(20)]
+    assert all(0 <= d <= 4 for d in delays)
+    assert len(set(delays)) > 1
+    assert policy.should_retry(4, TRANSIENT)
+    assert not policy.should_retry(5, TRANSIENT)
+    assert not policy.should_retry(1, DEFINITIVE)
+
+
+def test_call_with_retries_stops_on_definitive_result():
+    calls = []
+
+    async def attempt(n):
+        calls.append(n)
+        return TRANSIENT if n < 2 else DEFINITIVE
+
+    result = asyncio.run(call_with_retries(attempt, lambda r: r, RetryPolicy(max_attempts=5, base_delay=0.001)))
+    assert result == DEFINITIVE
+    assert calls == [1, 2]
+
+
+def test_delay_queue_orders_by_due_time():
+    async def run():
+        queue = DelayQueue()
+        queue.put("late", 0.05)
+        queue.put("soon", 0.01)
+        start = time.monotonic()
+        first = await queue.get()
+        later = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        queue.put("now", 0)
+        return first, await later, await queue.get(), time.monotonic() - start
+
+    first, second, third, elapsed = asyncio.run(run())
+    assert (first, second, third) == ("soon", "now", "late")
+    assert elapsed >= 0.045
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app import bookmarks_data
+from app.pipeline import check
+from app.bookmarks_data import BookmarkStore
+from app.pipeline.dns import AsyncResolver
+from app.pipeline.latency import LatencyTracker
+from app.pipeline.strategy import StrategyLearner
+from app.pipeline.walls import WallTracker
+from app.pipeline.revalidation import SQLiteValidatorStore, Validators, extract_validators, response_bytes
+from app.pipeline.singleflight import SingleFlight
+from app.sqlite_cache import SQLiteBookmarkCache
+
+
+def test_validators_roundtrip(tmp_path):
+    store = SQLiteValidatorStore(str(tmp_path / "cache.db"))
+    assert extract_validators("https://example.com/", {}) is None
+
+    found = extract_validators("https://example.com/", {"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    store.save(found)
+    loaded = store.get("https://example.com/")
+    assert loaded.request_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert store.get_many(["https://example.com/", "https://other.example/"]).keys() == {"https://example.com/"}
+    assert Validators("https://x/", etag='"v1"').request_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_response_bytes_counts_status_headers_and_body():
+    assert response_bytes(304, "Not Modified", [(b"ETag", b'"abc"')], 0) == len("HTTP/1.1 304 Not Modified\r\n") + 2 + 4 + 5 + 4
+    assert response_bytes(200, "OK", [], 1024) == len("HTTP/1.1 200 OK\r\n") + 2 + 1024
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _ETagHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/page"
+    httpd.shutdown()
+
+
+def test_second_check_revalidates_with_304(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(bookmarks_data, "sqlite_cache", SQLiteBookmarkCache(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(check, "url_validators", SQLiteValidatorStore(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(check, "dns_resolver", AsyncResolver())
+    monkeypatch.setattr(check, "http_latency", LatencyTracker())
+    monkeypatch.setattr(check, "domain_strategies", StrategyLearner())
+    monkeypatch.setattr(check, "domain_walls", WallTracker())
+    monkeypatch.setattr(bookmarks_data, "url_checks", SingleFlight())
+    store = BookmarkStore(str(tmp_path / "Bookmarks"))
+
+    first = asyncio.run(store._check_url_accessible(server))
+    second = asyncio.run(store._check_url_accessible(server, force=True))
+
+    assert _ETagHandler.requests == [None, '"v1"']
+    assert first[0] and second[0]
+    assert first[2]["not_modified"] is False
+    assert second[2]["status_code"] == 304
+    assert second[2]["not_modified"] is True
+    assert second[2]["bandwidth_bytes"] > 0
+
+
+def test_api_recheck_reuses_only_results_newer_than_the_request(server, tmp_path, monkeypatch):
+    from app.api import check_url_simple
+
+    monkeypatch.setattr(bookmarks_data, "sqlite_cache", SQLiteBookmarkCache(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(check, "url_validators", SQLiteValidatorStore(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(check, "dns_resolver", AsyncResolver())
+    monkeypatch.setattr(check, "http_latency", LatencyTracker())
+    monkeypatch.setattr(check, "domain_strategies", StrategyLearner())
+    monkeypatch.setattr(check, "domain_walls", WallTracker())
+    monkeypatch.setattr(bookmarks_data, "url_checks", SingleFlight())
+    monkeypatch.setattr(_ETagHandler, "requests", [])
+    store = BookmarkStore(str(tmp_path / "Bookmarks"))
+
+    async def run():
+        requested = time.time()
+        # The store's own check is in flight when the API asks for the same URL
+        first, second = await asyncio.gather(
+            store._check_url_accessible(server),
+            check_url_simple(store, server, requested),
+        )
+        # A result from before the re-check was requested is fetched again
+        third = await check_url_simple(store, server, time.time() + 1)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert len(_ETagHandler.requests) == 2
+    assert first[0] and not second["is_broken"] and not third["is_broken"]
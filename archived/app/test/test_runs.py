@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from app.pipeline.runs import SQLiteRunStore, RUN_BROKEN, RUN_SMART_V2
+from app.sqlite_cache import BookmarkCacheEntry
+
+
+def test_run_queue_survives_restart(tmp_path):
+    db = str(tmp_path / "cache.db")
+    run = SQLiteRunStore(db).start_or_resume(RUN_BROKEN, [("1", "u1"), ("2", "u2"), ("3", "u3")])
+    run.mark_done(["2"])
+
+    # A new process: nothing but the database carries over
+    resumed = SQLiteRunStore(db).start_or_resume(RUN_BROKEN)
+    assert resumed.run_id == run.run_id and resumed.resumed
+    assert resumed.done == {"2"} and resumed.pending == 2
+    assert SQLiteRunStore(db).resume(RUN_SMART_V2) is None
+
+    items = ["3", "4", "1", "2"]
+    assert resumed.order(items, key=str, url=str) == ["1", "3", "4"]
+    assert resumed.pending == 3
+
+    resumed.mark_done(["1", "3", "4"])
+    resumed.finish()
+    assert SQLiteRunStore(db).resume(RUN_BROKEN) is None
+
+
+def test_reconcile_recovers_results_written_before_a_crash(tmp_path):
+    store = SQLiteRunStore(str(tmp_path / "cache.db"))
+    store.start(RUN_BROKEN, [("1", "u1"), ("2", "u2"), ("3", "u3")])
+    entries = {
+        "1": BookmarkCacheEntry(id="1", url="u1", last_checked=datetime.utcnow().isoformat()),
+        "2": BookmarkCacheEntry(id="2", url="u2", last_checked="2020-01-01T00:00:00"),
+    }
+
+    resumed = store.resume(RUN_BROKEN)
+    resumed.reconcile(entries)
+    assert resumed.done == {"1"}
+    assert store.resume(RUN_BROKEN).done == {"1"}
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from app.pipeline.scheduler import HostPolicy, HostScheduler, interleave_by_host, ip_group, parse_retry_after
+
+
+def test_interleave_by_host_round_robins():
+    urls = ["a/1", "a/2", "a/3", "b/1", "c/1", "b/2"]
+    ordered = interleave_by_host(urls, key=lambda u: u.split("/")[0])
+    assert ordered == ["a/1", "b/1", "c/1", "a/2", "b/2", "a/3"]
+
+
+def test_policy_matches_domain_suffix():
+    scheduler = HostScheduler(overrides={"github.com": {"rate": 1, "concurrency": 1}})
+    assert scheduler.policy_for("gist.github.com").rate == 1
+    assert scheduler.policy_for("www.github.com").concurrency == 1
+    assert scheduler.policy_for("notgithub.com") is scheduler.default_policy
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_paces_requests_per_host():
+    scheduler = HostScheduler(HostPolicy(rate=20, burst=1, concurrency=5), overrides={})
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(4):
+            async with scheduler.slot("example.com"):
+                pass
+        return time.monotonic() - start
+
+    # One token up front, then one every 50ms
+    assert asyncio.run(run()) >= 0.14
+
+
+def test_concurrency_cap_and_other_hosts_unaffected():
+    scheduler = HostScheduler(HostPolicy(rate=1000, burst=100, concurrency=2), overrides={})
+    peak = {"slow.example": 0, "other.example": 0}
+    active = {"slow.example": 0, "other.example": 0}
+
+    async def request(host):
+        async with scheduler.slot(host):
+            active[host] += 1
+            peak[host] = max(peak[host], active[host])
+            await asyncio.sleep(0.02)
+            active[host] -= 1
+
+    async def run():
+        await asyncio.gather(*(request("slow.example") for _ in range(6)), *(request("other.example") for _ in range(2)))
+
+    asyncio.run(run())
+    assert peak == {"slow.example": 2, "other.example": 2}
+
+
+def test_retry_after_blocks_host():
+    scheduler = HostScheduler(HostPolicy(rate=1000, burst=100, concurrency=5), overrides={}, max_retry_after=0.1)
+    assert scheduler.observe("example.com", 429, {"Retry-After": "30"}) == 0.1
+    assert scheduler.observe("example.com", 503, {}) is None
+    assert scheduler.observe("example.com", 200, {}) is None
+
+    async def run():
+        start = time.monotonic()
+        async with scheduler.slot("example.com"):
+            pass
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.09
+    assert scheduler.get_stats()["example.com"]["throttled"] == 1
+
+
+def test_hosts_on_one_network_share_the_ip_cap():
+    scheduler = HostScheduler(HostPolicy(rate=1000, burst=100, concurrency=5), overrides={}, ip_concurrency=2)
+    addresses = {"a.github.io": ["185.199.108.153"], "b.github.io": ["185.199.108.154"], "other.example": ["93.184.216.34"]}
+    active = {"185.199.108.0/24": 0, "93.184.216.0/24": 0}
+    peak = dict(active)
+
+    async def request(host):
+        async with scheduler.slot(host, addresses[host]):
+            network = ip_group(addresses[host][0])
+            active[network] += 1
+            peak[network] = max(peak[network], active[network])
+            await asyncio.sleep(0.02)
+            active[network] -= 1
+
+    async def run():
+        await asyncio.gather(*(request(host) for host in addresses for _ in range(3)))
+
+    asyncio.run(run())
+    assert peak == {"185.199.108.0/24": 2, "93.184.216.0/24": 2}
+    assert scheduler.get_group_stats()["185.199.108.0/24"]["hosts"] == 2
+    assert ip_group("2606:50c0:8000::153") == "2606:50c0:8000::/64"
+    assert ip_group("not-an-ip") is None
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.pipeline.sharding import iter_sharded, partition, shard_for
+
+
+def test_shard_for_is_stable_and_case_insensitive():
+    assert shard_for("example.com", 4) == shard_for("EXAMPLE.com", 4)
+    # Not the per-process salted hash(): fixed across runs
+    assert [shard_for(host, 4) for host in ("a.com", "b.com", "c.com")] == [1, 3, 2]
+    assert shard_for(None, 3) == shard_for("", 3)
+
+
+def test_partition_keeps_each_host_on_one_shard_in_order():
+    urls = [f"{host}/{i}" for i in range(5) for host in ("a.com", "b.com", "c.com", "d.com")]
+    parts = partition(urls, 3, key=lambda url: url.split("/")[0])
+
+    assert sorted(sum(parts, [])) == sorted(urls)
+    for part in parts:
+        hosts = {url.split("/")[0] for url in part}
+        assert all(shard_for(host, 3) == parts.index(part) for host in hosts)
+        for host in hosts:
+            assert [u for u in part if u.startswith(host)] == [f"{host}/{i}" for i in range(5)]
+
+
+async def _double(items, factor):
+    for item in items:
+        if item == "boom":
+            raise RuntimeError("shard blew up")
+        yield item * factor
+
+
+def test_iter_sharded_collects_every_shard():
+    async def run():
+        return [r async for r in iter_sharded(_double, [[1, 2], [], [3]], args=(10,))]
+
+    assert sorted(asyncio.run(run())) == [10, 20, 30]
+
+
+def test_failed_shard_does_not_stop_the_others():
+    async def run():
+        return [r async for r in iter_sharded(_double, [[1, "boom", 2], [3]], args=(2,))]
+
+    assert sorted(asyncio.run(run()), key=str) == [2, 6]
@@ -0,0 +1,81 @@
+import asyncio
+
+from app.pipeline.singleflight import SingleFlight, SQLiteCheckLeases
+from app.pipeline.urls import normalize_url
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.COM:443#top") == "https://example.com/"
+    assert normalize_url("http://example.com:8080/Path?q=1") == "http://example.com:8080/Path?q=1"
+    assert normalize_url("https://user:pw@example.com./a") == "https://example.com/a"
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def check():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("https://example.com/", check) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["ok"] * 5
+    assert len(calls) == 1
+    assert flight.stats["coalesced"] == 4
+    assert flight.in_flight() == 0
+
+
+def test_errors_propagate_and_are_not_cached():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        return results, await flight.do("k", ok)
+
+    results, after = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert after == "ok"
+
+
+def test_lease_blocks_other_process_until_released(tmp_path):
+    leases = SQLiteCheckLeases(str(tmp_path / "cache.db"))
+    first = SingleFlight(leases, poll_seconds=0.01)
+    second = SingleFlight(leases, poll_seconds=0.01)
+    order = []
+
+    async def check(name):
+        order.append(f"{name} start")
+        await asyncio.sleep(0.05)
+        order.append(f"{name} end")
+        return name
+
+    async def run():
+        a = asyncio.create_task(first.do("https://example.com/", lambda: check("a")))
+        await asyncio.sleep(0.01)
+        b = asyncio.create_task(second.do("https://example.com/", lambda: check("b")))
+        return await asyncio.gather(a, b)
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert order == ["a start", "a end", "b start", "b end"]
+    assert second.stats["lease_waits"] == 1
+
+
+def test_expired_lease_can_be_taken_over(tmp_path):
+    leases = SQLiteCheckLeases(str(tmp_path / "cache.db"), lease_seconds=-1)
+    assert leases.try_acquire("k", "crashed")
+    assert leases.try_acquire("k", "me")
+
+    leases = SQLiteCheckLeases(str(tmp_path / "cache.db"))
+    leases.release("k", "me")
+    assert leases.try_acquire("k", "owner")
+    assert not leases.try_acquire("k", "other")
@@ -0,0 +1,47 @@
+import time
+
+from app.pipeline.strategy import (
+    DomainStrategy, SQLiteStrategyStore, StrategyLearner, registrable_domain,
+    GET_RANGE, HEAD, HEAD_WITH_FALLBACK, HEAD_BLOCKED, HEAD_OK, HEAD_REFUSED,
+)
+
+
+def test_registrable_domain():
+    assert registrable_domain("docs.google.com") == "google.com"
+    assert registrable_domain("WWW.GitHub.com.") == "github.com"
+    assert registrable_domain("news.bbc.co.uk") == "bbc.co.uk"
+    assert registrable_domain("someone.github.io") == "someone.github.io"
+    assert registrable_domain("127.0.0.1") == "127.0.0.1"
+    assert registrable_domain("localhost") == "localhost"
+
+
+def test_seeds_apply_to_every_subdomain_until_history_exists():
+    learner = StrategyLearner(min_observations=2)
+    assert learner.strategy_for("www.github.com") == HEAD
+    assert learner.strategy_for("drive.google.com") == GET_RANGE
+    assert learner.strategy_for("example.org") == HEAD_WITH_FALLBACK
+    learner.record("github.com", HEAD_REFUSED)
+    learner.record("api.github.com", HEAD_REFUSED)
+    assert learner.strategy_for("www.github.com") == GET_RANGE
+
+
+def test_history_persists_and_decays(tmp_path):
+    store = SQLiteStrategyStore(str(tmp_path / "cache.db"))
+    learner = StrategyLearner(store, min_observations=2)
+    for _ in range(30):
+        learner.record("example.org", HEAD_BLOCKED)
+    assert learner.strategy_for("www.example.org") == GET_RANGE
+
+    restarted = StrategyLearner(store, min_observations=2)
+    assert restarted.strategy_for("example.org") == GET_RANGE
+    # The old history is halved as it is replaced, so HEAD working again wins quickly
+    for _ in range(12):
+        restarted.record("example.org", HEAD_OK)
+    assert restarted.strategy_for("example.org") == HEAD_WITH_FALLBACK
+
+
+def test_get_domains_try_head_again_after_the_reprobe_window():
+    entry = DomainStrategy("example.org", head_refused=5, head_tried_at=time.time() - 86400)
+    assert entry.strategy(time.time(), 2, reprobe_seconds=7 * 86400) == GET_RANGE
+    assert entry.strategy(time.time(), 2, reprobe_seconds=3600) == HEAD_WITH_FALLBACK
+
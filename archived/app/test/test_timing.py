@@ -0,0 +1,89 @@
+import asyncio
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.pipeline.timing import RequestTimings, request_bytes
+from app.pipeline.transport import create_transport
+from app.sqlite_cache import BookmarkCacheEntry, SQLiteBookmarkCache
+
+BODY = b"x" * 4096
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/old":
+            self.send_response(301)
+            self.send_header("Location", "/page")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.mark.parametrize("transport", ["aiohttp", "raw"])
+def test_transports_measure_phases_and_bytes(server, transport):
+    async def fetch():
+        async with create_transport(transport) as client:
+            return await client.request("GET", f"{server}/old", read_bytes=1024)
+
+    response = asyncio.run(fetch())
+    timings = response.timings
+    assert response.status == 200 and len(response.redirects) == 1
+    assert timings.dns_ms is not None and timings.connect_ms is not None
+    assert timings.first_byte_ms > 0 and timings.transfer_ms is not None
+    assert timings.tls_ms is None  # plain HTTP
+    # Two request heads went out; every header block and at least the bytes read came back
+    assert timings.bytes_sent > 2 * len("GET /old HTTP/1.1\r\n")
+    assert timings.bytes_received >= 1024 + 2 * len("HTTP/1.1 200 OK\r\n")
+
+
+def test_timings_merge_and_roundtrip():
+    head = RequestTimings(connect_ms=5.0, first_byte_ms=20.0, bytes_sent=100, bytes_received=300)
+    get = RequestTimings(first_byte_ms=30.0, transfer_ms=4.0, bytes_sent=120, bytes_received=1500)
+    merged = RequestTimings.from_dict(head.to_dict()).merge(get)
+    assert merged == RequestTimings(
+        connect_ms=5.0, first_byte_ms=50.0, transfer_ms=4.0, bytes_sent=220, bytes_received=1800
+    )
+    assert RequestTimings.from_dict({"dns_ms": 1.5, "unrelated": 1}).dns_ms == 1.5
+    assert request_bytes("HEAD", "/", {"Host": "a"}) == len("HEAD / HTTP/1.1\r\nHost: a\r\n\r\n")
+
+
+def test_metrics_are_real_columns_and_old_databases_are_migrated(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE bookmarks_cache (id TEXT PRIMARY KEY, url TEXT NOT NULL, name TEXT, last_checked TEXT, "
+            "broken_status TEXT, login_required TEXT DEFAULT 'unknown', error_details TEXT)"
+        )
+        conn.execute("INSERT INTO bookmarks_cache (id, url) VALUES ('1', 'http://old.example/')")
+
+    cache = SQLiteBookmarkCache(db_path)
+    assert cache.get("1").metrics is None
+    cache.upsert(BookmarkCacheEntry(
+        id="2", url="http://a.example/", broken_status="ok",
+        metrics=RequestTimings(dns_ms=1.5, first_byte_ms=42.0, bytes_sent=80, bytes_received=512).to_dict(),
+    ))
+
+    assert cache.get("2").metrics["first_byte_ms"] == 42.0
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT SUM(bytes_received), MAX(first_byte_ms) FROM bookmarks_cache").fetchone() == (512, 42.0)
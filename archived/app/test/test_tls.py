@@ -0,0 +1,43 @@
+import asyncio
+import socket
+
+from app.pipeline.tls import TLSProbe
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_failed_probe_is_shared_per_host_port():
+    probe = TLSProbe(timeout=1)
+    port = _unused_port()
+
+    async def run():
+        return await asyncio.gather(*(probe.probe("127.0.0.1", port) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(not r.valid for r in results)
+    assert results[0].error_kind == "refused"
+    assert probe.stats["probes"] == 1
+    assert probe.cached("127.0.0.1", port) is results[0]
+
+
+def test_plaintext_server_is_an_ssl_error():
+    probe = TLSProbe(timeout=2)
+
+    async def run():
+        async def handle(reader, writer):
+            writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await probe.probe("127.0.0.1", port)
+
+    result = asyncio.run(run())
+    assert not result.valid
+    assert result.error_kind == "ssl"
@@ -0,0 +1,90 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.pipeline.retry import classify_exception, DEFINITIVE
+from app.pipeline.transport import ConnectError, create_transport, TRANSPORTS
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, body=b""):
+        if self.path == "/old":
+            self.send_response(301)
+            self.send_header("Location", "/new")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        status = 404 if self.path == "/missing" else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_GET(self):
+        body = b"<html>" + b"x" * 4000 + b"</html>"
+        self._respond(body)
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def _request(name, *args, **kwargs):
+    async def run():
+        async with create_transport(name) as transport:
+            return await transport.request(*args, **kwargs)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("name", sorted(TRANSPORTS))
+def test_head_status_and_redirects(name, base_url):
+    ok = _request(name, "HEAD", f"{base_url}/page")
+    assert ok.status == 200
+    assert ok.headers.get("content-type") == "text/html"
+    assert ok.size > 0
+
+    redirected = _request(name, "HEAD", f"{base_url}/old")
+    assert redirected.status == 200
+    assert redirected.final_url == f"{base_url}/new"
+    assert redirected.size > ok.size
+
+    assert _request(name, "HEAD", f"{base_url}/missing").status == 404
+
+
+@pytest.mark.parametrize("name", sorted(TRANSPORTS))
+def test_get_reads_only_the_requested_prefix(name, base_url):
+    response = _request(name, "GET", f"{base_url}/page", read_bytes=1024)
+    assert response.status == 200
+    assert response.size < 1024 + 500
+
+
+@pytest.mark.parametrize("name", sorted(TRANSPORTS))
+def test_refused_connection_is_a_definitive_connect_error(name):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(ConnectError) as excinfo:
+        _request(name, "HEAD", f"http://127.0.0.1:{port}/")
+    assert classify_exception(excinfo.value) == DEFINITIVE
+
+
+def test_unknown_transport():
+    with pytest.raises(ValueError):
+        create_transport("curl")
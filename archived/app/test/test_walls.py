@@ -0,0 +1,29 @@
+import time
+
+from app.pipeline.walls import BOT_PROTECTED, LOGIN_WALLED, SQLiteWallStore, WallTracker
+
+
+def test_walls_are_confirmed_by_consecutive_walled_answers():
+    walls = WallTracker(confirm_checks=3)
+    walls.observe("www.linkedin.com", BOT_PROTECTED, 999)
+    walls.observe("www.linkedin.com", BOT_PROTECTED, 999)
+    assert walls.verdict("www.linkedin.com") is None
+    walls.observe("www.linkedin.com", BOT_PROTECTED, 999)
+    assert walls.verdict("WWW.LinkedIn.com").kind == BOT_PROTECTED
+    # Any normal answer drops the wall
+    walls.observe("www.linkedin.com", None, 200)
+    assert walls.verdict("www.linkedin.com") is None
+    assert walls.get_walled_hosts() == {}
+
+
+def test_one_sample_per_interval_and_persistence(tmp_path):
+    store = SQLiteWallStore(str(tmp_path / "cache.db"))
+    walls = WallTracker(store, confirm_checks=1, sample_hours=1)
+    walls.observe("docs.google.com", LOGIN_WALLED, 200)
+    restarted = WallTracker(store, confirm_checks=1, sample_hours=1)
+    assert restarted.verdict("docs.google.com").status_code == 200
+
+    restarted.get_walled_hosts()["docs.google.com"].sampled_at = time.time() - 7200
+    assert restarted.verdict("docs.google.com") is None  # this check is the sample
+    assert restarted.verdict("docs.google.com") is not None  # the rest still are not
+    assert restarted.stats == {"classified": 2, "sampled": 1, "confirmed": 0, "dropped": 0}
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the URL-check transports against a local HTTP server.
+
+Reports URLs/sec, CPU time per check and peak Python memory for each backend.
+The server runs in a separate process so its CPU time is not counted.
+
+    python scripts/benchmark_transports.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from app.pipeline.transport import TRANSPORTS, create_transport
+
+BODY = b"<html><head><title>Benchmark</title></head><body>" + b"x" * 2048 + b"</body></html>"
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.1 responder with keep-alive, so pooling clients can reuse connections."""
+    try:
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            method = request.split(b" ", 1)[0]
+            close = b"connection: close" in request.lower()
+            body = b"" if method == b"HEAD" else BODY
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n"
+                + f"Content-Length: {len(BODY)}\r\n".encode()
+                + (b"Connection: close\r\n" if close else b"")
+                + b"\r\n" + body
+            )
+            await writer.drain()
+            if close:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def run_server(port_pipe):
+    async def serve():
+        server = await asyncio.start_server(handle_client, "127.0.0.1", 0, backlog=1024)
+        port_pipe.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+async def run_checks(name: str, url: str, method: str, requests: int, concurrency: int, shared: bool) -> int:
+    """Run ``requests`` checks, returning how many got a 200.
+
+    By default every check opens its own transport; with ``shared`` one transport
+    (and, for aiohttp, one connection pool) serves all, as the check pipeline does.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    shared_transport = create_transport(name) if shared else None
+
+    async def check() -> bool:
+        async with semaphore:
+            if shared_transport:
+                response = await shared_transport.request(method, url, read_bytes=1024 if method == "GET" else 0)
+            else:
+                async with create_transport(name) as transport:
+                    response = await transport.request(method, url, read_bytes=1024 if method == "GET" else 0)
+            return response.status == 200
+
+    try:
+        results = await asyncio.gather(*(check() for _ in range(requests)))
+    finally:
+        if shared_transport:
+            await shared_transport.close()
+    return sum(results)
+
+
+def benchmark(name: str, url: str, args) -> dict:
+    # Warm up (imports, SSL contexts, first connections)
+    asyncio.run(run_checks(name, url, args.method, min(50, args.requests), args.concurrency, args.shared))
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    ok = asyncio.run(run_checks(name, url, args.method, args.requests, args.concurrency, args.shared))
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    peak_mb = None
+    if not args.no_memory:
+        # Separate pass: tracemalloc slows allocation down and would skew the timings
+        tracemalloc.start()
+        asyncio.run(run_checks(name, url, args.method, args.requests, args.concurrency, args.shared))
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "ok": ok,
+        "urls_per_sec": args.requests / wall,
+        "cpu_ms_per_check": cpu / args.requests * 1000,
+        "peak_mb": peak_mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="checks per backend")
+    parser.add_argument("--concurrency", type=int, default=50, help="checks in flight")
+    parser.add_argument("--method", choices=["HEAD", "GET"], default="HEAD")
+    parser.add_argument("--transports", nargs="+", choices=sorted(TRANSPORTS), default=sorted(TRANSPORTS))
+    parser.add_argument("--shared", action="store_true", help="reuse one transport for every check")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    receive_port, send_port = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(target=run_server, args=(send_port,), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{receive_port.recv()}/page"
+
+    mode = "shared transport" if args.shared else "transport per check"
+    print(f"\n🏁 Benchmarking {', '.join(args.transports)}: {args.requests} {args.method} checks, "
+          f"concurrency {args.concurrency}, {mode}")
+    print("=" * 60)
+    try:
+        results = [benchmark(name, url, args) for name in args.transports]
+    finally:
+        server.terminate()
+
+    print(f"{'Transport':<10} | {'URLs/sec':>9} | {'CPU ms/check':>12} | {'Peak MB':>8} | {'OK':>6}")
+    print("-" * 60)
+    for r in results:
+        peak = f"{r['peak_mb']:.2f}" if r["peak_mb"] is not None else "-"
+        print(f"{r['name']:<10} | {r['urls_per_sec']:>9.0f} | {r['cpu_ms_per_check']:>12.3f} | {peak:>8} | {r['ok']:>6}")
+
+
+if __name__ == "__main__":
+    main()
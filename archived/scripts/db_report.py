@@ -27,6 +27,27 @@ print(f"Total entries: {total}")
 print(f"Broken:        {broken}")
 print(f"OK:            {ok}")
 
+# Bandwidth, if the enhanced columns exist (see update_db_schema.py)
+columns = {row[1] for row in cursor.execute("PRAGMA table_info(bookmarks_cache)")}
+if 'revalidation_bytes' in columns:
+    cursor.execute("SELECT COALESCE(SUM(bandwidth_bytes), 0), COUNT(revalidation_bytes), COALESCE(SUM(revalidation_bytes), 0) FROM bookmarks_cache")
+    bandwidth, revalidated, revalidation_bytes = cursor.fetchone()
+    print(f"Bandwidth:     {bandwidth / 1024:.1f} KB")
+    print(f"Revalidated:   {revalidated} not modified ({revalidation_bytes / 1024:.1f} KB)")
+
+# Measured per-check cost, if the timing columns exist (written by checks since they were added)
+if 'bytes_received' in columns:
+    cursor.execute(
+        "SELECT COUNT(bytes_received), COALESCE(SUM(bytes_sent), 0), COALESCE(SUM(bytes_received), 0), "
+        "AVG(dns_ms), AVG(connect_ms), AVG(tls_ms), AVG(first_byte_ms), AVG(transfer_ms) "
+        "FROM bookmarks_cache WHERE bytes_received IS NOT NULL"
+    )
+    measured, sent, received, *averages = cursor.fetchone()
+    if measured:
+        print(f"Measured:      {measured} checks, {sent / 1024:.1f} KB sent, {received / 1024:.1f} KB received")
+        phases = zip(("DNS", "connect", "TLS", "first byte", "transfer"), averages)
+        print("Avg timings:   " + ", ".join(f"{name} {ms:.0f}ms" for name, ms in phases if ms is not None))
+
 # Show a few sample entries
 print(f"\nSample entries:")
 cursor.execute('SELECT id, url, name, last_checked, broken_status, error_details FROM bookmarks_cache LIMIT 5')
@@ -1,20 +1,22 @@
 #!/usr/bin/env python3
 """
 Simple HEAD request checker for bookmarks.
-Issues HEAD requests to all bookmarks and saves results to SQLite.
+Checks all bookmarks with the shared URL check pipeline (HEAD first, ranged GET
+where HEAD is refused) and saves results to SQLite.
 """
 
 import os
 import sys
 import asyncio
 import sqlite3
-import aiohttp
 from datetime import datetime
 from typing import List, Dict, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from app.bookmarks_data import BookmarkStore
+from app.pipeline.check import url_checker
+from app.pipeline.dns import dns_resolver
 
 # Simple database schema
 DB_PATH = os.path.join(os.path.dirname(__file__), '../data/head_check_results.db')
@@ -36,40 +38,17 @@ def init_db():
         ''')
         conn.commit()
 
-async def head_check(session: aiohttp.ClientSession, url: str) -> Dict:
-    """Perform simple HEAD request and return results."""
-    start_time = datetime.now()
-    
-    try:
-        async with session.head(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-            response_time = int((datetime.now() - start_time).total_seconds() * 1000)
-            
-            return {
-                'url': url,
-                'status_code': response.status,
-                'is_accessible': response.status < 400,
-                'response_time_ms': response_time,
-                'error_message': None
-            }
-            
-    except aiohttp.ClientError as e:
-        response_time = int((datetime.now() - start_time).total_seconds() * 1000)
-        return {
-            'url': url,
-            'status_code': None,
-            'is_accessible': False,
-            'response_time_ms': response_time,
-            'error_message': str(e)
-        }
-    except Exception as e:
-        response_time = int((datetime.now() - start_time).total_seconds() * 1000)
-        return {
-            'url': url,
-            'status_code': None,
-            'is_accessible': False,
-            'response_time_ms': response_time,
-            'error_message': f"Unexpected error: {str(e)}"
-        }
+async def head_check(url: str) -> Dict:
+    """Check a URL through the shared check pipeline (HEAD first) and return results."""
+    is_accessible, error_details, details = await url_checker.check(url)
+    response_time = details.get('response_time')
+    return {
+        'url': url,
+        'status_code': details.get('status_code'),
+        'is_accessible': is_accessible,
+        'response_time_ms': int(response_time * 1000) if response_time is not None else 0,
+        'error_message': None if is_accessible else error_details.message
+    }
 
 def save_result(url: str, name: str, result: Dict):
     """Save HEAD check result to SQLite."""
@@ -114,39 +93,44 @@ async def main():
     accessible = 0
     broken = 0
     
-    async with aiohttp.ClientSession() as session:
-        for i in range(0, total, batch_size):
-            batch = bookmarks[i:i + batch_size]
-            
-            # Process batch concurrently
-            tasks = [head_check(session, bookmark.url.full) for bookmark in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Resolve every distinct hostname once before any HTTP work
+    await dns_resolver.prefetch(b.url.hostname for b in bookmarks)
+
+    for i in range(0, total, batch_size):
+        batch = bookmarks[i:i + batch_size]
+        
+        # Process batch concurrently
+        tasks = [head_check(bookmark.url.full) for bookmark in batch]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Save results and update counters
+        for bookmark, result in zip(batch, results):
+            if isinstance(result, Exception):
+                result = {
+                    'url': bookmark.url.full,
+                    'status_code': None,
+                    'is_accessible': False,
+                    'response_time_ms': 0,
+                    'error_message': str(result)
+                }
             
-            # Save results and update counters
-            for bookmark, result in zip(batch, results):
-                if isinstance(result, Exception):
-                    result = {
-                        'url': bookmark.url.full,
-                        'status_code': None,
-                        'is_accessible': False,
-                        'response_time_ms': 0,
-                        'error_message': str(result)
-                    }
-                
-                save_result(bookmark.url.full, bookmark.name, result)
-                
-                checked += 1
-                if result['is_accessible']:
-                    accessible += 1
-                    print(f"✅ {bookmark.name} [{result['status_code']}] ({result['response_time_ms']}ms)")
-                else:
-                    broken += 1
-                    error = result['error_message'] or f"HTTP {result['status_code']}"
-                    print(f"❌ {bookmark.name} - {error}")
+            save_result(bookmark.url.full, bookmark.name, result)
             
-            # Progress update
-            print(f"📊 Progress: {checked}/{total} | ✅ {accessible} accessible | ❌ {broken} broken")
-    
+            checked += 1
+            if result['is_accessible']:
+                accessible += 1
+                print(f"✅ {bookmark.name} [{result['status_code']}] ({result['response_time_ms']}ms)")
+            else:
+                broken += 1
+                error = result['error_message'] or f"HTTP {result['status_code']}"
+                print(f"❌ {bookmark.name} - {error}")
+        
+        # Progress update
+        print(f"📊 Progress: {checked}/{total} | ✅ {accessible} accessible | ❌ {broken} broken")
+
+    dns_resolver.flush()
+    await url_checker.close()
+
     print(f"\n🎉 Complete! Results saved to: {DB_PATH}")
     print(f"📊 Final: {accessible} accessible, {broken} broken out of {total} total")
 
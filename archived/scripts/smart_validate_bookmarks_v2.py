@@ -1,63 +1,38 @@
 #!/usr/bin/env python3
 """
 Smart bookmark validation v2 - saves all enhanced fields to SQLite.
+The checking itself is the shared pipeline in app.pipeline.check.
 """
 
+import argparse
 import os
 import sys
 import asyncio
-import aiohttp
-import socket
 import sqlite3
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
-from urllib.parse import urlparse
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from app.bookmarks_data import BookmarkStore
+from app.bookmarks_data import BookmarkStore, login_required_label
+from app.pipeline.dns import dns_resolver
+from app.pipeline.scheduler import interleave_by_host
+from app.pipeline.latency import http_latency
+from app.pipeline.priority import prioritize
+from app.pipeline.budget import RunBudget
+from app.pipeline.runs import validation_runs, RUN_SMART_V2
+from app.pipeline.check import CheckResult, url_checker
+from app.sqlite_cache import sqlite_cache, METRIC_COLUMNS
 from app.config import CACHE_FRESHNESS_HOURS
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '../data/bookmarks_cache.db')
 
-# Domain-specific strategies
-DOMAIN_STRATEGIES = {
-    'docs.google.com': 'GET_RANGE',
-    'drive.google.com': 'GET_RANGE',
-    'sheets.google.com': 'GET_RANGE',
-    'github.com': 'HEAD',
-    'twitter.com': 'GET_RANGE',
-    'x.com': 'GET_RANGE',
-    'linkedin.com': 'GET_RANGE',
-    'facebook.com': 'GET_RANGE',
-    'instagram.com': 'GET_RANGE',
-    'reddit.com': 'HEAD',
-    'stackoverflow.com': 'HEAD',
-    'youtube.com': 'HEAD',
-    'medium.com': 'HEAD',
-    'notion.so': 'GET_RANGE',
-}
-
-# Login detection patterns in HTML content
-LOGIN_PATTERNS = [
-    b'<form.*login',
-    b'<form.*signin',
-    b'<input.*password',
-    b'<title>.*Sign [Ii]n',
-    b'<title>.*Log[Ii]n',
-    b'class="login',
-    b'id="login',
-    b'Authentication Required',
-    b'Access Denied',
-    b'Unauthorized',
-]
 
 class SmartBookmarkValidatorV2:
     def __init__(self, bookmarks_file: str):
         self.store = BookmarkStore(bookmarks_file)
         self.store.load_data()
-        self.dns_cache = {}
         self.stats = {
             'total': 0,
             'dns_failed': 0,
@@ -66,8 +41,19 @@ class SmartBookmarkValidatorV2:
             'http_auth': 0,
             'http_broken': 0,
             'cache_hits': 0,
-            'bandwidth_bytes': 0
+            'http_not_modified': 0,
+            'bandwidth_bytes': 0,
+            'revalidation_bytes': 0
         }
+        self.ensure_revalidation_column()
+
+    def ensure_revalidation_column(self):
+        """Add revalidation_bytes to databases migrated before it existed (see update_db_schema.py)."""
+        with sqlite3.connect(DB_PATH) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(bookmarks_cache)")}
+            if 'bandwidth_bytes' in columns and 'revalidation_bytes' not in columns:
+                conn.execute("ALTER TABLE bookmarks_cache ADD COLUMN revalidation_bytes INTEGER")
+                conn.commit()
 
     def save_to_sqlite(self, bookmark_data: Dict):
         """Save bookmark validation data with all enhanced fields."""
@@ -77,43 +63,37 @@ class SmartBookmarkValidatorV2:
             status = bookmark_data['status']
             error_details = status.get('error_details', {})
             
-            # Calculate bandwidth for this check
-            bandwidth = 0
-            if status.get('dns_resolved') == False:
-                bandwidth = 50  # DNS check only
-            elif status.get('tcp_connectable') == False:
-                bandwidth = 150  # DNS + TCP
-            else:
-                # HTTP check
-                method = error_details.get('method_used', 'HEAD')
-                if method == 'HEAD':
-                    bandwidth = 500
-                elif method == 'GET_RANGE':
-                    bandwidth = 2500
+            # Bandwidth for this check, as measured; checks that stopped at DNS or TCP
+            # moved no HTTP bytes
+            timings = error_details.get('timings') or {}
+            bandwidth = timings.get('bytes_received', 0)
+            revalidation_bytes = bandwidth if error_details.get('not_modified') else None
             
             # Execute the insert/update with all fields
-            conn.execute('''
+            conn.execute(f'''
                 INSERT INTO bookmarks_cache (
                     id, url, name, last_checked, broken_status, login_required,
                     error_details, http_method, dns_resolved, tcp_connectable,
                     redirect_count, final_url, content_preview, response_time_ms,
-                    bandwidth_bytes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    bandwidth_bytes, revalidation_bytes, {', '.join(METRIC_COLUMNS)}
+                ) VALUES ({', '.join('?' * (16 + len(METRIC_COLUMNS)))})
                 ON CONFLICT(id) DO UPDATE SET
                     url=excluded.url,
                     name=excluded.name,
                     last_checked=excluded.last_checked,
                     broken_status=excluded.broken_status,
-                    login_required=excluded.login_required,
+                    login_required=COALESCE(excluded.login_required, bookmarks_cache.login_required),
                     error_details=excluded.error_details,
                     http_method=excluded.http_method,
                     dns_resolved=excluded.dns_resolved,
                     tcp_connectable=excluded.tcp_connectable,
                     redirect_count=excluded.redirect_count,
                     final_url=excluded.final_url,
-                    content_preview=excluded.content_preview,
+                    content_preview=CASE WHEN ? THEN bookmarks_cache.content_preview ELSE excluded.content_preview END,
                     response_time_ms=excluded.response_time_ms,
-                    bandwidth_bytes=excluded.bandwidth_bytes
+                    bandwidth_bytes=excluded.bandwidth_bytes,
+                    revalidation_bytes=excluded.revalidation_bytes,
+                    {', '.join(f'{column}=excluded.{column}' for column in METRIC_COLUMNS)}
             ''', (
                 bookmark.id,
                 bookmark.url.full,
@@ -125,11 +105,14 @@ class SmartBookmarkValidatorV2:
                 error_details.get('method_used'),
                 status.get('dns_resolved', True),
                 status.get('tcp_connectable', True),
-                0,  # redirect_count - TODO: track this
+                error_details.get('redirect_count', 0),
                 error_details.get('final_url'),
                 error_details.get('content_preview'),
                 int(error_details.get('response_time', 0) * 1000) if error_details.get('response_time') else None,
-                bandwidth
+                bandwidth,
+                revalidation_bytes,
+                *(timings.get(column) for column in METRIC_COLUMNS),
+                bool(error_details.get('not_modified'))
             ))
             conn.commit()
 
@@ -147,269 +130,141 @@ class SmartBookmarkValidatorV2:
                     pass
         return False
 
-    async def check_dns(self, hostname: str) -> bool:
-        """Check if hostname resolves to IP address."""
-        if hostname in self.dns_cache:
-            return self.dns_cache[hostname]
-        
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, socket.gethostbyname, hostname)
-            self.dns_cache[hostname] = True
-            return True
-        except (socket.gaierror, socket.error):
-            self.dns_cache[hostname] = False
+    def count(self, result: CheckResult):
+        """Tally a pipeline result into the run's stats."""
+        is_accessible, _, details = result
+        size = details.get('bandwidth_bytes') or 0
+        self.stats['bandwidth_bytes'] += size
+        if details.get('dns_resolved') is False:
             self.stats['dns_failed'] += 1
-            return False
-
-    async def check_tcp_connect(self, hostname: str, port: int = 443) -> bool:
-        """Check if we can establish TCP connection."""
-        try:
-            _, writer = await asyncio.wait_for(
-                asyncio.open_connection(hostname, port),
-                timeout=3.0
-            )
-            writer.close()
-            await writer.wait_closed()
-            return True
-        except (asyncio.TimeoutError, OSError):
+        elif details.get('tcp_connectable') is False:
             self.stats['tcp_failed'] += 1
-            return False
-
-    def detect_login_required(self, content: bytes) -> bool:
-        """Detect if content contains login page patterns."""
-        content_lower = content.lower()
-        return any(pattern in content_lower for pattern in LOGIN_PATTERNS)
-
-    async def check_http_status(self, session: aiohttp.ClientSession, url: str) -> Dict:
-        """Perform HTTP check using appropriate method based on domain."""
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        
-        # Determine strategy
-        strategy = DOMAIN_STRATEGIES.get(domain, 'HEAD_WITH_FALLBACK')
-        
-        result = {
-            'url': url,
-            'method_used': None,
-            'status_code': None,
-            'is_accessible': False,
-            'login_required': False,
-            'final_url': None,
-            'response_time': None,
-            'content_preview': None,
-            'error': None
-        }
-        
-        start_time = datetime.now()
-        
-        try:
-            # Try HEAD first unless strategy says otherwise
-            if strategy in ['HEAD', 'HEAD_WITH_FALLBACK']:
-                try:
-                    async with session.head(
-                        url, 
-                        timeout=aiohttp.ClientTimeout(total=8),
-                        allow_redirects=True,
-                        ssl=False
-                    ) as response:
-                        result['method_used'] = 'HEAD'
-                        result['status_code'] = response.status
-                        result['final_url'] = str(response.url)
-                        result['response_time'] = (datetime.now() - start_time).total_seconds()
-                        self.stats['bandwidth_bytes'] += 500
-                        
-                        if response.status < 400:
-                            result['is_accessible'] = True
-                            self.stats['http_ok'] += 1
-                        elif response.status in [401, 403]:
-                            result['is_accessible'] = True
-                            result['login_required'] = True
-                            self.stats['http_auth'] += 1
-                        elif response.status == 405 and strategy == 'HEAD_WITH_FALLBACK':
-                            raise aiohttp.ClientError("HEAD not supported")
-                        else:
-                            self.stats['http_broken'] += 1
-                            
-                        return result
-                        
-                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                    if strategy != 'HEAD_WITH_FALLBACK':
-                        result['error'] = str(e)
-                        return result
-            
-            # Use GET with Range header
-            if strategy in ['GET_RANGE', 'HEAD_WITH_FALLBACK']:
-                start_time = datetime.now()
-                headers = {'Range': 'bytes=0-2047'}
-                
-                async with session.get(
-                    url,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10),
-                    allow_redirects=True,
-                    ssl=False
-                ) as response:
-                    result['method_used'] = 'GET_RANGE'
-                    result['status_code'] = response.status
-                    result['final_url'] = str(response.url)
-                    result['response_time'] = (datetime.now() - start_time).total_seconds()
-                    
-                    # Read content preview
-                    content = await response.content.read(2048)
-                    result['content_preview'] = content[:1024].decode('utf-8', errors='ignore')
-                    self.stats['bandwidth_bytes'] += len(content) + 500
-                    
-                    if response.status < 400:
-                        result['is_accessible'] = True
-                        # Check for login patterns in content
-                        if self.detect_login_required(content):
-                            result['login_required'] = True
-                            self.stats['http_auth'] += 1
-                        else:
-                            self.stats['http_ok'] += 1
-                    elif response.status in [401, 403]:
-                        result['is_accessible'] = True
-                        result['login_required'] = True
-                        self.stats['http_auth'] += 1
-                    else:
-                        self.stats['http_broken'] += 1
-                        
-        except aiohttp.ClientError as e:
-            result['error'] = f"Connection error: {str(e)}"
-            self.stats['http_broken'] += 1
-        except asyncio.TimeoutError:
-            result['error'] = "Timeout"
+        elif not is_accessible:
             self.stats['http_broken'] += 1
-        except Exception as e:
-            result['error'] = f"Unexpected error: {str(e)}"
-            self.stats['http_broken'] += 1
-            
-        return result
+        elif details.get('not_modified'):
+            self.stats['http_not_modified'] += 1
+            self.stats['revalidation_bytes'] += size
+        elif details.get('login_required'):
+            self.stats['http_auth'] += 1
+        else:
+            self.stats['http_ok'] += 1
 
-    async def validate_bookmark(self, session: aiohttp.ClientSession, bookmark) -> Optional[Dict]:
-        """Validate a single bookmark with tiered checking."""
+    async def validate_bookmark(self, bookmark) -> Optional[Dict]:
+        """Validate a single bookmark through the staged check pipeline."""
         # Check cache first
         if self.is_cache_fresh(bookmark.id):
             self.stats['cache_hits'] += 1
             return None
         
-        url = bookmark.url.full
-        parsed = urlparse(url)
-        hostname = parsed.netloc
-        
-        # Stage 1: DNS Check
         print(f"🔍 Checking: {bookmark.name[:50]}...")
-        dns_resolved = await self.check_dns(hostname)
-        if not dns_resolved:
-            print(f"  ❌ DNS failed: {hostname}")
-            return {
-                'bookmark': bookmark,
-                'status': {
-                    'dns_resolved': False,
-                    'tcp_connectable': None,
-                    'broken_status': 'broken',
-                    'login_required': 'no',
-                    'error_details': {
-                        'category': 'DNS Failure',
-                        'message': f'DNS resolution failed for {hostname}',
-                        'method_used': 'DNS'
-                    }
-                }
-            }
-        
-        # Stage 2: TCP Connect (for HTTPS sites)
-        tcp_connectable = True
-        if parsed.scheme == 'https':
-            tcp_connectable = await self.check_tcp_connect(hostname, 443)
-            if not tcp_connectable:
-                print(f"  ❌ TCP connect failed: {hostname}:443")
-                return {
-                    'bookmark': bookmark,
-                    'status': {
-                        'dns_resolved': True,
-                        'tcp_connectable': False,
-                        'broken_status': 'broken',
-                        'login_required': 'no',
-                        'error_details': {
-                            'category': 'Connection Error',
-                            'message': f'Cannot connect to {hostname}:443',
-                            'method_used': 'TCP'
-                        }
-                    }
-                }
-        
-        # Stage 3: HTTP Check
-        result = await self.check_http_status(session, url)
-        
-        # Determine final status
-        if result['is_accessible']:
-            if result['login_required']:
-                print(f"  🔒 Login required [{result['status_code']}] ({result['method_used']})")
-                broken_status = 'ok'
-                login_required = 'yes'
-            else:
-                print(f"  ✅ Accessible [{result['status_code']}] ({result['method_used']})")
-                broken_status = 'ok'
-                login_required = 'no'
+
+        # Host health → DNS → TCP → TLS → HTTP, stopping at the first stage that fails
+        result = await url_checker.check(bookmark.url.full)
+        self.count(result)
+        is_accessible, error_details, details = result
+        if details.get('host_down'):
+            print(f"  🚫 Host down: {bookmark.url.hostname} ({error_details.message})")
+        elif not is_accessible:
+            print(f"  ❌ Broken [{details['status_code']}] - {error_details.message}")
+        elif details.get('not_modified'):
+            print(f"  ♻️  Not modified [{details['status_code']}] ({details['method_used']})")
+        elif details.get('login_required'):
+            print(f"  🔒 Login required [{details['status_code']}] ({details['method_used']})")
         else:
-            print(f"  ❌ Broken [{result['status_code']}] - {result['error']}")
-            broken_status = 'broken'
-            login_required = 'no'
+            print(f"  ✅ Accessible [{details['status_code']}] ({details['method_used']})")
         
         return {
             'bookmark': bookmark,
             'status': {
-                'dns_resolved': dns_resolved,
-                'tcp_connectable': tcp_connectable,
-                'broken_status': broken_status,
-                'login_required': login_required,
+                'dns_resolved': details.get('dns_resolved'),
+                'tcp_connectable': details.get('tcp_connectable'),
+                'broken_status': 'ok' if is_accessible else 'broken',
+                'login_required': login_required_label(details),  # None keeps the stored value
                 'error_details': {
-                    'status_code': result['status_code'],
-                    'method_used': result['method_used'],
-                    'response_time': result['response_time'],
-                    'final_url': result['final_url'],
-                    'error': result['error'],
-                    'content_preview': result['content_preview'][:500] if result['content_preview'] else None
+                    'category': error_details.category.value,
+                    'message': error_details.message,
+                    **details
                 }
             }
         }
 
-    async def validate_all(self):
-        """Validate all bookmarks with smart batching."""
+    async def validate_all(self, budget: Optional[RunBudget] = None):
+        """Validate all bookmarks with smart batching, within ``budget`` if given."""
         bookmarks = [b for b in self.store._bookmarks if b.url]
         self.stats['total'] = len(bookmarks)
+        # Most valuable re-checks first; round-robin across hosts so the per-host
+        # scheduler can pace big hosts without stalling batches
+        ids = [b.id for b in bookmarks]
+        entries = sqlite_cache.get_many(ids)
+        run = validation_runs.resume(RUN_SMART_V2)
+        if run:
+            # Pick up the interrupted run: skip what it finished, keep its order
+            run.reconcile(entries)
+            bookmarks = run.order(bookmarks)
+        else:
+            bookmarks = prioritize(bookmarks, entries, sqlite_cache.get_history_many(ids))
+            bookmarks = interleave_by_host(bookmarks, key=lambda b: b.url.hostname)
+            run = validation_runs.start(RUN_SMART_V2, [(b.id, b.url.full) for b in bookmarks])
         
         print(f"\n🚀 Smart validation v2 of {self.stats['total']} bookmarks")
         print("=" * 60)
         
-        # Process bookmarks
-        connector = aiohttp.TCPConnector(limit=20, limit_per_host=5)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # Process in batches
-            batch_size = 20
+        # Resolve every distinct hostname once before any HTTP work
+        await dns_resolver.prefetch(b.url.hostname for b in bookmarks)
+
+        # Process in batches
+        batch_size = 20
+        
+        checked = 0
+        deferred = []
+        for i in range(0, len(bookmarks), batch_size):
+            batch = bookmarks[i:i + batch_size]
+            if budget:
+                # Cache hits are free; everything else needs room in the budget
+                admitted = [b for b in batch if self.is_cache_fresh(b.id) or budget.admit()]
+                deferred += [b for b in batch if b not in admitted]
+                batch = admitted
+                if not batch:
+                    continue
+            tasks = [asyncio.create_task(self.validate_bookmark(b)) for b in batch]
+            done, unfinished = await asyncio.wait(tasks, timeout=budget.remaining_seconds() if budget else None)
+            if unfinished:
+                # Deadline passed mid-batch: cancel what is still running
+                for task in unfinished:
+                    task.cancel()
+                    budget.release()
+                await asyncio.gather(*unfinished, return_exceptions=True)
+                budget.expire()
+                deferred += [b for b, task in zip(batch, tasks) if task in unfinished]
+            batch_results = [task.result() for task in tasks if task in done]
             
-            for i in range(0, len(bookmarks), batch_size):
-                batch = bookmarks[i:i + batch_size]
-                tasks = [self.validate_bookmark(session, b) for b in batch]
-                batch_results = await asyncio.gather(*tasks)
-                
-                # Save results to database
-                for result in batch_results:
-                    if result:  # Not cached
-                        self.save_to_sqlite(result)
-                
-                # Progress update
-                processed = min(i + batch_size, len(bookmarks))
-                print(f"\n📈 Progress: {processed}/{len(bookmarks)}")
-                print(f"   Cache hits: {self.stats['cache_hits']}")
-                print(f"   DNS failed: {self.stats['dns_failed']}")
-                print(f"   TCP failed: {self.stats['tcp_failed']}")
-                print(f"   Accessible: {self.stats['http_ok']}")
-                print(f"   Login required: {self.stats['http_auth']}")
-                print(f"   Broken: {self.stats['http_broken']}")
-                print(f"   Bandwidth used: {self.stats['bandwidth_bytes'] / 1024:.1f} KB")
+            # Save results to database
+            for result in batch_results:
+                if result:  # Not cached
+                    self.save_to_sqlite(result)
+                    checked += 1
+                    if budget:
+                        details = result['status']['error_details'] or {}
+                        budget.settle(details.get('bandwidth_bytes') or 0, details.get('response_time') or 0.0)
+            # Checkpoint the batch (cache hits included) now that its results are saved
+            run.mark_done([b.id for b, task in zip(batch, tasks) if task in done])
+            
+            # Progress update
+            processed = min(i + batch_size, len(bookmarks))
+            print(f"\n📈 Progress: {processed}/{len(bookmarks)}")
+            print(f"   Cache hits: {self.stats['cache_hits']}")
+            print(f"   DNS failed: {self.stats['dns_failed']}")
+            print(f"   TCP failed: {self.stats['tcp_failed']}")
+            print(f"   Accessible: {self.stats['http_ok']}")
+            print(f"   Login required: {self.stats['http_auth']}")
+            print(f"   Broken: {self.stats['http_broken']}")
+            print(f"   Bandwidth used: {self.stats['bandwidth_bytes'] / 1024:.1f} KB")
+            print(f"   Not modified (304): {self.stats['http_not_modified']} ({self.stats['revalidation_bytes'] / 1024:.1f} KB)")
         
+        dns_resolver.flush()
+        http_latency.flush()
+        run.finish()
+
         print("\n" + "=" * 60)
         print("✅ Validation complete!")
         print(f"📊 Final stats:")
@@ -422,15 +277,38 @@ class SmartBookmarkValidatorV2:
         print(f"   Broken: {self.stats['http_broken']}")
         print(f"   Total bandwidth: {self.stats['bandwidth_bytes'] / 1024 / 1024:.2f} MB")
         print(f"   Avg per bookmark: {self.stats['bandwidth_bytes'] / max(1, self.stats['total'] - self.stats['cache_hits']) / 1024:.1f} KB")
+        print(f"   Revalidated (304): {self.stats['http_not_modified']} using {self.stats['revalidation_bytes'] / 1024:.1f} KB")
+
+        if budget:
+            report = budget.finish(checked, [b.url.full for b in deferred])
+            print(f"\n⏳ Budget: {report.summary()}")
+            for url in report.deferred[:20]:
+                print(f"   deferred: {url}")
+            if len(report.deferred) > 20:
+                print(f"   ... and {len(report.deferred) - 20} more")
 
 async def main():
+    parser = argparse.ArgumentParser(description="Smart bookmark validation v2")
+    parser.add_argument("--deadline", type=float, help="stop starting checks after this many seconds")
+    parser.add_argument("--max-mb", type=float, help="stop before downloading more than this many MB")
+    args = parser.parse_args()
+
     bookmarks_file = os.path.join(os.path.dirname(__file__), '../data/bookmarks.json')
     if not os.path.exists(bookmarks_file):
         print(f"❌ Bookmarks file not found: {bookmarks_file}")
         sys.exit(1)
     
+    budget = None
+    if args.deadline is not None or args.max_mb is not None:
+        budget = RunBudget(
+            deadline_seconds=args.deadline,
+            max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None,
+        )
     validator = SmartBookmarkValidatorV2(bookmarks_file)
-    await validator.validate_all()
+    try:
+        await validator.validate_all(budget)
+    finally:
+        await url_checker.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -28,7 +28,15 @@ def update_schema():
             ("final_url", "TEXT", "Final URL after redirects"),
             ("content_preview", "TEXT", "First 1KB of content"),
             ("response_time_ms", "INTEGER", "Response time in milliseconds"),
-            ("bandwidth_bytes", "INTEGER", "Bytes transferred for this check")
+            ("bandwidth_bytes", "INTEGER", "Bytes transferred for this check"),
+            ("revalidation_bytes", "INTEGER", "Bytes transferred when a conditional check returned 304"),
+            ("dns_ms", "REAL", "Measured DNS lookup time"),
+            ("connect_ms", "REAL", "Measured TCP connect time (includes TLS with aiohttp)"),
+            ("tls_ms", "REAL", "Measured TLS handshake time"),
+            ("first_byte_ms", "REAL", "Time from request sent to response headers"),
+            ("transfer_ms", "REAL", "Time reading the response body"),
+            ("bytes_sent", "INTEGER", "Measured request bytes"),
+            ("bytes_received", "INTEGER", "Measured response bytes")
         ]
         
         # Add columns that don't exist
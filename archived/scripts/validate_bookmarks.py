@@ -2,7 +2,7 @@ import os
 import sys
 import asyncio
 from datetime import datetime, timedelta
-from app.bookmarks_data import BookmarkStore, categorize_error, ErrorDetails, ErrorCategory
+from app.bookmarks_data import BookmarkStore, ErrorCategory
 from app.sqlite_cache import sqlite_cache, BookmarkCacheEntry
 from app.config import CACHE_FRESHNESS_HOURS
 
@@ -80,6 +80,7 @@ async def main():
         if (idx + 1) % 10 == 0 or (idx + 1) == total:
             print(f"📊 Progress: {idx + 1}/{total} | Broken: {broken} | OK: {ok} | Cache hits: {cache_hits}")
     print(f"\n📊 Validation complete: {broken} broken, {ok} ok, {cache_hits} cache hits, {total} total.")
+    await store.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file